@@ -5,6 +5,15 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+ASGI deployment mode (async live-interview endpoints):
+
+    gunicorn backend.asgi:application -k uvicorn.workers.UvicornWorker
+
+Loading this module switches ASGI_MODE on, so /api/interview/ai/* is served
+by the async views in profiles/interview_views.py, which await Gemini instead
+of blocking a worker. The remaining DRF endpoints still run synchronously in
+Django's thread pool.
 """
 
 import os
@@ -12,5 +21,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+os.environ.setdefault('DJANGO_ASGI_MODE', 'True')
 
 application = get_asgi_application()
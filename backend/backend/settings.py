@@ -53,7 +53,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # Add this for static files
+    'profiles.middleware.AsyncWhiteNoiseMiddleware',  # WhiteNoise static files (sync + ASGI)
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -82,6 +82,10 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'backend.wsgi.application'
+ASGI_APPLICATION = 'backend.asgi.application'
+
+# Set by backend/asgi.py: route the live-interview endpoints to async views
+ASGI_MODE = os.environ.get('DJANGO_ASGI_MODE', 'False') == 'True'
 
 
 # Database
@@ -206,6 +210,96 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Gemini response cache (see profiles/llm_cache.py)
+# Backend: memory (per process), django (Django cache framework), db (shared table), none
+LLM_CACHE_BACKEND = os.environ.get('LLM_CACHE_BACKEND', 'memory')
+LLM_CACHE_TTL = int(os.environ.get('LLM_CACHE_TTL', '86400'))  # seconds
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', '1000'))
+LLM_CACHE_DJANGO_ALIAS = os.environ.get('LLM_CACHE_DJANGO_ALIAS', 'default')
+# Functions opt in to caching by namespace
+LLM_CACHE_FUNCTIONS = [
+    name.strip() for name in
+    os.environ.get('LLM_CACHE_FUNCTIONS', 'resume_name,resume_extraction,recommendations').split(',')
+    if name.strip()
+]
+
+# Coalescing of identical in-flight Gemini calls (see profiles/singleflight.py)
+# Cross-worker lock: file (same host), db (PostgreSQL advisory lock) or none
+LLM_SINGLEFLIGHT_LOCK = os.environ.get('LLM_SINGLEFLIGHT_LOCK', 'file')
+LLM_SINGLEFLIGHT_TIMEOUT = int(os.environ.get('LLM_SINGLEFLIGHT_TIMEOUT', '120'))  # seconds
+
+# Deadlines, retries and circuit breakers around Gemini calls (see profiles/resilience.py)
+# Deadline per task in seconds, retries included; other tasks use GEMINI_TIMEOUT
+LLM_TASK_DEADLINES = {
+    'interview_question': 15,
+    'interview_analysis': 15,
+    'interview_transition': 10,
+    'interview_final': 10,
+    'resume_name': 15,
+    'recommendations': 20,
+    'questions': 30,
+    'resume_extraction': 45,
+}
+# Override as "task=seconds,task=seconds"
+for item in os.environ.get('LLM_TASK_DEADLINES', '').split(','):
+    if '=' in item:
+        task, seconds = item.split('=', 1)
+        LLM_TASK_DEADLINES[task.strip()] = float(seconds)
+LLM_RETRY_ATTEMPTS = int(os.environ.get('LLM_RETRY_ATTEMPTS', '3'))  # attempts per call, first one included
+LLM_RETRY_BASE_DELAY = float(os.environ.get('LLM_RETRY_BASE_DELAY', '0.5'))  # seconds
+LLM_RETRY_MAX_DELAY = float(os.environ.get('LLM_RETRY_MAX_DELAY', '8'))  # seconds
+LLM_BREAKER_ERROR_RATE = float(os.environ.get('LLM_BREAKER_ERROR_RATE', '0.5'))
+LLM_BREAKER_MIN_CALLS = int(os.environ.get('LLM_BREAKER_MIN_CALLS', '10'))
+LLM_BREAKER_WINDOW = int(os.environ.get('LLM_BREAKER_WINDOW', '30'))  # seconds
+LLM_BREAKER_COOLDOWN = int(os.environ.get('LLM_BREAKER_COOLDOWN', '30'))  # seconds
+
+# Live-interview question prompt budget (see profiles/prompt_budget.py), in estimated tokens
+INTERVIEW_PROMPT_TOKEN_BUDGET = int(os.environ.get('INTERVIEW_PROMPT_TOKEN_BUDGET', '2000'))
+INTERVIEW_RECENT_MESSAGES = int(os.environ.get('INTERVIEW_RECENT_MESSAGES', '10'))  # kept verbatim at most
+INTERVIEW_MESSAGE_MAX_TOKENS = int(os.environ.get('INTERVIEW_MESSAGE_MAX_TOKENS', '250'))
+INTERVIEW_ANSWER_MAX_TOKENS = int(os.environ.get('INTERVIEW_ANSWER_MAX_TOKENS', '600'))
+INTERVIEW_SUMMARY_MAX_TOKENS = int(os.environ.get('INTERVIEW_SUMMARY_MAX_TOKENS', '400'))
+INTERVIEW_SUMMARY_TTL = int(os.environ.get('INTERVIEW_SUMMARY_TTL', '10800'))  # seconds
+
+# Resume PDF extraction (see profiles/pdf_extractor.py)
+RESUME_PDF_MAX_BYTES = int(os.environ.get('RESUME_PDF_MAX_BYTES', str(10 * 1024 * 1024)))
+RESUME_PDF_MAX_PAGES = int(os.environ.get('RESUME_PDF_MAX_PAGES', '30'))  # later pages are ignored
+RESUME_PDF_PARALLEL_MIN_PAGES = int(os.environ.get('RESUME_PDF_PARALLEL_MIN_PAGES', '8'))  # smaller PDFs are read in-process
+RESUME_PDF_PAGES_PER_TASK = int(os.environ.get('RESUME_PDF_PAGES_PER_TASK', '4'))
+RESUME_PDF_WORKERS = int(os.environ.get('RESUME_PDF_WORKERS', '0'))  # 0 = min(4, CPU count)
+RESUME_DOCX_MAX_XML_BYTES = int(os.environ.get('RESUME_DOCX_MAX_XML_BYTES', str(20 * 1024 * 1024)))  # uncompressed document.xml
+
+# Send only the resume sections the extraction needs, each within a token budget
+RESUME_PROMPT_SEGMENTATION = os.environ.get('RESUME_PROMPT_SEGMENTATION', 'True') == 'True'
+
+# Background resume parsing (manage.py process_resume_jobs)
+RESUME_JOB_MAX_ATTEMPTS = int(os.environ.get('RESUME_JOB_MAX_ATTEMPTS', '3'))
+RESUME_JOB_STALE_SECONDS = int(os.environ.get('RESUME_JOB_STALE_SECONDS', '600'))  # requeue jobs processing this long
+RESUME_JOB_POLL_INTERVAL = float(os.environ.get('RESUME_JOB_POLL_INTERVAL', '2'))  # seconds
+
+# Question bank: /api/questions/generate/ serves stored questions and only asks Gemini for the rest
+QUESTION_BANK_ENABLED = os.environ.get('QUESTION_BANK_ENABLED', 'True') == 'True'
+QUESTION_BANK_CANDIDATES = int(os.environ.get('QUESTION_BANK_CANDIDATES', '200'))  # least-served questions considered per set
+QUESTION_BANK_FRESH_QUESTIONS = int(os.environ.get('QUESTION_BANK_FRESH_QUESTIONS', '0'))  # newly generated per set when a resume exists
+QUESTION_POOL_SIZE = int(os.environ.get('QUESTION_POOL_SIZE', '3'))  # ready sets kept per combination
+QUESTION_PREWARM_LEVELS = os.environ.get('QUESTION_PREWARM_LEVELS', 'internship,entry,mid').split(',')
+QUESTION_PREWARM_DOMAINS = os.environ.get('QUESTION_PREWARM_DOMAINS', 'dsa,web,ml,core').split(',')
+QUESTION_PREWARM_CONCURRENCY = int(os.environ.get('QUESTION_PREWARM_CONCURRENCY', '2'))
+QUESTION_PREWARM_INTERVAL = int(os.environ.get('QUESTION_PREWARM_INTERVAL', '300'))  # seconds, with --loop
+
+# Local TF-IDF index for matching resumes to bank questions (see profiles/question_index.py)
+QUESTION_INDEX_ENABLED = os.environ.get('QUESTION_INDEX_ENABLED', 'True') == 'True'
+QUESTION_INDEX_DIR = os.environ.get('QUESTION_INDEX_DIR', str(BASE_DIR / 'question_index'))
+QUESTION_INDEX_DIM = int(os.environ.get('QUESTION_INDEX_DIM', '512'))  # hash buckets; changing it needs --rebuild
+QUESTION_INDEX_CANDIDATES = int(os.environ.get('QUESTION_INDEX_CANDIDATES', '50'))  # most relevant questions considered per set
+QUESTION_INDEX_LAG_WARNING = int(os.environ.get('QUESTION_INDEX_LAG_WARNING', '50'))  # unindexed questions per pair before warning
+
+# Per-user Bloom filters of served questions, so repeat sessions get new ones (see profiles/seen_questions.py)
+QUESTION_SEEN_ENABLED = os.environ.get('QUESTION_SEEN_ENABLED', 'True') == 'True'
+QUESTION_SEEN_CAPACITY = int(os.environ.get('QUESTION_SEEN_CAPACITY', '2000'))  # questions per filter; two filters are kept
+QUESTION_SEEN_ERROR_RATE = float(os.environ.get('QUESTION_SEEN_ERROR_RATE', '0.01'))
+QUESTION_SEEN_MAX_PAGES = int(os.environ.get('QUESTION_SEEN_MAX_PAGES', '5'))  # candidate pages read past seen questions
+
 # Media files (uploaded files)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
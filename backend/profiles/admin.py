@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserProfile, ResumeData, InterviewAnalysis
+from .models import UserProfile, ResumeData, ResumeParseJob, Question, QuestionSet, SeenQuestions, InterviewAnalysis, LLMCacheEntry
 
 
 @admin.register(UserProfile)
@@ -15,7 +15,7 @@ class ResumeDataAdmin(admin.ModelAdmin):
     list_display = ('user', 'full_name', 'file_name', 'uploaded_at')
     search_fields = ('full_name', 'email', 'user__email')
     list_filter = ('uploaded_at',)
-    readonly_fields = ('uploaded_at', 'updated_at')
+    readonly_fields = ('uploaded_at', 'updated_at', 'raw_text')
     
     fieldsets = (
         ('User Information', {
@@ -35,6 +35,41 @@ class ResumeDataAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    
+    @admin.display(description='Raw text')
+    def raw_text(self, obj):
+        return obj.get_raw_text()
+
+
+@admin.register(ResumeParseJob)
+class ResumeParseJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'file_name', 'status', 'attempts', 'created_at', 'finished_at')
+    search_fields = ('id', 'file_name', 'user__email')
+    list_filter = ('status', 'created_at')
+    exclude = ('file_data',)
+    readonly_fields = ('created_at', 'started_at', 'finished_at', 'locked_by')
+
+
+@admin.register(Question)
+class QuestionAdmin(admin.ModelAdmin):
+    list_display = ('text', 'domain', 'level', 'difficulty', 'type', 'times_served', 'created_at')
+    search_fields = ('text',)
+    list_filter = ('domain', 'level', 'difficulty', 'type')
+    readonly_fields = ('text_hash', 'times_served', 'created_at', 'last_served_at')
+
+
+@admin.register(QuestionSet)
+class QuestionSetAdmin(admin.ModelAdmin):
+    list_display = ('goal', 'level', 'domain', 'created_at')
+    list_filter = ('goal', 'level', 'domain')
+
+
+@admin.register(SeenQuestions)
+class SeenQuestionsAdmin(admin.ModelAdmin):
+    list_display = ('user', 'total_served', 'current_count', 'updated_at')
+    search_fields = ('user__email', 'user__uid')
+    readonly_fields = ('current_count', 'total_served', 'updated_at')
+    exclude = ('current', 'previous')
 
 
 @admin.register(InterviewAnalysis)
@@ -63,3 +98,11 @@ class InterviewAnalysisAdmin(admin.ModelAdmin):
         }),
     )
 
+
+
+@admin.register(LLMCacheEntry)
+class LLMCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ('key', 'namespace', 'model_name', 'created_at', 'expires_at', 'last_accessed_at')
+    search_fields = ('key', 'namespace')
+    list_filter = ('namespace', 'model_name')
+    readonly_fields = ('created_at', 'last_accessed_at')
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class ProfilesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'profiles'
+
+    def ready(self):
+        # Compile the skills matcher at startup rather than on the first upload
+        from . import skill_taxonomy
+        try:
+            skill_taxonomy.get_matcher()
+        except Exception as e:
+            print(f"Could not load skills taxonomy: {e}")
@@ -0,0 +1,465 @@
+"""
+Local stand-in for the Gemini SDK surfaces the app uses.
+
+Lets the backend run (and be load tested) end to end without a Google API
+key. Enable it with GEMINI_BACKEND=fake: gemini_client then hands out
+FakeModel instances in place of google.generativeai / vertexai models and
+routes upload_file / get_file / vertex_part here. Nothing leaves the process.
+
+Each call sleeps for a latency drawn from a configurable distribution, can
+fail with the same google.api_core exceptions the real SDK raises, and
+returns a canned response for the task it recognises in the prompt (resume
+parsing, recommendations, question generation, interview turns, recording
+analysis). Canned responses can be overridden with a fixture file or with
+register_responder().
+
+Settings (environment):
+    FAKE_GEMINI_LATENCY         per-call latency in ms: "<ms>", "uniform:<lo>:<hi>",
+                                "normal:<mean>:<stddev>" or "lognormal:<median>:<sigma>"
+                                (default lognormal:800:0.5)
+    FAKE_GEMINI_STREAM_CHUNKS   chunks per streamed response (default 8)
+    FAKE_GEMINI_ERROR_RATE      fraction of calls that fail (default 0)
+    FAKE_GEMINI_ERRORS          error kinds to draw from: 429, 500, 503, timeout
+                                (default 429,503)
+    FAKE_GEMINI_MARKDOWN_RATE   fraction of JSON responses wrapped in ```json fences
+                                when JSON mode is off (default 0.2, like the real model)
+    FAKE_GEMINI_FILE_POLLS      get_file polls an upload stays PROCESSING (default 1)
+    FAKE_GEMINI_FILE_FAIL_RATE  fraction of uploads that end up FAILED (default 0)
+    FAKE_GEMINI_FIXTURES        JSON file of {task: response} overrides
+    FAKE_GEMINI_SEED            seed for reproducible runs
+"""
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+
+from google.api_core import exceptions as google_exceptions
+
+# Share of a streamed response's latency spent before the first chunk
+_TTFT_SHARE = 0.25
+
+
+def parse_latency(spec):
+    """
+    Turn a FAKE_GEMINI_LATENCY spec into a function returning a latency in
+    seconds.
+    """
+    parts = str(spec).strip().split(':')
+    kind, args = (parts[0], parts[1:]) if len(parts) > 1 else ('fixed', parts)
+    try:
+        args = [float(arg) for arg in args]
+        if kind == 'fixed':
+            ms = args[0]
+            return lambda rng: ms / 1000.0
+        if kind == 'uniform':
+            low, high = args
+            return lambda rng: rng.uniform(low, high) / 1000.0
+        if kind == 'normal':
+            mean, stddev = args
+            return lambda rng: max(0.0, rng.gauss(mean, stddev)) / 1000.0
+        if kind == 'lognormal':
+            median, sigma = args
+            return lambda rng: rng.lognormvariate(math.log(median), sigma) / 1000.0
+    except (ValueError, TypeError):
+        pass
+    raise ValueError(f"Invalid FAKE_GEMINI_LATENCY: {spec!r}")
+
+
+def _load_fixtures(path):
+    if not path:
+        return {}
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+_config = {}
+_rng = random.Random(os.getenv('FAKE_GEMINI_SEED'))
+_responders = []
+_files = {}
+_files_lock = threading.Lock()
+_file_ids = itertools.count(1)
+
+
+def configure(**overrides):
+    """
+    (Re)load the fake's settings from the environment, applying `overrides`
+    (latency, stream_chunks, error_rate, errors, markdown_rate, file_polls,
+    file_fail_rate, fixtures) on top. Used by load-test and benchmark
+    commands to change behaviour without restarting.
+    """
+    config = {
+        'latency': os.getenv('FAKE_GEMINI_LATENCY', 'lognormal:800:0.5'),
+        'stream_chunks': int(os.getenv('FAKE_GEMINI_STREAM_CHUNKS', '8')),
+        'error_rate': float(os.getenv('FAKE_GEMINI_ERROR_RATE', '0')),
+        'errors': os.getenv('FAKE_GEMINI_ERRORS', '429,503'),
+        'markdown_rate': float(os.getenv('FAKE_GEMINI_MARKDOWN_RATE', '0.2')),
+        'file_polls': int(os.getenv('FAKE_GEMINI_FILE_POLLS', '1')),
+        'file_fail_rate': float(os.getenv('FAKE_GEMINI_FILE_FAIL_RATE', '0')),
+        'fixtures': os.getenv('FAKE_GEMINI_FIXTURES', ''),
+    }
+    config.update({key: value for key, value in overrides.items() if value is not None})
+    config['sample_latency'] = parse_latency(config['latency'])
+    if isinstance(config['errors'], str):
+        config['errors'] = [kind.strip() for kind in config['errors'].split(',') if kind.strip()]
+    if isinstance(config['fixtures'], str):
+        config['fixtures'] = _load_fixtures(config['fixtures'])
+    _config.clear()
+    _config.update(config)
+
+
+configure()
+
+
+def register_responder(responder):
+    """
+    Add a hook `responder(task, prompt)` consulted before the canned
+    responses. Return a string (or JSON-serialisable value) to use it as the
+    response text, or None to fall through.
+    """
+    _responders.append(responder)
+
+
+def clear_responders():
+    del _responders[:]
+
+
+# ---------------------------------------------------------------------------
+# Canned responses
+# ---------------------------------------------------------------------------
+
+# Checked in order; the first marker found in the prompt names the task
+TASK_MARKERS = [
+    ('recording_analysis', 'Analyze this interview recording'),
+    ('resume_extraction', 'You are an expert resume parser'),
+    ('resume_name', "Extract ONLY the candidate's full name"),
+    ('recommendations', 'You are an expert career counselor'),
+    ('questions', 'interview questions for this candidate'),
+    ('interview_analysis', "analyze this candidate's response"),
+    ('interview_transition', 'You are an interviewer transitioning'),
+    ('interview_final', 'concluding the interview'),
+    ('interview_question', 'technical interviewer conducting'),
+]
+
+JSON_TASKS = {'recording_analysis', 'resume_extraction', 'recommendations', 'questions'}
+
+FAKE_NAME = 'Alex Morgan'
+
+FAKE_SKILLS = [
+    'Python', 'JavaScript', 'React', 'Django', 'SQL', 'PostgreSQL',
+    'Docker', 'Git', 'REST APIs', 'Data Structures', 'Algorithms',
+]
+
+FAKE_INTERVIEW_QUESTIONS = [
+    "Walk me through how you would design a rate limiter for a public API.",
+    "You mentioned working with databases - how do you decide when to add an index?",
+    "Can you explain the difference between a process and a thread, and when you'd pick each?",
+    "Tell me about a bug that took you a long time to find. How did you track it down?",
+    "How would you find the k most frequent elements in a large stream of data?",
+]
+
+FAKE_ANALYSES = [
+    "The candidate gave a structured answer with a clear example. Technical depth was adequate; a follow-up on trade-offs would be useful.",
+    "The answer covered the basics but stayed high level. Probe for specifics on complexity and edge cases.",
+]
+
+
+def detect_task(prompt):
+    for task, marker in TASK_MARKERS:
+        if marker in prompt:
+            return task
+    return 'text'
+
+
+def _questions(prompt):
+    match = re.search(r'Generate EXACTLY (\d+) questions', prompt)
+    count = int(match.group(1)) if match else 5
+    match = re.search(r'- Domain: (.+)', prompt)
+    domain = match.group(1).strip() if match else 'software engineering'
+    # Number past the questions the prompt says are already asked, like the real model avoiding them
+    avoid = prompt.split('do NOT repeat or rephrase them:', 1)
+    offset = avoid[1].split('\n\n', 1)[0].count('\n- ') if len(avoid) > 1 else 0
+    difficulties = ['easy', 'medium', 'hard']
+    types = ['conceptual', 'coding', 'scenario']
+    return [
+        {
+            'question': f"Question {offset + i + 1} on {domain}: {FAKE_INTERVIEW_QUESTIONS[(offset + i) % len(FAKE_INTERVIEW_QUESTIONS)]}",
+            'type': types[i % len(types)],
+            'difficulty': difficulties[min(len(difficulties) - 1, i * len(difficulties) // count)],
+            'topics': [domain],
+            'expected_answer_points': ['Clear approach', 'Complexity analysis', 'Edge cases'],
+        }
+        for i in range(count)
+    ]
+
+
+def _resume_extraction(prompt):
+    resume_text = prompt.split('Resume Text:', 1)[-1]
+    email = re.search(r'[\w.+-]+@[\w-]+\.[\w.]+', resume_text)
+    return {
+        'full_name': FAKE_NAME,
+        'email': email.group() if email else 'alex.morgan@example.com',
+        'phone': '+1 555 010 0000',
+        'location': 'Bengaluru, India',
+        'linkedin': 'https://linkedin.com/in/alexmorgan',
+        'github': 'https://github.com/alexmorgan',
+        'website': '',
+        'summary': 'Software engineer focused on web backends and data-heavy services.',
+        'years_of_experience': 2,
+        'skills': FAKE_SKILLS,
+        'education': [{
+            'degree': 'Bachelor of Technology in Computer Science',
+            'institution': 'Example Institute of Technology',
+            'year': '2023',
+        }],
+        'experience': [{
+            'title': 'Software Engineer',
+            'company': 'Example Corp',
+            'duration': 'Jul 2023 - Present',
+            'description': 'Built and maintained Django services and React dashboards.',
+        }],
+        'projects': [{
+            'name': 'Interview Coach',
+            'description': 'Mock interview platform with AI feedback.',
+            'technologies': ['Django', 'React'],
+        }],
+        'certifications': ['AWS Cloud Practitioner'],
+        'languages': ['English', 'Hindi'],
+        'key_strengths': ['Backend development', 'Problem solving', 'Communication'],
+        'recommendations': _recommendations(prompt),
+    }
+
+
+def _recommendations(prompt):
+    return {
+        'goal': 'Focused Practice',
+        'target_level': 'Entry Level',
+        'domain': 'Backend Development',
+        'reasoning': {
+            'goal_reason': 'Two years of experience with a few well-scoped projects.',
+            'level_reason': 'Early-career profile with solid fundamentals.',
+            'domain_reason': 'Most experience and projects are backend web services.',
+        },
+    }
+
+
+def _recording_analysis(prompt):
+    from .gemini_analyzer import generate_mock_analysis
+    return generate_mock_analysis(1)
+
+
+CANNED_RESPONSES = {
+    'recording_analysis': _recording_analysis,
+    'resume_extraction': _resume_extraction,
+    'resume_name': lambda prompt: FAKE_NAME,
+    'recommendations': _recommendations,
+    'questions': _questions,
+    'interview_question': lambda prompt: _rng.choice(FAKE_INTERVIEW_QUESTIONS),
+    'interview_analysis': lambda prompt: _rng.choice(FAKE_ANALYSES),
+    'interview_transition': lambda prompt: "Nice work so far. Let's move on to the next round.",
+    'interview_final': lambda prompt: "Thank you for your time today - you did well. We'll be in touch about next steps soon.",
+    'text': lambda prompt: 'OK',
+}
+
+
+def _render(task, value, json_mode=False):
+    if isinstance(value, str):
+        return value
+    text = json.dumps(value, indent=2)
+    # JSON mode never fences its output; free-form answers sometimes do
+    if task in JSON_TASKS and not json_mode and _rng.random() < _config['markdown_rate']:
+        text = f"```json\n{text}\n```"
+    return text
+
+
+def respond(prompt, json_mode=False):
+    """Return (task, response text) for a prompt"""
+    task = detect_task(prompt)
+    for responder in _responders:
+        value = responder(task, prompt)
+        if value is not None:
+            return task, _render(task, value, json_mode)
+    if task in _config['fixtures']:
+        return task, _render(task, _config['fixtures'][task], json_mode)
+    return task, _render(task, CANNED_RESPONSES[task](prompt), json_mode)
+
+
+# ---------------------------------------------------------------------------
+# SDK stand-ins
+# ---------------------------------------------------------------------------
+
+class FakeResponse:
+    """Quacks like GenerateContentResponse for the fields the app reads"""
+
+    def __init__(self, text, prompt_tokens=0):
+        self.text = text
+        self.usage_metadata = {
+            'prompt_token_count': prompt_tokens,
+            'candidates_token_count': len(text) // 4,
+        }
+
+
+def _prompt_text(contents):
+    if isinstance(contents, str):
+        return contents
+    return '\n'.join(part for part in contents if isinstance(part, str))
+
+
+def _error(kind):
+    if kind == '429':
+        return google_exceptions.ResourceExhausted('Resource has been exhausted (e.g. check quota).')
+    if kind == '500':
+        return google_exceptions.InternalServerError('An internal error has occurred.')
+    if kind == 'timeout':
+        return google_exceptions.DeadlineExceeded('Deadline Exceeded')
+    return google_exceptions.ServiceUnavailable('The model is overloaded. Please try again later.')
+
+
+def _plan(request_options):
+    """
+    Decide the outcome of one call: returns (latency seconds, exception or
+    None). Latency beyond the request timeout becomes a DeadlineExceeded.
+    """
+    latency = _config['sample_latency'](_rng)
+    timeout = (request_options or {}).get('timeout')
+    if timeout and latency > timeout:
+        return timeout, google_exceptions.DeadlineExceeded('Deadline Exceeded')
+    if _config['errors'] and _rng.random() < _config['error_rate']:
+        # Failures usually come back faster than a full generation
+        return latency * _rng.uniform(0.1, 0.5), _error(_rng.choice(_config['errors']))
+    return latency, None
+
+
+def _split(text, count):
+    if count <= 1 or len(text) < count:
+        return [text]
+    size = math.ceil(len(text) / count)
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class FakeModel:
+    """Stand-in for genai.GenerativeModel / vertexai GenerativeModel"""
+
+    def __init__(self, model_name, **kwargs):
+        self.model_name = model_name
+
+    def _prepare(self, contents, request_options, generation_config):
+        prompt = _prompt_text(contents)
+        latency, error = _plan(request_options)
+        json_mode = (generation_config or {}).get('response_mime_type') == 'application/json'
+        text = respond(prompt, json_mode)[1] if error is None else ''
+        return prompt, latency, error, text
+
+    def _chunk_delays(self, latency, chunks):
+        first = latency * _TTFT_SHARE
+        rest = (latency - first) / max(1, len(chunks) - 1)
+        return [first] + [rest] * (len(chunks) - 1)
+
+    def generate_content(self, contents, stream=False, request_options=None, generation_config=None, **kwargs):
+        prompt, latency, error, text = self._prepare(contents, request_options, generation_config)
+        if not stream:
+            time.sleep(latency)
+            if error is not None:
+                raise error
+            return FakeResponse(text, len(prompt) // 4)
+
+        if error is not None:
+            time.sleep(latency)
+            raise error
+        chunks = _split(text, _config['stream_chunks'])
+
+        def _stream():
+            for delay, chunk in zip(self._chunk_delays(latency, chunks), chunks):
+                time.sleep(delay)
+                yield FakeResponse(chunk)
+
+        return _stream()
+
+    async def generate_content_async(self, contents, stream=False, request_options=None, generation_config=None, **kwargs):
+        prompt, latency, error, text = self._prepare(contents, request_options, generation_config)
+        if not stream:
+            await asyncio.sleep(latency)
+            if error is not None:
+                raise error
+            return FakeResponse(text, len(prompt) // 4)
+
+        if error is not None:
+            await asyncio.sleep(latency)
+            raise error
+        chunks = _split(text, _config['stream_chunks'])
+
+        async def _stream():
+            for delay, chunk in zip(self._chunk_delays(latency, chunks), chunks):
+                await asyncio.sleep(delay)
+                yield FakeResponse(chunk)
+
+        return _stream()
+
+
+# Kept as the SDK name so gemini_client can treat this module like genai
+GenerativeModel = FakeModel
+
+
+class FakeState:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f"State.{self.name}"
+
+
+class FakeFile:
+    """Stand-in for a File API handle"""
+
+    def __init__(self, name, mime_type, size, state):
+        self.name = name
+        self.display_name = name
+        self.uri = f"https://generativelanguage.googleapis.com/v1beta/{name}"
+        self.mime_type = mime_type
+        self.size_bytes = size
+        self.state = FakeState(state)
+
+
+def upload_file(path, mime_type=None, **kwargs):
+    """Pretend to upload `path`; the file starts out PROCESSING"""
+    latency, error = _plan(None)
+    time.sleep(latency)
+    if error is not None:
+        raise error
+    name = f"files/fake-{next(_file_ids)}"
+    size = os.path.getsize(path)
+    fails = _rng.random() < _config['file_fail_rate']
+    with _files_lock:
+        _files[name] = {'mime_type': mime_type, 'size': size, 'polls': _config['file_polls'], 'fails': fails}
+    state = 'PROCESSING' if _config['file_polls'] > 0 else ('FAILED' if fails else 'ACTIVE')
+    return FakeFile(name, mime_type, size, state)
+
+
+def get_file(name, **kwargs):
+    """Poll an uploaded file; it turns ACTIVE (or FAILED) after FAKE_GEMINI_FILE_POLLS polls"""
+    with _files_lock:
+        entry = _files.get(name)
+        if entry is None:
+            raise google_exceptions.NotFound(f"File {name} not found.")
+        entry['polls'] = max(0, entry['polls'] - 1)
+        if entry['polls'] > 0:
+            state = 'PROCESSING'
+        else:
+            state = 'FAILED' if entry['fails'] else 'ACTIVE'
+    return FakeFile(name, entry['mime_type'], entry['size'], state)
+
+
+class Part:
+    """Stand-in for vertexai.generative_models.Part"""
+
+    def __init__(self, data, mime_type):
+        self.data = data
+        self.mime_type = mime_type
+
+    @classmethod
+    def from_data(cls, data, mime_type):
+        return cls(data, mime_type)
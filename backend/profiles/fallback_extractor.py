@@ -0,0 +1,150 @@
+"""
+Regex fallback for resume parsing, used whenever Gemini extraction fails.
+
+Every pattern is compiled once, when the module loads. extract() walks the
+text a single time, line by line. For each line it:
+
+* runs one combined regex for emails, URLs and both phone formats, but
+  only if the line has an "@", "http" or a run of seven digits;
+* checks for a degree keyword (education);
+* checks for a job-title keyword (experience; the next line becomes the
+  description);
+* while still in the first 15 non-empty lines, checks whether the line
+  looks like the candidate's name.
+
+Skills come from the taxonomy matcher, which is also a single precompiled
+regex pass. The results match the per-field extractors this replaced, with
+one difference: an education entry holds the whole degree line, not only
+the degree keyword. `manage.py bench_fallback` compares the two.
+"""
+import re
+
+from . import skill_taxonomy
+
+EMAIL = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+# One pass finds all contact tokens; group order decides ties at a position
+_CONTACT = re.compile(
+    r'(?P<email>\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b)'
+    r'|(?P<url>https?://(?:www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b(?:[-a-zA-Z0-9()@:%_\+.~#?&/=]*))'
+    r'|(?P<phone>\+?1?\s*\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})'
+    r'|(?P<phone_intl>\+?\d{1,3}[-.\s]?\d{3,4}[-.\s]?\d{4})'
+)
+
+# Seven digits within a short span: the least any phone pattern needs
+_PHONE_DIGITS = re.compile(r'\d(?:\D{0,3}\d){6}')
+
+_DEGREE = re.compile(r'(?i)\b(?:Bachelors?|Masters?|Doctorate|PhD|B\.S\.|M\.S\.|B\.A\.|M\.A\.|B\.Tech|M\.Tech|MBA)')
+
+_JOB_TITLE = re.compile(r'(?i)engineer|developer|manager|analyst|designer|intern')
+
+_NOT_A_NAME = re.compile(
+    r'(?i)resume|curriculum vitae|cv|profile|objective|summary|experience|education|skills|projects'
+    r'|contact|email|phone|@|http|linkedin|github'
+)
+_NAME_FORBIDDEN_CHARS = re.compile(r'[\d+\-\/\|]')
+
+_EMAIL_YEAR_PREFIX = re.compile(r'^\d{4}\.')
+_EMAIL_NAME_SEPARATORS = re.compile(r'[._-]')
+
+NAME_SEARCH_LINES = 15
+MAX_EXPERIENCE = 5
+
+
+def extract_email(text):
+    match = EMAIL.search(text)
+    return match.group() if match else None
+
+
+def name_from_email(email):
+    """'jane.doe@x.com' -> 'Jane Doe'"""
+    local = _EMAIL_YEAR_PREFIX.sub('', email.split('@')[0])
+    parts = [part for part in _EMAIL_NAME_SEPARATORS.split(local) if part.isalpha() and len(part) > 1]
+    return ' '.join(part.capitalize() for part in parts) if parts else None
+
+
+def _looks_like_name(line):
+    if _NOT_A_NAME.search(line) or _NAME_FORBIDDEN_CHARS.search(line):
+        return False
+    words = line.split()
+    return 2 <= len(words) <= 4 and all(
+        word[0].isupper() and word.replace('-', '').replace("'", '').isalpha() for word in words
+    )
+
+
+def extract_fields(raw_text, email=None):
+    """Every fallback field except skills, in one pass over `raw_text`"""
+    emails = []
+    phone = phone_intl = None
+    linkedin = github = website = None
+    education = []
+    experience = []
+    name_candidate = None
+    pending = None  # experience entry waiting for the next line as its description
+    seen_lines = 0
+
+    for raw_line in raw_text.split('\n'):
+        if pending is not None:
+            pending['description'] = raw_line
+            pending = None
+
+        # Contact patterns only run on lines that could hold a match
+        if '@' in raw_line or 'http' in raw_line or _PHONE_DIGITS.search(raw_line):
+            contacts = _CONTACT.finditer(raw_line)
+        else:
+            contacts = ()
+        for match in contacts:
+            kind = match.lastgroup
+            value = match.group()
+            if kind == 'email':
+                emails.append(value)
+            elif kind == 'url':
+                lowered = value.lower()
+                if 'linkedin.com' in lowered:
+                    linkedin = value
+                elif 'github.com' in lowered:
+                    github = value
+                elif not website:
+                    website = value
+            elif kind == 'phone':
+                phone = phone or value
+            elif not phone_intl:
+                phone_intl = value
+
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        degree = _DEGREE.search(line)
+        if degree:
+            education.append({'degree': line[degree.start():].strip()})
+
+        if len(experience) < MAX_EXPERIENCE and _JOB_TITLE.search(line):
+            pending = {'title': line, 'description': ''}
+            experience.append(pending)
+
+        if name_candidate is None and seen_lines < NAME_SEARCH_LINES and _looks_like_name(line):
+            name_candidate = line
+        seen_lines += 1
+
+    email = email or (emails[0] if emails else None)
+    return {
+        'full_name': (name_from_email(email) if email else None) or name_candidate,
+        'email': email,
+        'phone': phone or phone_intl,
+        'linkedin': linkedin,
+        'github': github,
+        'website': website,
+        'education': education,
+        'experience': experience,
+    }
+
+
+def extract(raw_text, email=None):
+    """
+    All fallback fields from `raw_text`: full_name, email, phone, linkedin,
+    github, website, skills, education and experience.
+    """
+    fields = extract_fields(raw_text, email)
+    fields['skills'] = skill_taxonomy.find_skills(raw_text)
+    return fields
@@ -1,29 +1,42 @@
 import os
+import copy
 import json
-import google.generativeai as genai
-from dotenv import load_dotenv
-import vertexai
+from django.conf import settings
 
-# Load environment variables
-load_dotenv()
+from . import llm_cache, llm_schemas, metrics, resilience, resume_sections
+from . import gemini_client
+from .gemini_client import GEMINI_API_KEY, GCP_PROJECT_ID, GCP_LOCATION
 
-# Configure Gemini API
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-USE_VERTEX_AI = os.getenv('USE_VERTEX_AI', 'false').lower() == 'true'
-GCP_PROJECT_ID = os.getenv('GCP_PROJECT_ID')
-GCP_LOCATION = os.getenv('GCP_LOCATION', 'us-central1')
+# Video analysis takes far longer than a text prompt
+RECORDING_TIMEOUT = 300
 
-if USE_VERTEX_AI:
-    print(f"🔵 Using Vertex AI (Project: {GCP_PROJECT_ID}, Location: {GCP_LOCATION})")
-    try:
+# Shared by the standalone recommendations prompt and the resume extraction
+# prompt, which returns recommendations alongside the parsed fields
+RECOMMENDATION_RULES = """1. For "goal":
+   - Recommend "Full Technical Interview" if candidate has 2+ years experience or multiple projects
+   - Recommend "Focused Practice" if candidate has 0-2 years experience or specific skill gaps
+   - Recommend "Quick Mock" if candidate is a fresher or student with limited experience
+
+2. For "target_level":
+   - "Entry Level": 0-2 years experience, recent graduate, or student
+   - "Mid Level": 2-5 years experience, multiple projects, diverse skills
+   - "Senior Level": 5+ years experience, leadership roles, advanced skills
 
-        vertexai.init(project=GCP_PROJECT_ID, location=GCP_LOCATION)
-    except ImportError:
-        print("❌ vertexai package not installed. Run: pip install google-cloud-aiplatform")
-        USE_VERTEX_AI = False
-elif GEMINI_API_KEY:
-    print(f"🔑 Using Gemini API Key")
-    genai.configure(api_key=GEMINI_API_KEY)
+3. For "domain":
+   - Identify the PRIMARY technical domain based on skills and experience
+   - Use standard industry terms
+"""
+
+DEFAULT_RECOMMENDATIONS = {
+    "goal": "Focused Practice",
+    "target_level": "Entry Level",
+    "domain": "Software Development",
+    "reasoning": {
+        "goal_reason": "Default recommendation",
+        "level_reason": "Default recommendation",
+        "domain_reason": "Default recommendation"
+    }
+}
 
 
 def extract_name_from_resume(resume_text):
@@ -32,13 +45,11 @@ def extract_name_from_resume(resume_text):
     Handles various resume formats accurately.
     """
     # Check if API key is configured
-    if not GEMINI_API_KEY or GEMINI_API_KEY == 'your_gemini_api_key_here':
+    if not gemini_client.has_api_key():
         print("Gemini API key not configured, skipping AI extraction")
         return None
         
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
         prompt = f"""
 Extract ONLY the candidate's full name from this resume. 
 
@@ -50,18 +61,20 @@ RULES:
 - Return the name in proper case (Capital Letters)
 
 Resume text:
-{resume_text[:3000]}
+{resume_sections.name_context(resume_text)}
 
 Candidate's Full Name:"""
 
-        response = model.generate_content(prompt)
-        name = response.text.strip()
-        
-        # Clean up the response
-        name = name.replace('Full Name:', '').strip()
-        name = name.replace('Name:', '').strip()
+        def _generate():
+            name = gemini_client.generate_text(prompt, task='resume_name')
+            
+            # Clean up the response
+            name = name.replace('Full Name:', '').strip()
+            name = name.replace('Name:', '').strip()
+            
+            return name if name and len(name) > 2 else None
         
-        return name if name and len(name) > 2 else None
+        return llm_cache.get_or_generate('resume_name', gemini_client.DEFAULT_MODEL, prompt, _generate)
         
     except Exception as e:
         print(f"Error extracting name with Gemini: {e}")
@@ -76,7 +89,7 @@ def get_interview_recommendations(resume_data):
     3. Domain/Field
     """
     # Check if API key is configured
-    if not GEMINI_API_KEY or GEMINI_API_KEY == 'your_gemini_api_key_here':
+    if not gemini_client.has_api_key():
         print("Gemini API key not configured, returning defaults")
         return {
             "goal": "Focused Practice",
@@ -90,8 +103,6 @@ def get_interview_recommendations(resume_data):
         }
         
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
         # Prepare resume summary
         resume_summary = f"""
 Resume Data:
@@ -123,48 +134,58 @@ Based on this resume, provide recommendations in the following JSON format:
 }}
 
 RULES:
-1. For "goal":
-   - Recommend "Full Technical Interview" if candidate has 2+ years experience or multiple projects
-   - Recommend "Focused Practice" if candidate has 0-2 years experience or specific skill gaps
-   - Recommend "Quick Mock" if candidate is a fresher or student with limited experience
-
-2. For "target_level":
-   - "Entry Level": 0-2 years experience, recent graduate, or student
-   - "Mid Level": 2-5 years experience, multiple projects, diverse skills
-   - "Senior Level": 5+ years experience, leadership roles, advanced skills
-
-3. For "domain":
-   - Identify the PRIMARY technical domain based on skills and experience
-   - Use standard industry terms
-
+{RECOMMENDATION_RULES}
 Return ONLY the JSON object, no other text.
 """
 
-        response = model.generate_content(prompt)
-        result_text = response.text.strip()
+        def _generate():
+            # JSON mode + schema from llm_schemas; partial output is still usable
+            return gemini_client.generate_json(prompt, 'recommendations')
         
-        # Extract JSON from response (remove markdown if present)
-        if '```json' in result_text:
-            result_text = result_text.split('```json')[1].split('```')[0].strip()
-        elif '```' in result_text:
-            result_text = result_text.split('```')[1].split('```')[0].strip()
-        
-        recommendations = json.loads(result_text)
+        recommendations = llm_cache.get_or_generate('recommendations', gemini_client.DEFAULT_MODEL, prompt, _generate)
         return recommendations
         
     except Exception as e:
         print(f"Error getting recommendations with Gemini: {e}")
         # Return default recommendations
-        return {
-            "goal": "Focused Practice",
-            "target_level": "Entry Level",
-            "domain": "Software Development",
-            "reasoning": {
-                "goal_reason": "Default recommendation",
-                "level_reason": "Default recommendation",
-                "domain_reason": "Default recommendation"
-            }
-        }
+        return copy.deepcopy(DEFAULT_RECOMMENDATIONS)
+
+
+def is_default_recommendation(recommendations):
+    """True for the placeholder returned when Gemini could not be reached"""
+    reasoning = (recommendations or {}).get('reasoning') or {}
+    return reasoning.get('goal_reason') in ('Default recommendation', 'API key not configured')
+
+
+def clean_recommendations(value):
+    """
+    Validate the recommendations block returned with the resume extraction.
+    Returns None when the model left it out or it is unusable, so callers
+    know to ask for recommendations separately.
+    """
+    if not isinstance(value, dict) or not value.get('goal'):
+        return None
+    try:
+        return llm_schemas.validate('recommendations', value)
+    except llm_schemas.SchemaError:
+        return None
+
+
+def resume_prompt_text(resume_text):
+    """Resume text for the extraction prompt: the needed sections only, each within budget"""
+    if not getattr(settings, 'RESUME_PROMPT_SEGMENTATION', True):
+        return resume_text
+    text, stats = resume_sections.build_prompt_text(resume_text)
+    saved = stats['original_tokens'] - stats['prompt_tokens']
+    metrics.observe('resume.prompt_tokens', stats['prompt_tokens'])
+    metrics.observe('resume.prompt_tokens_saved', max(saved, 0))
+    if stats['segmented']:
+        print(f"✂️ Resume prompt: {stats['original_tokens']} -> {stats['prompt_tokens']} tokens "
+              f"(saved {saved}), sections {', '.join(stats['kept'])}"
+              f"{'; dropped ' + ', '.join(stats['dropped']) if stats['dropped'] else ''}")
+    else:
+        print(f"✂️ Resume prompt: no sections found, {stats['original_tokens']} -> {stats['prompt_tokens']} tokens")
+    return text
 
 
 def extract_all_resume_data(resume_text, email=None):
@@ -173,13 +194,12 @@ def extract_all_resume_data(resume_text, email=None):
     Returns complete structured data ready for database storage.
     """
     # Check if API key is configured
-    if not GEMINI_API_KEY or GEMINI_API_KEY == 'your_gemini_api_key_here':
+    if not gemini_client.has_api_key():
         print("Gemini API key not configured, using fallback extraction")
         return None
         
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
+        prompt_text = resume_prompt_text(resume_text)
         prompt = f"""
 You are an expert resume parser. Extract ALL information from this resume and return as valid JSON.
 
@@ -230,7 +250,18 @@ Extract the following:
   
   "languages": ["English", "Hindi"],
   
-  "key_strengths": ["strength 1", "strength 2", "strength 3"]
+  "key_strengths": ["strength 1", "strength 2", "strength 3"],
+  
+  "recommendations": {{
+    "goal": "Full Technical Interview" or "Focused Practice" or "Quick Mock",
+    "target_level": "Entry Level" or "Mid Level" or "Senior Level",
+    "domain": "primary technical domain, e.g. 'Full Stack Development', 'Data Science', 'Backend Development'",
+    "reasoning": {{
+      "goal_reason": "brief explanation for goal recommendation",
+      "level_reason": "brief explanation for level recommendation",
+      "domain_reason": "brief explanation for domain recommendation"
+    }}
+  }}
 }}
 
 RULES:
@@ -245,33 +276,33 @@ RULES:
 - certifications: Include courses, certificates, online courses
 - languages: Spoken/written languages
 - key_strengths: Top 3-5 technical/professional strengths
+- recommendations: Interview practice recommendations for this candidate:
+{RECOMMENDATION_RULES}
 
 Resume Text:
-{resume_text}
+{prompt_text}
 
 Return ONLY the JSON object:"""
 
-        response = model.generate_content(prompt)
-        result_text = response.text.strip()
-        
-        # Clean up response
-        if '```json' in result_text:
-            result_text = result_text.split('```json')[1].split('```')[0].strip()
-        elif '```' in result_text:
-            result_text = result_text.split('```')[1].split('```')[0].strip()
+        def _generate():
+            return gemini_client.generate_json(prompt, 'resume_extraction')
         
-        # Remove any leading/trailing text
-        start_idx = result_text.find('{')
-        end_idx = result_text.rfind('}') + 1
-        if start_idx != -1 and end_idx > start_idx:
-            result_text = result_text[start_idx:end_idx]
-        
-        extracted_data = json.loads(result_text)
+        extracted_data = llm_cache.get_or_generate('resume_extraction', gemini_client.DEFAULT_MODEL, prompt, _generate)
         print(f"✅ AI extracted name: {extracted_data.get('full_name')}")
         print(f"✅ AI extracted {len(extracted_data.get('skills', []))} skills")
         print(f"✅ AI extracted {len(extracted_data.get('education', []))} education entries")
         print(f"✅ AI extracted {len(extracted_data.get('experience', []))} experience entries")
         
+        # dict() drops the PartialDict marker, so read it first
+        partial = llm_schemas.is_partial(extracted_data)
+        if partial:
+            print("⚠️ AI extraction is incomplete (reply cut off or fields missing)")
+        extracted_data = dict(extracted_data)
+        extracted_data['partial'] = partial
+        extracted_data['recommendations'] = clean_recommendations(extracted_data.get('recommendations'))
+        if extracted_data['recommendations']:
+            print(f"✅ AI recommended: {extracted_data['recommendations']['goal']} / {extracted_data['recommendations']['target_level']}")
+        
         return extracted_data
         
     except Exception as e:
@@ -290,15 +321,20 @@ def analyze_interview_recording(video_file, participant_count=1):
     print("🎬 STARTING INTERVIEW ANALYSIS")
     print("="*80)
     
+    gemini_client.ensure_configured()
+    use_vertex_ai = gemini_client.USE_VERTEX_AI
+    
     # Check if either Vertex AI or API key is configured
-    if USE_VERTEX_AI:
+    if use_vertex_ai:
         if not GCP_PROJECT_ID:
             print("❌ FATAL: GCP_PROJECT_ID not configured for Vertex AI")
             return {
                 "error": "GCP_PROJECT_ID not configured. Please set it in .env file."
             }
         print(f"✅ Using Vertex AI: {GCP_PROJECT_ID} ({GCP_LOCATION})")
-    elif not GEMINI_API_KEY or GEMINI_API_KEY == 'your_gemini_api_key_here':
+    elif gemini_client.is_fake():
+        print(f"🧪 Using fake Gemini backend")
+    elif not gemini_client.has_api_key():
         print("❌ FATAL: Neither Vertex AI nor Gemini API key configured")
         return {
             "error": "API not configured. Set either USE_VERTEX_AI=true with GCP_PROJECT_ID, or GEMINI_API_KEY."
@@ -307,6 +343,9 @@ def analyze_interview_recording(video_file, participant_count=1):
         print(f"✅ Using API Key: {GEMINI_API_KEY[:20]}...")
     
     try:
+        # Skip the upload entirely while Gemini is failing; the except serves mock data
+        resilience.check(gemini_client.DEFAULT_MODEL, 'recording_analysis')
+        
         # Initialize variables
         gemini_file = None
         video_part = None
@@ -326,20 +365,20 @@ def analyze_interview_recording(video_file, participant_count=1):
         print(f"✅ Saved to temporary file: {temp_path}")
         
         # Step 2: Upload file (different method for Vertex AI vs API Key)
-        if USE_VERTEX_AI:
+        if use_vertex_ai:
             print(f"\n📤 UPLOADING TO VERTEX AI...")
-            from vertexai.generative_models import Part
             
             # For Vertex AI, we upload directly to GCS or use local file
-            video_part = Part.from_data(
-                data=open(temp_path, 'rb').read(),
-                mime_type=video_file.content_type or 'video/webm'
-            )
+            with open(temp_path, 'rb') as f:
+                video_part = gemini_client.vertex_part(
+                    data=f.read(),
+                    mime_type=video_file.content_type or 'video/webm'
+                )
             print(f"✅ Video loaded for Vertex AI!")
             
         else:
             print(f"\n📤 UPLOADING TO GEMINI API...")
-            gemini_file = genai.upload_file(
+            gemini_file = gemini_client.upload_file(
                 temp_path, 
                 mime_type=video_file.content_type or 'video/webm'
             )
@@ -358,7 +397,7 @@ def analyze_interview_recording(video_file, participant_count=1):
                 print(f"   ⏱️  Still processing... ({wait_time}s elapsed)")
                 time.sleep(5)
                 wait_time += 5
-                gemini_file = genai.get_file(gemini_file.name)
+                gemini_file = gemini_client.get_file(gemini_file.name)
                 
                 if wait_time > max_wait:
                     raise Exception("Video processing timeout (5 minutes exceeded)")
@@ -371,12 +410,6 @@ def analyze_interview_recording(video_file, participant_count=1):
         # Step 4: Generate analysis
         print(f"\n🤖 GENERATING AI ANALYSIS...")
         
-        if USE_VERTEX_AI:
-            from vertexai.generative_models import GenerativeModel
-            model = GenerativeModel('gemini-2.5-flash')
-        else:
-            model = genai.GenerativeModel('gemini-2.5-flash')
-        
         prompt = """
 Analyze this interview recording with EXTREME ACCURACY. Detect subtle behavioral cues and provide honest, evidence-based assessment.
 
@@ -568,59 +601,25 @@ Analyze this interview recording with EXTREME ACCURACY. Detect subtle behavioral
 
 Return ONLY the complete JSON object with ALL fields filled."""
         
-        # Send prompt with video (different for Vertex AI vs API Key)
-        if USE_VERTEX_AI:
-            response = model.generate_content([video_part, prompt])
+        # Send prompt with video (different for Vertex AI vs API Key).
+        # JSON mode output goes through the tolerant parser and schema
+        # validation, so fences, stray commas or a cut-off reply don't fail it.
+        if use_vertex_ai:
+            analysis_data = gemini_client.generate_json(
+                [video_part, prompt], 'recording_analysis', timeout=RECORDING_TIMEOUT, vertex=True
+            )
         else:
-            response = model.generate_content([prompt, gemini_file])
-            
-        print(f"✅ AI analysis generated!")
-        print(f"\n📄 RAW RESPONSE (first 500 chars):")
-        print(response.text[:500] + "..." if len(response.text) > 500 else response.text)
-        
-        # Step 5: Parse JSON response
-        print(f"\n🔧 PARSING JSON...")
-        import json
-        import re
-        
-        # Clean response text
-        response_text = response.text.strip()
-        
-        # Remove markdown code blocks if present
-        response_text = re.sub(r'^```json\s*', '', response_text)
-        response_text = re.sub(r'^```\s*', '', response_text)
-        response_text = re.sub(r'\s*```$', '', response_text)
-        
-        # Extract JSON
-        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-        if json_match:
-            json_text = json_match.group()
-            
-            # Additional cleaning for common AI JSON errors
-            # Remove trailing commas before closing braces/brackets
-            json_text = re.sub(r',(\s*[}\]])', r'\1', json_text)
-            # Remove comments (// or /* */)
-            json_text = re.sub(r'//.*?$', '', json_text, flags=re.MULTILINE)
-            json_text = re.sub(r'/\*.*?\*/', '', json_text, flags=re.DOTALL)
+            analysis_data = gemini_client.generate_json(
+                [prompt, gemini_file], 'recording_analysis', timeout=RECORDING_TIMEOUT
+            )
             
-            try:
-                analysis_data = json.loads(json_text)
-                print(f"✅ JSON parsed successfully!")
-                print(f"   - Emotion Trend: {analysis_data.get('emotion_trend', 'N/A')[:50]}...")
-                print(f"   - Confidence Score: {analysis_data.get('confidence_score', 'N/A')}")
-                print(f"   - Attention Level: {analysis_data.get('attention_level', 'N/A')}")
-                print(f"   - Suspicion Risk: {analysis_data.get('suspicion_risk', 'N/A')}")
-            except json.JSONDecodeError as e:
-                print(f"❌ JSON parsing failed: {e}")
-                print(f"📄 Cleaned JSON (first 1000 chars):")
-                print(json_text[:1000])
-                raise Exception(f"Invalid JSON from Gemini: {e}")
-        else:
-            print("❌ Could not extract JSON from response")
-            print(f"Response text: {response_text[:200]}")
-            raise Exception("Could not extract JSON from Gemini response")
+        print(f"✅ AI analysis generated and parsed!")
+        print(f"   - Emotion Trend: {str(analysis_data.get('emotion_trend', 'N/A'))[:50]}...")
+        print(f"   - Confidence Score: {analysis_data.get('confidence_score', 'N/A')}")
+        print(f"   - Attention Level: {analysis_data.get('attention_level', 'N/A')}")
+        print(f"   - Suspicion Risk: {analysis_data.get('suspicion_risk', 'N/A')}")
         
-        # Step 6: Add ranking data
+        # Step 5: Add ranking data
         analysis_data['ranking_position'] = 1
         analysis_data['total_participants'] = participant_count
         
@@ -640,7 +639,7 @@ Return ONLY the complete JSON object with ALL fields filled."""
         
         analysis_data['percentile_band'] = percentile_band
         
-        # Step 7: Clean up temporary file
+        # Step 6: Clean up temporary file
         import os
         try:
             os.remove(temp_path)
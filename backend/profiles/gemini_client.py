@@ -0,0 +1,322 @@
+"""
+Shared Gemini client layer.
+
+Every Gemini call in the app goes through this module. It configures the SDK
+once per process, keeps one GenerativeModel instance per model name (the SDK
+client underneath holds a persistent gRPC channel / keep-alive HTTP session,
+so TLS handshakes are not repeated per request), caps the number of
+concurrent calls a worker can make to each model and runs every call under
+a deadline, retries and a circuit breaker (profiles/resilience.py).
+
+Settings (environment):
+    GEMINI_API_KEY          API key for the Gemini API
+    USE_VERTEX_AI           'true' to use Vertex AI (GCP_PROJECT_ID/GCP_LOCATION)
+    GEMINI_TRANSPORT        SDK transport: grpc (default) or rest
+    GEMINI_TIMEOUT          default deadline per call in seconds, retries included
+                            (default 60; per-task deadlines in LLM_TASK_DEADLINES)
+    GEMINI_MAX_CONCURRENCY  concurrent calls per model per worker (default 8)
+    GEMINI_MAX_ASYNC_CONCURRENCY
+                            concurrent awaited calls per model per event loop
+                            (default 200, used by the ASGI views)
+    GEMINI_BACKEND          google (default) or fake - the local stand-in in
+                            profiles/fake_gemini.py, for load tests and
+                            offline development
+"""
+import asyncio
+import os
+import threading
+import weakref
+import google.generativeai as genai
+from dotenv import load_dotenv
+from . import fake_gemini, llm_schemas, resilience
+
+load_dotenv()
+
+GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+USE_VERTEX_AI = os.getenv('USE_VERTEX_AI', 'false').lower() == 'true'
+GCP_PROJECT_ID = os.getenv('GCP_PROJECT_ID')
+GCP_LOCATION = os.getenv('GCP_LOCATION', 'us-central1')
+GEMINI_TRANSPORT = os.getenv('GEMINI_TRANSPORT') or None
+GEMINI_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT', '60'))
+GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '8'))
+GEMINI_MAX_ASYNC_CONCURRENCY = int(os.getenv('GEMINI_MAX_ASYNC_CONCURRENCY', '200'))
+GEMINI_BACKEND = os.getenv('GEMINI_BACKEND', 'google').lower()
+
+DEFAULT_MODEL = 'gemini-2.5-flash'
+INTERVIEW_MODEL = 'gemini-1.5-flash'
+
+_configured = False
+_config_lock = threading.Lock()
+_models = {}
+_models_lock = threading.Lock()
+_semaphores = {}
+# asyncio semaphores belong to one event loop, so keep a set per loop
+_async_semaphores = weakref.WeakKeyDictionary()
+
+
+class GeminiBusyError(Exception):
+    """Raised when no concurrency slot frees up before the request timeout"""
+
+
+def is_fake():
+    """True when calls go to the local fake backend instead of Google"""
+    return GEMINI_BACKEND == 'fake'
+
+
+def has_api_key():
+    if is_fake():
+        return True
+    return bool(GEMINI_API_KEY) and GEMINI_API_KEY != 'your_gemini_api_key_here'
+
+
+def is_configured():
+    """True when either Vertex AI or a real API key is set up"""
+    return (USE_VERTEX_AI and bool(GCP_PROJECT_ID)) or has_api_key()
+
+
+def ensure_configured():
+    """Configure the SDK exactly once per process"""
+    global _configured, USE_VERTEX_AI
+    if _configured:
+        return
+    with _config_lock:
+        if _configured:
+            return
+        if is_fake():
+            print(f"🧪 Using fake Gemini backend (no Google API calls)")
+            _configured = True
+            return
+        if USE_VERTEX_AI:
+            print(f"🔵 Using Vertex AI (Project: {GCP_PROJECT_ID}, Location: {GCP_LOCATION})")
+            try:
+                import vertexai
+                vertexai.init(project=GCP_PROJECT_ID, location=GCP_LOCATION)
+            except ImportError:
+                print("❌ vertexai package not installed. Run: pip install google-cloud-aiplatform")
+                USE_VERTEX_AI = False
+        if GEMINI_API_KEY:
+            print(f"🔑 Using Gemini API Key")
+            genai.configure(api_key=GEMINI_API_KEY, transport=GEMINI_TRANSPORT)
+        _configured = True
+
+
+def get_model(model_name=DEFAULT_MODEL, vertex=False):
+    """Return the pooled model instance for `model_name`"""
+    ensure_configured()
+    key = (model_name, vertex)
+    model = _models.get(key)
+    if model is None:
+        with _models_lock:
+            model = _models.get(key)
+            if model is None:
+                if is_fake():
+                    model = fake_gemini.GenerativeModel(model_name)
+                elif vertex:
+                    from vertexai.generative_models import GenerativeModel
+                    model = GenerativeModel(model_name)
+                else:
+                    model = genai.GenerativeModel(model_name)
+                _models[key] = model
+                _semaphores[key] = threading.BoundedSemaphore(GEMINI_MAX_CONCURRENCY)
+    return model
+
+
+def _acquire(semaphore, model_name, timeout):
+    if not semaphore.acquire(timeout=timeout):
+        raise GeminiBusyError(f"No free Gemini slot for {model_name} within {timeout:.1f}s")
+
+
+def generate_content(contents, model_name=DEFAULT_MODEL, timeout=None, vertex=False, task='default', **kwargs):
+    """
+    Call `generate_content` on the pooled model, holding one of the model's
+    concurrency slots for each attempt. `timeout` is the deadline for the
+    whole call including retries (default: the task's deadline, see
+    profiles/resilience.py).
+    """
+    model = get_model(model_name, vertex=vertex)
+    semaphore = _semaphores[(model_name, vertex)]
+
+    def _attempt(remaining):
+        _acquire(semaphore, model_name, remaining)
+        try:
+            if vertex:
+                # The Vertex SDK has no per-request options; it uses its own deadlines
+                return model.generate_content(contents, **kwargs)
+            return model.generate_content(contents, request_options={'timeout': remaining}, **kwargs)
+        finally:
+            semaphore.release()
+
+    deadline = timeout or resilience.deadline_for(task, GEMINI_TIMEOUT)
+    return resilience.call(model_name, task, _attempt, deadline)
+
+
+def generate_text(prompt, model_name=DEFAULT_MODEL, timeout=None, task='default', **kwargs):
+    """Generate content for a text prompt and return the stripped response text"""
+    response = generate_content(prompt, model_name=model_name, timeout=timeout, task=task, **kwargs)
+    return response.text.strip()
+
+
+def generate_json(contents, task, model_name=DEFAULT_MODEL, timeout=None, vertex=False, **kwargs):
+    """
+    Generate `task`'s structured output in JSON mode (schema from
+    llm_schemas.py) and return the parsed, validated value
+    """
+    response = generate_content(
+        contents, model_name=model_name, timeout=timeout, vertex=vertex, task=task,
+        generation_config=llm_schemas.generation_config(task), **kwargs
+    )
+    return llm_schemas.parse_response(task, response.text)
+
+
+def stream_text(prompt, model_name=DEFAULT_MODEL, timeout=None, task='default', **kwargs):
+    """
+    Stream a text response chunk by chunk (Gemini streaming mode). The
+    model's concurrency slot is held until the stream is exhausted or closed.
+    Opening the stream (up to the first chunk) is retried like any other
+    call; a failure mid-stream is not, since text has already been sent.
+    """
+    model = get_model(model_name)
+    semaphore = _semaphores[(model_name, False)]
+    breaker = resilience.get_breaker(model_name, task)
+
+    def _open(remaining):
+        _acquire(semaphore, model_name, remaining)
+        try:
+            response = iter(model.generate_content(
+                prompt, stream=True, request_options={'timeout': remaining}, **kwargs
+            ))
+            return response, next(response, None)
+        except BaseException:
+            semaphore.release()
+            raise
+
+    deadline = timeout or resilience.deadline_for(task, GEMINI_TIMEOUT)
+    response, first = resilience.call(model_name, task, _open, deadline, record_success=False)
+    finished = False
+    try:
+        if first is not None:
+            if first.text:
+                yield first.text
+            for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+        finished = True
+    except Exception:
+        breaker.record_failure()
+        raise
+    finally:
+        semaphore.release()
+        if finished:
+            breaker.record_success()
+        else:
+            breaker.release()
+
+
+def _async_semaphore(model_name):
+    loop = asyncio.get_running_loop()
+    semaphores = _async_semaphores.setdefault(loop, {})
+    semaphore = semaphores.get(model_name)
+    if semaphore is None:
+        semaphore = semaphores[model_name] = asyncio.Semaphore(GEMINI_MAX_ASYNC_CONCURRENCY)
+    return semaphore
+
+
+async def _acquire_async(semaphore, model_name, timeout):
+    try:
+        await asyncio.wait_for(semaphore.acquire(), timeout)
+    except asyncio.TimeoutError:
+        raise GeminiBusyError(f"No free Gemini slot for {model_name} within {timeout:.1f}s")
+
+
+async def generate_content_async(contents, model_name=DEFAULT_MODEL, timeout=None, task='default', **kwargs):
+    """
+    Awaitable `generate_content` on the pooled model (Gemini API only). The
+    SDK's async client runs over grpc_asyncio, so GEMINI_TRANSPORT must not
+    be 'rest' when the async views are in use.
+    """
+    model = get_model(model_name)
+    semaphore = _async_semaphore(model_name)
+
+    async def _attempt(remaining):
+        await _acquire_async(semaphore, model_name, remaining)
+        try:
+            return await model.generate_content_async(contents, request_options={'timeout': remaining}, **kwargs)
+        finally:
+            semaphore.release()
+
+    deadline = timeout or resilience.deadline_for(task, GEMINI_TIMEOUT)
+    return await resilience.call_async(model_name, task, _attempt, deadline)
+
+
+async def generate_text_async(prompt, model_name=DEFAULT_MODEL, timeout=None, task='default', **kwargs):
+    response = await generate_content_async(prompt, model_name=model_name, timeout=timeout, task=task, **kwargs)
+    return response.text.strip()
+
+
+async def stream_text_async(prompt, model_name=DEFAULT_MODEL, timeout=None, task='default', **kwargs):
+    """Async counterpart of stream_text"""
+    model = get_model(model_name)
+    semaphore = _async_semaphore(model_name)
+    breaker = resilience.get_breaker(model_name, task)
+
+    async def _open(remaining):
+        await _acquire_async(semaphore, model_name, remaining)
+        try:
+            response = await model.generate_content_async(
+                prompt, stream=True, request_options={'timeout': remaining}, **kwargs
+            )
+            response = response.__aiter__()
+            try:
+                first = await response.__anext__()
+            except StopAsyncIteration:
+                first = None
+            return response, first
+        except BaseException:
+            semaphore.release()
+            raise
+
+    deadline = timeout or resilience.deadline_for(task, GEMINI_TIMEOUT)
+    response, first = await resilience.call_async(model_name, task, _open, deadline, record_success=False)
+    finished = False
+    try:
+        if first is not None:
+            if first.text:
+                yield first.text
+            async for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+        finished = True
+    except Exception:
+        breaker.record_failure()
+        raise
+    finally:
+        semaphore.release()
+        if finished:
+            breaker.record_success()
+        else:
+            breaker.release()
+
+
+def upload_file(path, mime_type=None):
+    """Upload a media file to the Gemini File API"""
+    ensure_configured()
+    if is_fake():
+        return fake_gemini.upload_file(path, mime_type=mime_type)
+    return genai.upload_file(path, mime_type=mime_type)
+
+
+def get_file(name):
+    """Refresh a File API handle (used to poll processing state)"""
+    ensure_configured()
+    if is_fake():
+        return fake_gemini.get_file(name)
+    return genai.get_file(name)
+
+
+def vertex_part(data, mime_type):
+    """Wrap raw bytes as a Vertex AI content part"""
+    ensure_configured()
+    if is_fake():
+        return fake_gemini.Part.from_data(data=data, mime_type=mime_type)
+    from vertexai.generative_models import Part
+    return Part.from_data(data=data, mime_type=mime_type)
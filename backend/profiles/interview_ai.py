@@ -1,21 +1,25 @@
-import os
-import google.generativeai as genai
-from dotenv import load_dotenv
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from . import llm_cache, metrics, prompt_budget
+from . import gemini_client
+from .gemini_client import INTERVIEW_MODEL
 
-load_dotenv()
+# Canned interviewer text used whenever Gemini is unavailable
+FALLBACK_QUESTION = "Can you tell me about your experience with the key technologies in your domain?"
+FALLBACK_ANALYSIS = "The candidate provided a response. Let's continue with the next question."
+FALLBACK_FINAL_MESSAGE = "Thank you for your time today. We'll be in touch soon regarding the next steps. Have a great day!"
 
-# Configure Gemini API
-genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
 
-def generate_interview_question(conversation_history, user_profile, current_round, previous_answer=None):
-    """
-    Generate dynamic interview questions based on conversation history and user answers
-    """
-    model = genai.GenerativeModel('gemini-1.5-flash')
-    
+def fallback_transition(next_round):
+    return f"Thank you for your responses. Let's move on to the {next_round} round."
+
+
+def build_question_prompt(conversation_history, user_profile, current_round, previous_answer=None):
+    """Build the prompt for the next interview question"""
     # Build context from conversation history
     context = f"""You are an expert technical interviewer conducting a {current_round} interview.
-    
+
 User Profile:
 - Skills: {user_profile.get('skills', 'Not specified')}
 - Experience: {user_profile.get('experience', 'Not specified')}
@@ -33,28 +37,50 @@ Conversation History:
 {conversation_history}
 
 """
-    
+
     if previous_answer:
         context += f"\nCandidate's last answer: {previous_answer}\n"
         prompt = "Based on the candidate's answer, generate a relevant follow-up question or move to a new topic within this round. Keep the question conversational and challenging."
     else:
         prompt = f"Generate the first question for the {current_round} round. Make it engaging and appropriate for the candidate's profile."
-    
-    try:
-        response = model.generate_content(context + prompt)
-        return response.text.strip()
-    except Exception as e:
-        print(f"Error generating question: {e}")
-        return f"Can you tell me about your experience with the key technologies in your domain?"
 
+    return context + prompt
 
-def analyze_answer(question, answer, context):
+
+def _fit_question_prompt(user_profile, current_round, previous_answer):
+    """Clip the last answer and work out how many tokens the history may use"""
+    if previous_answer:
+        previous_answer = prompt_budget.truncate_to_tokens(
+            str(previous_answer), getattr(settings, 'INTERVIEW_ANSWER_MAX_TOKENS', 600)
+        )
+    skeleton = build_question_prompt('', user_profile, current_round, previous_answer)
+    budget = getattr(settings, 'INTERVIEW_PROMPT_TOKEN_BUDGET', 2000)
+    return previous_answer, max(0, budget - prompt_budget.estimate_tokens(skeleton))
+
+
+def _record_prompt_size(prompt):
+    metrics.observe('interview_question.prompt_tokens', prompt_budget.estimate_tokens(prompt))
+    return prompt
+
+
+def build_budgeted_question_prompt(conversation_history, user_profile, current_round, previous_answer=None, session_id=None):
     """
-    Analyze candidate's answer and provide insights
+    Question prompt for the client's message list, kept within
+    INTERVIEW_PROMPT_TOKEN_BUDGET (see profiles/prompt_budget.py)
     """
-    model = genai.GenerativeModel('gemini-1.5-flash')
-    
-    prompt = f"""As an expert interviewer, analyze this candidate's response:
+    previous_answer, history_budget = _fit_question_prompt(user_profile, current_round, previous_answer)
+    history = prompt_budget.build_history(conversation_history, history_budget, session_id)
+    return _record_prompt_size(build_question_prompt(history, user_profile, current_round, previous_answer))
+
+
+async def build_budgeted_question_prompt_async(conversation_history, user_profile, current_round, previous_answer=None, session_id=None):
+    previous_answer, history_budget = _fit_question_prompt(user_profile, current_round, previous_answer)
+    history = await prompt_budget.build_history_async(conversation_history, history_budget, session_id)
+    return _record_prompt_size(build_question_prompt(history, user_profile, current_round, previous_answer))
+
+
+def build_analysis_prompt(question, answer, context):
+    return f"""As an expert interviewer, analyze this candidate's response:
 
 Question: {question}
 Answer: {answer}
@@ -67,22 +93,10 @@ Provide a brief analysis (2-3 sentences) covering:
 3. Suggested follow-up areas
 
 Keep it concise and professional."""
-    
-    try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
-    except Exception as e:
-        print(f"Error analyzing answer: {e}")
-        return "The candidate provided a response. Let's continue with the next question."
 
 
-def generate_round_transition(current_round, next_round, performance_summary):
-    """
-    Generate natural transition between interview rounds
-    """
-    model = genai.GenerativeModel('gemini-1.5-flash')
-    
-    prompt = f"""You are an interviewer transitioning from {current_round} to {next_round}.
+def build_transition_prompt(current_round, next_round, performance_summary):
+    return f"""You are an interviewer transitioning from {current_round} to {next_round}.
 
 Performance in {current_round}: {performance_summary}
 
@@ -92,35 +106,213 @@ Generate a brief, encouraging transition statement (1-2 sentences) that:
 - Keeps them motivated
 
 Keep it conversational and professional."""
-    
+
+
+def build_final_prompt(overall_performance):
+    return f"""As an interviewer concluding the interview, generate a brief closing message (2-3 sentences).
+
+Overall Performance Summary: {overall_performance}
+
+The message should:
+- Thank them professionally
+- Be encouraging
+- Indicate next steps will be communicated
+
+Keep it warm and professional."""
+
+
+def _generate(namespace, prompt):
+    return llm_cache.get_or_generate(
+        namespace, INTERVIEW_MODEL, prompt,
+        lambda: gemini_client.generate_text(prompt, model_name=INTERVIEW_MODEL, task=namespace)
+    )
+
+
+async def _generate_async(namespace, prompt):
+    async def _call():
+        return await gemini_client.generate_text_async(prompt, model_name=INTERVIEW_MODEL, task=namespace)
+
+    return await llm_cache.get_or_generate_async(namespace, INTERVIEW_MODEL, prompt, _call)
+
+
+def generate_interview_question(conversation_history, user_profile, current_round, previous_answer=None, session_id=None):
+    """
+    Generate dynamic interview questions based on conversation history and user answers.
+    `conversation_history` is the client's message list.
+    """
+    try:
+        prompt = build_budgeted_question_prompt(
+            conversation_history, user_profile, current_round, previous_answer, session_id
+        )
+        return _generate('interview_question', prompt)
+    except Exception as e:
+        print(f"Error generating question: {e}")
+        return FALLBACK_QUESTION
+
+
+def analyze_answer(question, answer, context):
+    """
+    Analyze candidate's answer and provide insights
+    """
+    prompt = build_analysis_prompt(question, answer, context)
+
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        return _generate('interview_analysis', prompt)
+    except Exception as e:
+        print(f"Error analyzing answer: {e}")
+        return FALLBACK_ANALYSIS
+
+
+def generate_round_transition(current_round, next_round, performance_summary):
+    """
+    Generate natural transition between interview rounds
+    """
+    prompt = build_transition_prompt(current_round, next_round, performance_summary)
+
+    try:
+        return _generate('interview_transition', prompt)
     except Exception as e:
         print(f"Error generating transition: {e}")
-        return f"Thank you for your responses. Let's move on to the {next_round} round."
+        return fallback_transition(next_round)
 
 
 def generate_final_message(overall_performance):
     """
     Generate concluding interview message
     """
-    model = genai.GenerativeModel('gemini-1.5-flash')
-    
-    prompt = f"""As an interviewer concluding the interview, generate a brief closing message (2-3 sentences).
+    prompt = build_final_prompt(overall_performance)
 
-Overall Performance Summary: {overall_performance}
+    try:
+        return _generate('interview_final', prompt)
+    except Exception as e:
+        print(f"Error generating final message: {e}")
+        return FALLBACK_FINAL_MESSAGE
 
-The message should:
-- Thank them professionally
-- Be encouraging
-- Indicate next steps will be communicated
 
-Keep it warm and professional."""
-    
+# Async variants used by the ASGI views: same prompts and fallbacks, but the
+# Gemini call is awaited so the event loop can serve other requests meanwhile.
+
+async def generate_interview_question_async(conversation_history, user_profile, current_round, previous_answer=None, session_id=None):
+    try:
+        prompt = await build_budgeted_question_prompt_async(
+            conversation_history, user_profile, current_round, previous_answer, session_id
+        )
+        return await _generate_async('interview_question', prompt)
+    except Exception as e:
+        print(f"Error generating question: {e}")
+        return FALLBACK_QUESTION
+
+
+async def analyze_answer_async(question, answer, context):
+    prompt = build_analysis_prompt(question, answer, context)
+
+    try:
+        return await _generate_async('interview_analysis', prompt)
+    except Exception as e:
+        print(f"Error analyzing answer: {e}")
+        return FALLBACK_ANALYSIS
+
+
+async def generate_round_transition_async(current_round, next_round, performance_summary):
+    prompt = build_transition_prompt(current_round, next_round, performance_summary)
+
+    try:
+        return await _generate_async('interview_transition', prompt)
+    except Exception as e:
+        print(f"Error generating transition: {e}")
+        return fallback_transition(next_round)
+
+
+async def generate_final_message_async(overall_performance):
+    prompt = build_final_prompt(overall_performance)
+
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        return await _generate_async('interview_final', prompt)
     except Exception as e:
         print(f"Error generating final message: {e}")
-        return "Thank you for your time today. We'll be in touch soon regarding the next steps. Have a great day!"
+        return FALLBACK_FINAL_MESSAGE
+
+
+# Streaming variants: yield the question as Gemini produces it so the client
+# can render it within the first few hundred milliseconds. Time-to-first-token
+# is recorded as the interview_question.ttft_ms metric.
+
+class Replacement(str):
+    """
+    A whole question that replaces the chunks streamed so far, yielded when
+    the upstream fails after the client already has part of a question
+    """
+
+
+def stream_interview_question(conversation_history, user_profile, current_round, previous_answer=None, session_id=None):
+    """
+    Generate the next interview question, yielding text chunks as they arrive
+    """
+    chunks = []
+    try:
+        prompt = build_budgeted_question_prompt(
+            conversation_history, user_profile, current_round, previous_answer, session_id
+        )
+        cache_key = llm_cache.make_key(INTERVIEW_MODEL, prompt)
+        cached = llm_cache.lookup('interview_question', cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        started = time.monotonic()
+        for chunk in gemini_client.stream_text(prompt, model_name=INTERVIEW_MODEL, task='interview_question'):
+            if not chunks:
+                chunk = chunk.lstrip()
+                if not chunk:
+                    continue
+                metrics.observe('interview_question.ttft_ms', (time.monotonic() - started) * 1000)
+            chunks.append(chunk)
+            yield chunk
+    except Exception as e:
+        print(f"Error streaming question: {e}")
+        yield _stream_fallback(chunks)
+        return
+
+    metrics.observe('interview_question.stream_total_ms', (time.monotonic() - started) * 1000)
+    llm_cache.store('interview_question', cache_key, ''.join(chunks).strip(), model_name=INTERVIEW_MODEL)
+
+
+async def stream_interview_question_async(conversation_history, user_profile, current_round, previous_answer=None, session_id=None):
+    chunks = []
+    try:
+        prompt = await build_budgeted_question_prompt_async(
+            conversation_history, user_profile, current_round, previous_answer, session_id
+        )
+        cache_key = llm_cache.make_key(INTERVIEW_MODEL, prompt)
+        cached = await sync_to_async(llm_cache.lookup)('interview_question', cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        started = time.monotonic()
+        async for chunk in gemini_client.stream_text_async(prompt, model_name=INTERVIEW_MODEL, task='interview_question'):
+            if not chunks:
+                chunk = chunk.lstrip()
+                if not chunk:
+                    continue
+                metrics.observe('interview_question.ttft_ms', (time.monotonic() - started) * 1000)
+            chunks.append(chunk)
+            yield chunk
+    except Exception as e:
+        print(f"Error streaming question: {e}")
+        yield _stream_fallback(chunks)
+        return
+
+    metrics.observe('interview_question.stream_total_ms', (time.monotonic() - started) * 1000)
+    await sync_to_async(llm_cache.store)(
+        'interview_question', cache_key, ''.join(chunks).strip(), model_name=INTERVIEW_MODEL
+    )
+
+
+def _stream_fallback(chunks):
+    metrics.incr('interview_question.stream_fallbacks')
+    if not chunks:
+        return FALLBACK_QUESTION
+    # The client holds a cut-off question: have it replace that
+    metrics.incr('interview_question.stream_replacements')
+    return Replacement(FALLBACK_QUESTION)
@@ -1,8 +1,14 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
-from .interview_ai import generate_interview_question, analyze_answer, generate_round_transition, generate_final_message
+from django.views.decorators.http import require_POST
+from .interview_ai import (
+    generate_interview_question, analyze_answer, generate_round_transition, generate_final_message,
+    generate_interview_question_async, analyze_answer_async, generate_round_transition_async,
+    generate_final_message_async, stream_interview_question, stream_interview_question_async, Replacement,
+)
 import json
 
 
@@ -20,17 +26,13 @@ def generate_question(request):
         current_round = data.get('current_round', 'Technical')
         previous_answer = data.get('previous_answer', None)
         
-        # Format conversation history
-        history_text = "\n".join([
-            f"{'AI' if msg['type'] == 'ai' else 'Candidate'}: {msg['message']}"
-            for msg in conversation_history[-10:]  # Last 10 messages for context
-        ])
-        
+        # The prompt builder summarises older turns to stay within the token budget
         question = generate_interview_question(
-            history_text,
+            conversation_history,
             user_profile,
             current_round,
-            previous_answer
+            previous_answer,
+            session_id=data.get('session_id')
         )
         
         return Response({
@@ -131,3 +133,212 @@ def conclude_interview(request):
             'error': str(e),
             'message': 'Thank you for your time today!'
         }, status=500)
+
+
+# ---------------------------------------------------------------------------
+# Async (ASGI) versions of the endpoints above.
+#
+# DRF's @api_view does not support coroutine views, so these are plain Django
+# async views with the same request/response contract. They are routed in
+# place of the sync views when the app runs under ASGI (see backend/asgi.py
+# and ASGI_MODE in settings): each awaits Gemini instead of holding a worker
+# thread, so one process can keep many interviews in flight.
+# ---------------------------------------------------------------------------
+
+def _json_body(request):
+    try:
+        return json.loads(request.body or b'{}')
+    except ValueError:
+        return {}
+
+
+@csrf_exempt
+@require_POST
+async def generate_question_async(request):
+    """
+    Generate dynamic interview question using Gemini AI (async)
+    """
+    data = _json_body(request)
+    current_round = data.get('current_round', 'Technical')
+    try:
+        question = await generate_interview_question_async(
+            data.get('conversation_history', []),
+            data.get('user_profile', {}),
+            current_round,
+            data.get('previous_answer', None),
+            session_id=data.get('session_id')
+        )
+        
+        return JsonResponse({
+            'success': True,
+            'question': question,
+            'round': current_round
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e),
+            'question': 'Can you tell me about a challenging project you worked on?'
+        }, status=500)
+
+
+@csrf_exempt
+@require_POST
+async def analyze_response_async(request):
+    """
+    Analyze candidate's answer using Gemini AI (async)
+    """
+    data = _json_body(request)
+    try:
+        analysis = await analyze_answer_async(
+            data.get('question', ''),
+            data.get('answer', ''),
+            data.get('context', '')
+        )
+        
+        return JsonResponse({
+            'success': True,
+            'analysis': analysis
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e),
+            'analysis': 'Response recorded.'
+        }, status=500)
+
+
+@csrf_exempt
+@require_POST
+async def transition_round_async(request):
+    """
+    Generate transition message between rounds (async)
+    """
+    data = _json_body(request)
+    next_round = data.get('next_round', '')
+    try:
+        transition = await generate_round_transition_async(
+            data.get('current_round', ''),
+            next_round,
+            data.get('performance_summary', 'Good performance')
+        )
+        
+        return JsonResponse({
+            'success': True,
+            'message': transition
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e),
+            'message': f"Let's move on to the {next_round} round."
+        }, status=500)
+
+
+@csrf_exempt
+@require_POST
+async def conclude_interview_async(request):
+    """
+    Generate final interview message (async)
+    """
+    data = _json_body(request)
+    try:
+        final_message = await generate_final_message_async(
+            data.get('overall_performance', 'Thank you for participating')
+        )
+        
+        return JsonResponse({
+            'success': True,
+            'message': final_message
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e),
+            'message': 'Thank you for your time today!'
+        }, status=500)
+
+
+# ---------------------------------------------------------------------------
+# Streaming (Server-Sent Events) question endpoint.
+#
+# POST /api/interview/ai/question/stream/ takes the same body as
+# /api/interview/ai/question/ and responds with text/event-stream:
+#
+#   event: token   data: {"text": "<chunk>"}          (repeated)
+#   event: replace data: {"text": "<full text>"}      (the stream broke mid-question:
+#                                                      discard the tokens so far)
+#   event: done    data: {"success": true, "question": "<full text>", "round": "..."}
+# ---------------------------------------------------------------------------
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _sse_response(events):
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop proxies from buffering the stream
+    return response
+
+
+@csrf_exempt
+@require_POST
+def generate_question_stream(request):
+    """
+    Stream the next interview question token by token as SSE
+    """
+    data = _json_body(request)
+    current_round = data.get('current_round', 'Technical')
+    
+    def events():
+        parts = []
+        for chunk in stream_interview_question(
+            data.get('conversation_history', []),
+            data.get('user_profile', {}),
+            current_round,
+            data.get('previous_answer', None),
+            session_id=data.get('session_id')
+        ):
+            if isinstance(chunk, Replacement):
+                parts = [chunk]
+                yield _sse('replace', {'text': str(chunk)})
+                continue
+            parts.append(chunk)
+            yield _sse('token', {'text': chunk})
+        yield _sse('done', {'success': True, 'question': ''.join(parts).strip(), 'round': current_round})
+    
+    return _sse_response(events())
+
+
+@csrf_exempt
+@require_POST
+async def generate_question_stream_async(request):
+    """
+    Stream the next interview question token by token as SSE (async)
+    """
+    data = _json_body(request)
+    current_round = data.get('current_round', 'Technical')
+    
+    async def events():
+        parts = []
+        async for chunk in stream_interview_question_async(
+            data.get('conversation_history', []),
+            data.get('user_profile', {}),
+            current_round,
+            data.get('previous_answer', None),
+            session_id=data.get('session_id')
+        ):
+            if isinstance(chunk, Replacement):
+                parts = [chunk]
+                yield _sse('replace', {'text': str(chunk)})
+                continue
+            parts.append(chunk)
+            yield _sse('token', {'text': chunk})
+        yield _sse('done', {'success': True, 'question': ''.join(parts).strip(), 'round': current_round})
+    
+    return _sse_response(events())
@@ -0,0 +1,220 @@
+"""
+Incremental, tolerant JSON parser for model output.
+
+Gemini's JSON is usually valid, but not always: it may wrap it in ```json
+fences or prose, leave trailing commas or // comments, use single quotes or
+bare keys, or get cut off at the output token limit. Rather than regex
+cleanup followed by an all-or-nothing json.loads, this parser reads the text
+one character at a time, skips whatever precedes the first { or [, tolerates
+those mistakes and can hand back the object built so far at any point.
+
+    parser = JSONStreamParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+        partial = parser.value      # everything parsed so far
+    value, complete = parser.finish()
+
+`complete` is False when the text ended before the top-level value closed;
+`value` then holds every field that was fully read. A string or number that
+was cut off mid-way is dropped, and so is an array item (object or array)
+that was still open.
+"""
+import json
+
+_WHITESPACE = ' \t\r\n'
+_STRUCTURAL = '{}[]:,'
+
+
+def _literal(raw):
+    """Value of a bare token: JSON literal, number, or the text itself"""
+    lowered = raw.lower()
+    if lowered == 'true':
+        return True
+    if lowered == 'false':
+        return False
+    if lowered in ('null', 'none'):
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+class JSONStreamParser:
+    def __init__(self):
+        self.value = None
+        self.started = False
+        self.done = False
+        # Containers being filled; each frame is [container, pending key, saw colon]
+        self._stack = []
+        # Tokenizer state
+        self._string = None  # list of chars while inside a string
+        self._quote = None
+        self._escape = None  # None, '' (after backslash) or the \u digits so far
+        self._bare = None  # chars of a number / literal / bare key
+        self._comment = None  # 'line' or 'block'
+        self._prev = ''
+
+    # -- public API ---------------------------------------------------------
+
+    def feed(self, text):
+        """Consume more text; returns the value parsed so far"""
+        for ch in text:
+            if self.done:
+                break
+            self._char(ch)
+        return self.value
+
+    def finish(self):
+        """
+        Flush the input. Returns (value, complete). When the input was cut
+        off, the unterminated string or number is discarded, as are open
+        array items; open objects keep the fields they already had.
+        """
+        if not self.done:
+            # Either could be a prefix of the real value ("Jo" of "John", 12 of 120)
+            self._string = None
+            self._bare = None
+            for depth in range(len(self._stack) - 1, 0, -1):
+                parent = self._stack[depth - 1][0]
+                if isinstance(parent, list) and parent and parent[-1] is self._stack[depth][0]:
+                    parent.pop()
+        complete = self.done
+        self._stack = []
+        self.done = True
+        return self.value, complete
+
+    # -- tokenizer ----------------------------------------------------------
+
+    def _char(self, ch):
+        prev, self._prev = self._prev, ch
+        if self._comment == 'line':
+            if ch == '\n':
+                self._comment = None
+            return
+        if self._comment == 'block':
+            if prev == '*' and ch == '/':
+                self._comment = None
+                self._prev = ''
+            return
+        if self._string is not None:
+            self._string_char(ch)
+            return
+        if not self.started:
+            # Skip prose and ```json fences before the document
+            if ch in '{[':
+                self.started = True
+            else:
+                return
+
+        if ch == '/':
+            self._flush_bare()
+            if prev == '/':
+                self._comment = 'line'
+            return
+        if ch == '*' and prev == '/':
+            self._comment = 'block'
+            self._prev = ''
+            return
+
+        if ch in '"\'':
+            self._flush_bare()
+            self._string, self._quote = [], ch
+        elif ch in _STRUCTURAL:
+            self._flush_bare()
+            self._structural(ch)
+        elif ch in _WHITESPACE:
+            self._flush_bare()
+        else:
+            if self._bare is None:
+                self._bare = []
+            self._bare.append(ch)
+
+    def _string_char(self, ch):
+        if self._escape is not None:
+            if self._escape == '' and ch != 'u':
+                self._string.append({'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f'}.get(ch, ch))
+                self._escape = None
+            elif self._escape == '':
+                self._escape = 'u'
+            else:
+                self._escape += ch
+                if len(self._escape) == 5:
+                    try:
+                        self._string.append(chr(int(self._escape[1:], 16)))
+                    except ValueError:
+                        pass
+                    self._escape = None
+            return
+        if ch == '\\':
+            self._escape = ''
+        elif ch == self._quote:
+            text = ''.join(self._string)
+            self._string = None
+            self._emit_string(text)
+        else:
+            self._string.append(ch)
+
+    def _flush_bare(self):
+        if self._bare is None:
+            return
+        raw = ''.join(self._bare)
+        self._bare = None
+        frame = self._stack[-1] if self._stack else None
+        if frame is not None and isinstance(frame[0], dict) and frame[1] is None:
+            frame[1] = raw  # bare key
+        else:
+            self._emit(_literal(raw))
+
+    # -- parser -------------------------------------------------------------
+
+    def _emit_string(self, text):
+        frame = self._stack[-1] if self._stack else None
+        if frame is not None and isinstance(frame[0], dict) and (frame[1] is None or not frame[2]):
+            # A string where a key is expected; a second string before the
+            # colon means the key was a stray word, so the newer one wins
+            frame[1] = text
+            return
+        self._emit(text)
+
+    def _emit(self, value):
+        if not self._stack:
+            return
+        container, key, _ = frame = self._stack[-1]
+        if isinstance(container, list):
+            container.append(value)
+        elif key is not None:
+            container[key] = value
+            frame[1], frame[2] = None, False
+
+    def _structural(self, ch):
+        if ch in '{[':
+            container = {} if ch == '{' else []
+            if self._stack:
+                self._emit(container)
+            else:
+                self.value = container
+            self._stack.append([container, None, False])
+        elif ch in '}]':
+            wanted = dict if ch == '}' else list
+            # Close up to the matching container, tolerating mismatched brackets
+            while self._stack:
+                container = self._stack.pop()[0]
+                if isinstance(container, wanted):
+                    break
+            if not self._stack:
+                self.done = True
+        elif ch == ':':
+            if self._stack and isinstance(self._stack[-1][0], dict):
+                self._stack[-1][2] = True
+        elif ch == ',':
+            # Also swallows trailing and doubled commas
+            if self._stack and isinstance(self._stack[-1][0], dict):
+                self._stack[-1][1], self._stack[-1][2] = None, False
+
+
+def parse(text):
+    """Parse `text` in one go; returns (value, complete)"""
+    parser = JSONStreamParser()
+    parser.feed(text)
+    return parser.finish()
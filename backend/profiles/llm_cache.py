@@ -0,0 +1,333 @@
+"""
+Content-addressed response cache for Gemini calls.
+
+Entries are keyed on a SHA-256 of the model name and the exact prompt, so a
+byte-identical request is served from the cache instead of paying another
+Gemini round trip. Functions opt in by namespace (see LLM_CACHE_FUNCTIONS in
+settings) and the backend is chosen with LLM_CACHE_BACKEND:
+
+- memory: per-process LRU dict with TTL (default)
+- django: any configured Django cache (LocMem, Redis, Memcached...)
+- db:     the llm_cache_entries table, shared by all gunicorn workers
+- none:   caching disabled
+
+Only successful, already-parsed results are stored, so a failed call, a
+fallback value or a partial parse (llm_schemas.is_partial, e.g. a reply cut
+off at the token limit) never ends up in the cache. Concurrent identical requests are
+coalesced into one Gemini call by profiles.singleflight.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from . import llm_schemas, metrics, singleflight
+
+_MISSING = object()
+
+
+def make_key(model_name, prompt, extra=None):
+    """Hash model name + prompt (+ optional generation options) into a cache key"""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode('utf-8'))
+    digest.update(b'\x00')
+    digest.update(prompt.encode('utf-8'))
+    if extra:
+        digest.update(b'\x00')
+        digest.update(json.dumps(extra, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class MemoryBackend:
+    """Thread-safe in-process cache with TTL and LRU eviction"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            value, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, namespace='', model_name=''):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoCacheBackend:
+    """Delegates storage and eviction to a configured Django cache"""
+
+    key_prefix = 'llm-cache:'
+
+    def __init__(self, alias='default'):
+        from django.core.cache import caches
+        self.cache = caches[alias]
+
+    def get(self, key):
+        return self.cache.get(self.key_prefix + key, _MISSING)
+
+    def set(self, key, value, ttl, namespace='', model_name=''):
+        self.cache.set(self.key_prefix + key, value, ttl)
+
+    def delete(self, key):
+        self.cache.delete(self.key_prefix + key)
+
+    def clear(self):
+        self.cache.clear()
+
+
+class DatabaseBackend:
+    """
+    Stores entries in the LLMCacheEntry table so every worker shares them.
+    LRU is tracked with last_accessed_at; the table is pruned back to
+    max_entries every `prune_every` writes.
+    """
+
+    prune_every = 50
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        from .models import LLMCacheEntry
+
+        now = timezone.now()
+        entry = LLMCacheEntry.objects.filter(key=key, expires_at__gt=now).only('response').first()
+        if entry is None:
+            return _MISSING
+        LLMCacheEntry.objects.filter(key=key).update(last_accessed_at=now)
+        return entry.response
+
+    def set(self, key, value, ttl, namespace='', model_name=''):
+        from .models import LLMCacheEntry
+
+        now = timezone.now()
+        LLMCacheEntry.objects.update_or_create(
+            key=key,
+            defaults={
+                'namespace': namespace,
+                'model_name': model_name,
+                'response': value,
+                'expires_at': now + timedelta(seconds=ttl),
+                'last_accessed_at': now,
+            }
+        )
+
+        with self._lock:
+            self._writes += 1
+            should_prune = self._writes % self.prune_every == 0
+        if should_prune:
+            self.prune()
+
+    def prune(self):
+        from .models import LLMCacheEntry
+
+        LLMCacheEntry.objects.filter(expires_at__lte=timezone.now()).delete()
+        stale_keys = LLMCacheEntry.objects.order_by('-last_accessed_at').values_list('key', flat=True)[self.max_entries:]
+        stale_keys = list(stale_keys)
+        if stale_keys:
+            LLMCacheEntry.objects.filter(key__in=stale_keys).delete()
+
+    def delete(self, key):
+        from .models import LLMCacheEntry
+        LLMCacheEntry.objects.filter(key=key).delete()
+
+    def clear(self):
+        from .models import LLMCacheEntry
+        LLMCacheEntry.objects.all().delete()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+_stats = defaultdict(lambda: {'hits': 0, 'misses': 0})
+_stats_lock = threading.Lock()
+
+
+def get_backend():
+    """Build (once per process) the backend selected in settings"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                name = getattr(settings, 'LLM_CACHE_BACKEND', 'memory')
+                max_entries = getattr(settings, 'LLM_CACHE_MAX_ENTRIES', 1000)
+                if name == 'django':
+                    _backend = DjangoCacheBackend(getattr(settings, 'LLM_CACHE_DJANGO_ALIAS', 'default'))
+                elif name == 'db':
+                    _backend = DatabaseBackend(max_entries)
+                elif name == 'none':
+                    _backend = False
+                else:
+                    _backend = MemoryBackend(max_entries)
+    return _backend
+
+
+def reset_backend():
+    """Forget the configured backend (e.g. after changing settings in a test run)"""
+    global _backend
+    with _backend_lock:
+        _backend = None
+
+
+def is_enabled(namespace):
+    """A function's results are cached only if its namespace is opted in"""
+    return bool(get_backend()) and namespace in getattr(settings, 'LLM_CACHE_FUNCTIONS', [])
+
+
+def _record(namespace, outcome):
+    with _stats_lock:
+        _stats[namespace][outcome] += 1
+    metrics.incr(f'llm_cache.{namespace}.{outcome}')
+
+
+def lookup(namespace, key):
+    """Return the cached value for `key`, or None on a miss"""
+    if not is_enabled(namespace):
+        return None
+    try:
+        value = get_backend().get(key)
+    except Exception as e:
+        print(f"⚠️ LLM cache read failed ({namespace}): {e}")
+        value = _MISSING
+    if value is _MISSING:
+        _record(namespace, 'misses')
+        return None
+    _record(namespace, 'hits')
+    return value
+
+
+def store(namespace, key, value, model_name='', ttl=None):
+    if not is_enabled(namespace) or value is None:
+        return
+    if llm_schemas.is_partial(value):
+        # Served to this caller, but the next identical prompt should retry
+        metrics.incr(f'llm_cache.{namespace}.partial_skipped')
+        print(f"⚠️ LLM cache: not storing a partial result ({namespace})")
+        return
+    if ttl is None:
+        ttl = getattr(settings, 'LLM_CACHE_TTL', 86400)
+    try:
+        get_backend().set(key, value, ttl, namespace=namespace, model_name=model_name)
+    except Exception as e:
+        print(f"⚠️ LLM cache write failed ({namespace}): {e}")
+
+
+def is_shared():
+    """True when the backend is visible to every worker (db / django)"""
+    return isinstance(get_backend(), (DatabaseBackend, DjangoCacheBackend))
+
+
+def _peek(key):
+    try:
+        value = get_backend().get(key)
+    except Exception:
+        return None
+    return None if value is _MISSING else value
+
+
+def _generate_and_store(namespace, key, model_name, generate, ttl):
+    if not (is_enabled(namespace) and is_shared()):
+        value = generate()
+        store(namespace, key, value, model_name=model_name, ttl=ttl)
+        return value
+
+    # Another worker may be generating the same key: wait for its lock, then
+    # use what it stored instead of calling Gemini a second time
+    with singleflight.cross_process_lock(key) as locked:
+        if locked:
+            cached = _peek(key)
+            if cached is not None:
+                metrics.incr(f'singleflight.{namespace}.cross_worker_shared')
+                return cached
+        value = generate()
+        store(namespace, key, value, model_name=model_name, ttl=ttl)
+        return value
+
+
+def get_or_generate(namespace, model_name, prompt, generate, ttl=None, extra=None):
+    """
+    Return the cached result for (model_name, prompt) or call `generate()`
+    and cache what it returns. `generate` should raise on failure so that
+    errors are never cached; partial parses are returned but not cached.
+    Values must be JSON-serialisable.
+
+    Concurrent callers with the same key share a single `generate()` call,
+    whether or not the namespace is cached.
+    """
+    key = make_key(model_name, prompt, extra)
+    if is_enabled(namespace):
+        cached = lookup(namespace, key)
+        if cached is not None:
+            print(f"⚡ LLM cache hit ({namespace})")
+            return cached
+
+    return singleflight.do(
+        key,
+        lambda: _generate_and_store(namespace, key, model_name, generate, ttl),
+        namespace=namespace
+    )
+
+
+async def get_or_generate_async(namespace, model_name, prompt, generate, ttl=None, extra=None):
+    """
+    Async counterpart of get_or_generate. `generate` is a coroutine function;
+    backend reads/writes run via sync_to_async so the db backend is safe to
+    use from async views. Coalescing is per event loop (no cross-worker lock,
+    which would block the loop).
+    """
+    key = make_key(model_name, prompt, extra)
+    if is_enabled(namespace):
+        cached = await sync_to_async(lookup)(namespace, key)
+        if cached is not None:
+            print(f"⚡ LLM cache hit ({namespace})")
+            return cached
+
+    async def _generate_and_store_async():
+        value = await generate()
+        await sync_to_async(store)(namespace, key, value, model_name=model_name, ttl=ttl)
+        return value
+
+    return await singleflight.do_async(key, _generate_and_store_async, namespace=namespace)
+
+
+def get_stats():
+    """Hit/miss counters per namespace for this process"""
+    with _stats_lock:
+        stats = {namespace: dict(counts) for namespace, counts in _stats.items()}
+    for counts in stats.values():
+        total = counts['hits'] + counts['misses']
+        counts['hit_rate'] = round(counts['hits'] / total, 3) if total else 0.0
+    backend = get_backend()
+    return {
+        'backend': getattr(settings, 'LLM_CACHE_BACKEND', 'memory') if backend else 'none',
+        'functions': list(getattr(settings, 'LLM_CACHE_FUNCTIONS', [])),
+        'namespaces': stats,
+    }
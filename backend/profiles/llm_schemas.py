@@ -0,0 +1,279 @@
+"""
+Schema registry for Gemini's structured (JSON) output.
+
+Each JSON-producing task registers its schema here once. The same schema is
+used twice:
+
+* as Gemini's response_schema (with response_mime_type application/json),
+  so the model is constrained to emit exactly this shape;
+* by validate(), which coerces whatever came back into that shape - numbers
+  given as strings, a single string where a list was expected, enum values in
+  the wrong case - and fills in the task's defaults for missing fields.
+
+Responses are read with the tolerant incremental parser in json_stream.py, so
+a reply that is fenced, has a trailing comma or was cut off at the token
+limit still yields every field that was complete instead of failing the call.
+Such a result is marked partial (is_partial()) when the reply was cut off,
+required fields had to be defaulted or array items were dropped, so callers
+can decide whether to keep it; llm_cache never stores one.
+
+Schemas use the OpenAPI subset Gemini accepts (type, properties, items,
+required, enum).
+"""
+import copy
+
+from . import json_stream, metrics
+
+
+class SchemaError(ValueError):
+    """The model's output could not be turned into the task's shape"""
+
+
+class PartialList(list):
+    """A validated array from a cut-off or incomplete reply"""
+    partial = True
+
+
+class PartialDict(dict):
+    """A validated object from a cut-off or incomplete reply"""
+    partial = True
+
+
+def is_partial(value):
+    return getattr(value, 'partial', False)
+
+
+def _mark_partial(value):
+    return PartialList(value) if isinstance(value, list) else PartialDict(value)
+
+
+def _string():
+    return {'type': 'string'}
+
+
+def _strings():
+    return {'type': 'array', 'items': {'type': 'string'}}
+
+
+def _enum(*values):
+    return {'type': 'string', 'format': 'enum', 'enum': list(values)}
+
+
+def _object(required=None, **properties):
+    schema = {'type': 'object', 'properties': properties}
+    if required:
+        schema['required'] = list(required)
+    return schema
+
+
+RECOMMENDATIONS_SCHEMA = _object(
+    required=['goal', 'target_level', 'domain'],
+    goal=_enum('Full Technical Interview', 'Focused Practice', 'Quick Mock'),
+    target_level=_enum('Entry Level', 'Mid Level', 'Senior Level'),
+    domain=_string(),
+    reasoning=_object(goal_reason=_string(), level_reason=_string(), domain_reason=_string()),
+)
+
+
+SCHEMAS = {
+    'resume_extraction': {
+        'schema': _object(
+            required=['full_name', 'skills'],
+            full_name=_string(),
+            email=_string(),
+            phone=_string(),
+            location=_string(),
+            linkedin=_string(),
+            github=_string(),
+            website=_string(),
+            summary=_string(),
+            years_of_experience={'type': 'integer'},
+            skills=_strings(),
+            education={'type': 'array', 'items': _object(degree=_string(), institution=_string(), year=_string())},
+            experience={'type': 'array', 'items': _object(
+                title=_string(), company=_string(), duration=_string(), description=_string()
+            )},
+            projects={'type': 'array', 'items': _object(
+                name=_string(), description=_string(), technologies=_strings()
+            )},
+            certifications=_strings(),
+            languages=_strings(),
+            key_strengths=_strings(),
+            # Interview recommendations come back with the extraction, so
+            # no second call is needed to fill the setup screen
+            recommendations=RECOMMENDATIONS_SCHEMA,
+        ),
+        'defaults': {
+            'years_of_experience': 0, 'skills': [], 'education': [], 'experience': [], 'projects': [],
+            'certifications': [], 'languages': [], 'key_strengths': [],
+        },
+    },
+    'recommendations': {
+        'schema': RECOMMENDATIONS_SCHEMA,
+        'defaults': {
+            'goal': 'Focused Practice',
+            'target_level': 'Entry Level',
+            'domain': 'Software Development',
+            'reasoning': {},
+        },
+    },
+    'questions': {
+        'schema': {
+            'type': 'array',
+            'items': _object(
+                required=['question'],
+                question=_string(),
+                type=_enum('conceptual', 'coding', 'scenario'),
+                difficulty=_enum('easy', 'medium', 'hard'),
+                topics=_strings(),
+                expected_answer_points=_strings(),
+            ),
+        },
+        'defaults': [],
+        'item_defaults': {'type': 'conceptual', 'difficulty': 'medium', 'topics': [], 'expected_answer_points': []},
+    },
+    # The recording report has dozens of nested fields the UI reads straight
+    # from the raw response, so the model only gets JSON mode here (a
+    # response_schema would make it drop every field not listed). The schema
+    # still types the fields the view stores in columns.
+    'recording_analysis': {
+        'schema': _object(
+            emotion_trend=_string(),
+            confidence_score={'type': 'integer'},
+            communication_analysis=_string(),
+            strengths=_strings(),
+            improvements=_strings(),
+            eye_movement_pattern=_string(),
+            attention_level=_string(),
+            suspicion_risk=_string(),
+            integrity_notes=_string(),
+            cheating_risk_score={'type': 'integer'},
+        ),
+        'defaults': {},
+        'constrain': False,
+    },
+}
+
+
+def get_schema(task):
+    return SCHEMAS[task]['schema']
+
+
+def generation_config(task):
+    """generation_config for a Gemini call producing `task`'s JSON"""
+    config = {'response_mime_type': 'application/json'}
+    if SCHEMAS[task].get('constrain', True):
+        config['response_schema'] = copy.deepcopy(get_schema(task))
+    return config
+
+
+def _coerce(schema, value):
+    kind = schema.get('type')
+    if value is None:
+        return None
+    if kind == 'string':
+        if isinstance(value, (list, tuple)):
+            value = ', '.join(str(item) for item in value)
+        value = str(value).strip()
+        if 'enum' in schema and value not in schema['enum']:
+            matches = [option for option in schema['enum'] if option.lower() == value.lower()]
+            return matches[0] if matches else None
+        return value
+    if kind in ('integer', 'number'):
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, (int, float)):
+            return int(round(value)) if kind == 'integer' else value
+        digits = ''.join(ch for ch in str(value) if ch.isdigit() or ch in '.-')
+        try:
+            number = float(digits)
+        except ValueError:
+            return None
+        return int(round(number)) if kind == 'integer' else number
+    if kind == 'boolean':
+        if isinstance(value, str):
+            return value.strip().lower() in ('true', 'yes', '1')
+        return bool(value)
+    if kind == 'array':
+        if isinstance(value, str):
+            value = [part.strip() for part in value.split(',') if part.strip()]
+        elif isinstance(value, dict):
+            value = [value]
+        elif not isinstance(value, list):
+            value = [value]
+        items = schema.get('items', {})
+        coerced = [_coerce(items, item) for item in value]
+        return [item for item in coerced if item is not None]
+    if kind == 'object':
+        if not isinstance(value, dict):
+            return None
+        result = dict(value)  # keep fields the schema doesn't list
+        for name, prop in schema.get('properties', {}).items():
+            if name in result:
+                result[name] = _coerce(prop, result[name])
+                if result[name] is None:
+                    del result[name]
+        return result
+    return value
+
+
+def _fill(result, defaults):
+    for name, default in defaults.items():
+        if result.get(name) in (None, ''):
+            result[name] = copy.deepcopy(default)
+    return result
+
+
+def validate(task, value):
+    """
+    Coerce parsed model output into `task`'s schema. Raises SchemaError when
+    nothing usable is left. The result is marked partial when array items
+    were dropped or required fields had to be defaulted.
+    """
+    entry = SCHEMAS[task]
+    schema = entry['schema']
+    result = _coerce(schema, value)
+
+    if schema['type'] == 'array':
+        if result is None:
+            raise SchemaError(f"{task}: expected a JSON array")
+        required = schema['items'].get('required', [])
+        items = [
+            _fill(item, entry.get('item_defaults', {})) for item in result
+            if isinstance(item, dict) and all(item.get(name) not in (None, '') for name in required)
+        ]
+        if not items:
+            raise SchemaError(f"{task}: no complete items")
+        received = len(value) if isinstance(value, list) else len(result)
+        if len(items) < received:
+            metrics.incr(f'structured.{task}.dropped_items')
+            return _mark_partial(items)
+        return items
+
+    if not result:
+        raise SchemaError(f"{task}: expected a JSON object")
+    missing = [name for name in schema.get('required', []) if result.get(name) in (None, '', [])]
+    result = _fill(result, entry.get('defaults', {}))
+    if missing:
+        metrics.incr(f'structured.{task}.missing_fields')
+        print(f"⚠️ {task}: model output missing {', '.join(missing)}; using defaults")
+        return _mark_partial(result)
+    return result
+
+
+def parse_response(task, text):
+    """
+    Parse and validate the model's text for `task`. Truncated or sloppy JSON
+    is accepted as long as validation finds something usable; a result from
+    a cut-off reply is marked partial (see is_partial()).
+    """
+    value, complete = json_stream.parse(text or '')
+    if value is None:
+        metrics.incr(f'structured.{task}.unparseable')
+        raise SchemaError(f"{task}: no JSON found in model output")
+    result = validate(task, value)
+    if not complete:
+        metrics.incr(f'structured.{task}.partial')
+        print(f"⚠️ {task}: model output was cut off; using the fields that were complete")
+        result = _mark_partial(result)
+    return result
@@ -0,0 +1,138 @@
+"""
+Benchmark the streaming DOCX extractor.
+
+Compares profiles.docx_extractor (zip + iterparse over word/document.xml)
+with the python-docx implementation it replaced, on synthetic resumes of
+--paragraphs body paragraphs plus a skills table, or on a real file given
+with --file. The report shows the median time, the peak Python memory
+(tracemalloc) and how much text each version returned. The old version
+ignores tables, so its text is shorter.
+
+    python manage.py bench_docx --paragraphs 50,500,5000 --iterations 10
+    python manage.py bench_docx --file ~/resumes/template.docx
+"""
+import io
+import json
+import statistics
+import time
+import tracemalloc
+
+import docx
+from django.core.management.base import BaseCommand, CommandError
+
+from profiles import docx_extractor
+
+TABLE_SKILLS = [
+    ('Languages', 'Python, Go, TypeScript'),
+    ('Frameworks', 'Django, React, FastAPI'),
+    ('Cloud', 'AWS, Docker, Kubernetes'),
+    ('Data', 'PostgreSQL, Redis, Kafka'),
+]
+
+
+def build_docx(paragraphs):
+    """A resume with `paragraphs` body paragraphs and a two-column skills table"""
+    document = docx.Document()
+    document.add_paragraph('Jane Doe')
+    document.add_paragraph('jane.doe@example.com | +1 555 010 0199')
+    table = document.add_table(rows=0, cols=2)
+    for label, skills in TABLE_SKILLS:
+        cells = table.add_row().cells
+        cells[0].text = label
+        cells[1].text = skills
+    for index in range(paragraphs):
+        document.add_paragraph(
+            f'Led project {index}: migrated a service to Kubernetes, cut p95 latency by {index % 50 + 10}% '
+            'and mentored two engineers on Python and Go.'
+        )
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def legacy_extract(data):
+    """The python-docx extractor previously used by resume_parser, kept verbatim as the baseline"""
+    doc = docx.Document(io.BytesIO(data))
+    text = ""
+    for paragraph in doc.paragraphs:
+        text += paragraph.text + "\n"
+    return text
+
+
+def streaming_extract(data):
+    return docx_extractor.extract(io.BytesIO(data))['text']
+
+
+def _measure(fn, data, iterations):
+    """(median ms, peak KiB, text)"""
+    samples = []
+    text = ''
+    for _ in range(iterations):
+        started = time.perf_counter()
+        text = fn(data)
+        samples.append((time.perf_counter() - started) * 1000)
+    tracemalloc.start()
+    fn(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(samples), peak / 1024, text
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the streaming DOCX extractor against python-docx'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--paragraphs', default='50,500,5000', help='Comma-separated body paragraph counts')
+        parser.add_argument('--file', default='', help='Benchmark this .docx instead of synthetic resumes')
+        parser.add_argument('--iterations', type=int, default=10, help='Runs per measurement (the median is reported)')
+        parser.add_argument('--json', dest='json_path', default='', help='Also write the results to this JSON file')
+
+    def handle(self, *args, **options):
+        if options['file']:
+            try:
+                with open(options['file'], 'rb') as handle:
+                    cases = [(options['file'], handle.read())]
+            except OSError as e:
+                raise CommandError(str(e))
+        else:
+            try:
+                counts = [int(value) for value in options['paragraphs'].split(',') if value.strip()]
+            except ValueError:
+                raise CommandError('--paragraphs must be comma-separated integers')
+            cases = [(f'{count} paragraphs', build_docx(count)) for count in counts]
+
+        iterations = max(1, options['iterations'])
+        results = []
+        header = (
+            f"{'input':<18} {'KiB':>7} {'python-docx ms':>15} {'streaming ms':>13} {'speed-up':>9}"
+            f" {'peak KiB old/new':>17} {'chars old/new':>15}  table text"
+        )
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for label, data in cases:
+            legacy_ms, legacy_peak, legacy_text = _measure(legacy_extract, data, iterations)
+            new_ms, new_peak, new_text = _measure(streaming_extract, data, iterations)
+            speedup = legacy_ms / new_ms if new_ms else 0
+            table_found = options['file'] == '' and all(skills in new_text for _, skills in TABLE_SKILLS)
+            self.stdout.write(
+                f"{label[:18]:<18} {len(data) / 1024:>7.0f} {legacy_ms:>15.2f} {new_ms:>13.2f} {speedup:>8.1f}x"
+                f" {f'{legacy_peak:.0f}/{new_peak:.0f}':>17} {f'{len(legacy_text)}/{len(new_text)}':>15}"
+                f"  {'yes' if table_found else '-'}"
+            )
+            results.append({
+                'input': label,
+                'bytes': len(data),
+                'python_docx_ms': round(legacy_ms, 3),
+                'streaming_ms': round(new_ms, 3),
+                'speedup': round(speedup, 2),
+                'python_docx_peak_kib': round(legacy_peak, 1),
+                'streaming_peak_kib': round(new_peak, 1),
+                'python_docx_chars': len(legacy_text),
+                'streaming_chars': len(new_text),
+            })
+        self.stdout.write(f'(median of {iterations} runs; peak memory from tracemalloc on one extra run)')
+
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as handle:
+                json.dump({'iterations': iterations, 'results': results}, handle, indent=2)
+            self.stdout.write(f"📝 Results written to {options['json_path']}")
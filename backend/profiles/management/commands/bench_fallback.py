@@ -0,0 +1,253 @@
+"""
+Benchmark the regex fallback resume extractor.
+
+Compares profiles.fallback_extractor (precompiled patterns, one pass over the
+text) with the per-field extractors it replaced, which scanned the text once
+per field. Both run on a synthetic resume repeated --copies times, or on a
+real file given with --file (PDF, DOCX or plain text). The report shows the
+median time per extraction, with and without skills. The new extractor
+matches the whole skills taxonomy, while the old one checked 50 skills. It
+also shows whether both versions found the same contact fields.
+
+    python manage.py bench_fallback --copies 1,10,50 --iterations 20
+    python manage.py bench_fallback --file ~/resumes/long.pdf
+"""
+import json
+import re
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from profiles import fallback_extractor, skill_taxonomy
+
+SAMPLE_RESUME = """Jane Doe
+jane.doe@example.com | +1 (555) 010-0199 | https://linkedin.com/in/janedoe | https://github.com/janedoe
+https://janedoe.dev
+
+Summary
+Backend engineer with four years of experience building Python and Go services on AWS.
+
+Skills
+Python, Django, FastAPI, Go, JavaScript, TypeScript, React, PostgreSQL, MySQL, Redis, Kafka,
+Docker, Kubernetes, Terraform, GitHub Actions, REST API, GraphQL, Machine Learning, Pandas, NumPy
+
+Experience
+Senior Software Engineer, Example Corp (Jan 2022 - Present)
+Led the migration of the billing monolith to event-driven microservices on Kubernetes.
+Software Developer, Sample Labs (Jul 2020 - Dec 2021)
+Built data pipelines in Python and Airflow feeding the analytics warehouse.
+Engineering Intern, Demo Inc (Summer 2019)
+Wrote integration tests and CI jobs for the payments API.
+
+Education
+Bachelor of Technology in Computer Science, Example Institute of Technology, 2020
+Master of Science in Data Science (part-time), Online University, 2023
+
+Projects
+Interview Coach - mock interview platform with AI feedback (Django, React, Gemini).
+Realtime Chat - WebSocket chat with Redis pub/sub and horizontal scaling.
+"""
+
+
+# The per-field extractors previously used by resume_parser, kept verbatim
+# as the baseline
+def _legacy_email(text):
+    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+    emails = re.findall(email_pattern, text)
+    return emails[0] if emails else None
+
+
+def _legacy_phone(text):
+    phone_patterns = [
+        r'\+?1?\s*\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}',
+        r'\+?\d{1,3}[-.\s]?\d{3,4}[-.\s]?\d{4}',
+    ]
+    for pattern in phone_patterns:
+        phones = re.findall(pattern, text)
+        if phones:
+            return phones[0]
+    return None
+
+
+def _legacy_links(text):
+    url_pattern = r'https?://(?:www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b(?:[-a-zA-Z0-9()@:%_\+.~#?&/=]*)'
+    urls = re.findall(url_pattern, text)
+    linkedin = github = website = None
+    for url in urls:
+        if 'linkedin.com' in url.lower():
+            linkedin = url
+        elif 'github.com' in url.lower():
+            github = url
+        elif not website:
+            website = url
+    return linkedin, github, website
+
+
+def _legacy_skills(text):
+    common_skills = [
+        'Python', 'Java', 'JavaScript', 'TypeScript', 'C++', 'C#', 'Ruby', 'PHP', 'Swift', 'Kotlin',
+        'React', 'Angular', 'Vue', 'Node.js', 'Express', 'Django', 'Flask', 'Spring', 'Laravel',
+        'HTML', 'CSS', 'SASS', 'Tailwind', 'Bootstrap',
+        'SQL', 'MongoDB', 'PostgreSQL', 'MySQL', 'Redis', 'Firebase',
+        'AWS', 'Azure', 'GCP', 'Docker', 'Kubernetes', 'Jenkins', 'Git', 'GitHub', 'GitLab',
+        'Machine Learning', 'Deep Learning', 'TensorFlow', 'PyTorch', 'Pandas', 'NumPy',
+        'REST API', 'GraphQL', 'Microservices', 'Agile', 'Scrum'
+    ]
+    text_lower = text.lower()
+    return [skill for skill in common_skills if skill.lower() in text_lower]
+
+
+def _legacy_education(text):
+    education = []
+    degree_patterns = [
+        r"(?i)(Bachelor|Master|PhD|B\.S\.|M\.S\.|B\.A\.|M\.A\.|B\.Tech|M\.Tech|MBA).*?(?=\n|$)",
+        r"(?i)(Bachelors?|Masters?|Doctorate).*?(?=\n|$)"
+    ]
+    for pattern in degree_patterns:
+        for match in re.findall(pattern, text):
+            if isinstance(match, tuple):
+                match = ' '.join(match)
+            education.append({'degree': match.strip()})
+    return education
+
+
+def _legacy_experience(text):
+    experience = []
+    lines = text.split('\n')
+    for i, line in enumerate(lines):
+        line = line.strip()
+        if any(keyword in line.lower() for keyword in ['engineer', 'developer', 'manager', 'analyst', 'designer', 'intern']):
+            experience.append({'title': line, 'description': lines[i + 1] if i + 1 < len(lines) else ''})
+    return experience[:5]
+
+
+def _legacy_name(text, email):
+    if email:
+        email_name = re.sub(r'^\d{4}\.', '', email.split('@')[0])
+        name_parts = [part for part in re.split(r'[._-]', email_name) if part.isalpha() and len(part) > 1]
+        if name_parts:
+            return ' '.join(part.capitalize() for part in name_parts)
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    for line in lines[:15]:
+        if any(keyword in line.lower() for keyword in ['resume', 'curriculum vitae', 'cv', 'profile', 'objective', 'summary', 'experience', 'education', 'skills', 'projects', 'contact', 'email', 'phone', '@', 'http', 'linkedin', 'github']):
+            continue
+        if re.search(r'[\d+\-\/\|]', line):
+            continue
+        words = line.split()
+        if 2 <= len(words) <= 4 and all(word[0].isupper() and word.replace('-', '').replace("'", '').isalpha() for word in words):
+            return line
+    return None
+
+
+def legacy_extract_fields(text):
+    email = _legacy_email(text)
+    linkedin, github, website = _legacy_links(text)
+    return {
+        'full_name': _legacy_name(text, email),
+        'email': email,
+        'phone': _legacy_phone(text),
+        'linkedin': linkedin,
+        'github': github,
+        'website': website,
+        'education': _legacy_education(text),
+        'experience': _legacy_experience(text),
+    }
+
+
+def legacy_extract(text):
+    fields = legacy_extract_fields(text)
+    fields['skills'] = _legacy_skills(text)
+    return fields
+
+
+COMPARED_FIELDS = ['full_name', 'email', 'phone', 'linkedin', 'github', 'website']
+
+
+def _time(fn, text, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn(text)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def _read_file(path):
+    lowered = path.lower()
+    if lowered.endswith('.pdf') or lowered.endswith('.docx'):
+        from profiles.resume_parser import extract_text_from_docx, extract_text_from_pdf
+        with open(path, 'rb') as handle:
+            return extract_text_from_pdf(handle) if lowered.endswith('.pdf') else extract_text_from_docx(handle)
+    with open(path, encoding='utf-8', errors='replace') as handle:
+        return handle.read()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the one-pass regex fallback resume extractor against the per-field extractors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--copies', default='1,10,50', help='Comma-separated resume sizes, in copies of the sample resume')
+        parser.add_argument('--file', default='', help='Benchmark this resume (PDF, DOCX or text) instead of the sample')
+        parser.add_argument('--iterations', type=int, default=20, help='Runs per measurement (the median is reported)')
+        parser.add_argument('--json', dest='json_path', default='', help='Also write the results to this JSON file')
+
+    def handle(self, *args, **options):
+        if options['file']:
+            text = _read_file(options['file'])
+            if not text:
+                raise CommandError(f"No text could be extracted from {options['file']}")
+            cases = [(options['file'], text)]
+        else:
+            try:
+                copies = [int(value) for value in options['copies'].split(',') if value.strip()]
+            except ValueError:
+                raise CommandError('--copies must be comma-separated integers')
+            cases = [(f'sample x{count}', '\n'.join([SAMPLE_RESUME] * count)) for count in copies]
+
+        # Compile the taxonomy outside the timed runs, as app startup does
+        skill_taxonomy.get_matcher()
+        iterations = max(1, options['iterations'])
+
+        results = []
+        header = (
+            f"{'input':<16} {'chars':>8} {'legacy ms':>10} {'one-pass ms':>12} {'speed-up':>9}"
+            f" {'excl. skills':>13}  same contact fields"
+        )
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for label, text in cases:
+            legacy_ms = _time(legacy_extract, text, iterations)
+            new_ms = _time(fallback_extractor.extract, text, iterations)
+            legacy_fields_ms = _time(legacy_extract_fields, text, iterations)
+            new_fields_ms = _time(fallback_extractor.extract_fields, text, iterations)
+            legacy_fields = legacy_extract(text)
+            new_fields = fallback_extractor.extract(text)
+            differing = [name for name in COMPARED_FIELDS if legacy_fields[name] != new_fields[name]]
+            speedup = legacy_ms / new_ms if new_ms else 0
+            fields_speedup = legacy_fields_ms / new_fields_ms if new_fields_ms else 0
+            self.stdout.write(
+                f"{label[:16]:<16} {len(text):>8} {legacy_ms:>10.2f} {new_ms:>12.2f} {speedup:>8.1f}x"
+                f" {fields_speedup:>12.1f}x  {'yes' if not differing else 'differs: ' + ', '.join(differing)}"
+            )
+            results.append({
+                'input': label,
+                'chars': len(text),
+                'legacy_ms': round(legacy_ms, 3),
+                'one_pass_ms': round(new_ms, 3),
+                'speedup': round(speedup, 2),
+                'legacy_fields_ms': round(legacy_fields_ms, 3),
+                'one_pass_fields_ms': round(new_fields_ms, 3),
+                'fields_speedup': round(fields_speedup, 2),
+                'differing_fields': differing,
+                'skills': {'legacy': len(legacy_fields['skills']), 'one_pass': len(new_fields['skills'])},
+            })
+        self.stdout.write(
+            f'(median of {iterations} runs; one-pass matches the full skills taxonomy, legacy checked 50 skills; '
+            '"excl. skills" compares every other field)'
+        )
+
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as handle:
+                json.dump({'iterations': iterations, 'results': results}, handle, indent=2)
+            self.stdout.write(f"📝 Results written to {options['json_path']}")
@@ -0,0 +1,60 @@
+"""
+Build or update the question index used to match resumes to bank questions.
+
+prewarm_questions updates the index after every pass. Without it, run this
+from cron so questions the web process stores get indexed; --rebuild is
+needed after changing QUESTION_INDEX_DIM or deleting questions:
+
+    python manage.py build_question_index               # add new questions
+    python manage.py build_question_index --rebuild
+    python manage.py build_question_index --bench 200   # time 200 queries per partition
+"""
+import os
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from profiles import question_index
+from profiles.models import Question, ResumeData
+
+SAMPLE_RESUME = {
+    'skills': ['Python', 'Django', 'React', 'PostgreSQL', 'Docker', 'REST APIs'],
+    'projects': [{'name': 'Interview prep app', 'description': 'Django backend with a React frontend',
+                  'technologies': ['Django', 'React']}],
+}
+
+
+class Command(BaseCommand):
+    help = 'Build or update the local TF-IDF index of the question bank'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Re-index every question from scratch')
+        parser.add_argument('--bench', type=int, default=0, help='Time this many ranking queries per partition')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        added = question_index.update(rebuild=options['rebuild'], wait=True)
+        self.stdout.write(f"✅ {added} question(s) indexed in {time.perf_counter() - started:.2f}s "
+                          f"into {question_index.index_dir()}")
+
+        pairs = Question.objects.values_list('domain', 'level').distinct().order_by('domain', 'level')
+        resumes = list(ResumeData.objects.exclude(skills=[]).values('skills', 'projects')[:50]) or [SAMPLE_RESUME]
+        self.stdout.write(f"{'partition':<24} {'questions':>9} {'MiB':>7}" + (f" {'p50 ms':>8} {'p99 ms':>8}" if options['bench'] else ''))
+        for domain, level in pairs:
+            partition = question_index.load_partition(domain, level)
+            if partition is None:
+                continue
+            size = os.path.getsize(os.path.join(question_index.index_dir(), question_index.partition_name(domain, level), 'vectors.f32'))
+            line = f"{question_index.partition_name(domain, level):<24} {partition.count:>9} {size / 1024 / 1024:>7.2f}"
+            if options['bench']:
+                samples = []
+                for _ in range(options['bench']):
+                    resume = random.choice(resumes)
+                    query_started = time.perf_counter()
+                    question_index.rank(domain, level, resume)
+                    samples.append((time.perf_counter() - query_started) * 1000)
+                samples.sort()
+                line += f" {statistics.median(samples):>8.3f} {samples[min(len(samples) - 1, len(samples) * 99 // 100)]:>8.3f}"
+            self.stdout.write(line)
@@ -0,0 +1,296 @@
+"""
+Bulk import a directory of resumes (for example a bootcamp cohort).
+
+    python manage.py ingest_resumes /data/cohort-12
+    python manage.py ingest_resumes /data/cohort-12 --workers 8 --concurrency 4 --batch-size 100
+
+Each PDF/DOCX is matched to an existing UserProfile, by default through the
+email address in the resume; with `--match filename` the file name (without
+extension) is the user's uid. Files that match no user are reported and
+skipped. They are not checkpointed, so creating the users and re-running
+picks them up.
+
+The run is a three-stage pipeline, with every stage running at once:
+
+1. Text extraction in a process pool (--workers). PDF and DOCX parsing is
+   CPU-bound, so threads would serialize on the GIL.
+2. Gemini extraction (resume_parser.parse_text) in a thread pool. The pool
+   size (--concurrency) is the bound on concurrent Gemini calls.
+3. Database writes from the main thread, in batches: one bulk_update for
+   users who already have a ResumeData row and one bulk_create for the rest.
+
+After each batch the checkpoint file (default <dir>/.ingest_checkpoint.json)
+records the files written and their SHA-256. An interrupted run skips them
+when restarted; a file whose content changed is imported again.
+"""
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import statistics
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+from profiles import fallback_extractor, metrics, resume_parser
+from profiles.models import ResumeData, ResumeRawText, UserProfile
+
+EXTENSIONS = ('.pdf', '.docx', '.doc')
+CHECKPOINT_VERSION = 1
+
+
+def _init_text_worker():
+    # The ingest pool is the parallelism; don't let pdf_extractor start
+    # a second pool inside each worker
+    settings.RESUME_PDF_WORKERS = 1
+
+
+def _extract_text(path):
+    """Process pool task: (raw_text, elapsed_ms) for one file"""
+    started = time.perf_counter()
+    with open(path, 'rb') as handle:
+        file = io.BytesIO(handle.read())
+    raw_text = resume_parser.extract_text(file, os.path.basename(path))
+    return raw_text, (time.perf_counter() - started) * 1000
+
+
+def _parse_text(raw_text, file_name):
+    """Thread pool task: (parsed_data, elapsed_ms)"""
+    started = time.perf_counter()
+    try:
+        return resume_parser.parse_text(raw_text, file_name), (time.perf_counter() - started) * 1000
+    finally:
+        connections.close_all()
+
+
+def _hash_path(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as handle:
+            data = json.load(handle)
+    except (OSError, ValueError) as e:
+        raise CommandError(f"Unreadable checkpoint {path}: {e}")
+    return data.get('done', {}) if data.get('version') == CHECKPOINT_VERSION else {}
+
+
+def save_checkpoint(path, done):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as handle:
+        json.dump({'version': CHECKPOINT_VERSION, 'done': done}, handle)
+    os.replace(tmp_path, path)
+
+
+def write_batch(rows):
+    """
+    Save parsed resumes: rows maps user uid -> ResumeData field values.
+    Returns (created, updated).
+    """
+    now = timezone.now()
+    existing = ResumeData.objects.in_bulk(list(rows), field_name='user_id')
+    fields = set()
+    to_create = []
+    to_update = []
+    raw_texts = {}
+    for uid, values in rows.items():
+        values = dict(values, uploaded_at=now, updated_at=now)
+        raw_texts[uid] = values.pop('raw_text', '')
+        fields.update(values)
+        resume = existing.get(uid)
+        if resume is None:
+            to_create.append(ResumeData(user_id=uid, **values))
+        else:
+            for name, value in values.items():
+                setattr(resume, name, value)
+            to_update.append(resume)
+
+    with transaction.atomic():
+        if to_create:
+            ResumeData.objects.bulk_create(to_create)
+        if to_update:
+            ResumeData.objects.bulk_update(to_update, sorted(fields))
+        # Raw text lives in its own table; replace the batch's rows
+        resume_ids = dict(ResumeData.objects.filter(user_id__in=list(rows)).values_list('user_id', 'id'))
+        ResumeRawText.objects.filter(resume_id__in=list(resume_ids.values())).delete()
+        ResumeRawText.objects.bulk_create([
+            ResumeRawText(resume_id=resume_ids[uid], **ResumeRawText.pack(text)) for uid, text in raw_texts.items()
+        ])
+    return len(to_create), len(to_update)
+
+
+class Command(BaseCommand):
+    help = 'Parse and import every resume in a directory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory')
+        parser.add_argument('--match', choices=['email', 'filename'], default='email',
+                            help='Find the user by the email in the resume, or by file name = uid')
+        parser.add_argument('--workers', type=int, default=0, help='Text extraction processes (default: CPU count)')
+        parser.add_argument('--concurrency', type=int, default=4, help='Concurrent Gemini extractions')
+        parser.add_argument('--batch-size', type=int, default=50, help='Resumes per database write')
+        parser.add_argument('--checkpoint', default='', help='Checkpoint file (default: <directory>/.ingest_checkpoint.json)')
+        parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and import every file')
+        parser.add_argument('--limit', type=int, default=0, help='Import at most this many files')
+
+    def handle(self, *args, **options):
+        directory = os.path.abspath(options['directory'])
+        if not os.path.isdir(directory):
+            raise CommandError(f"{directory} is not a directory")
+        checkpoint_path = options['checkpoint'] or os.path.join(directory, '.ingest_checkpoint.json')
+        done = {} if options['restart'] else load_checkpoint(checkpoint_path)
+
+        # Files still to import
+        pending = []
+        skipped_done = 0
+        for root, _, names in os.walk(directory):
+            for name in sorted(names):
+                if not name.lower().endswith(EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                key = os.path.relpath(path, directory)
+                file_hash = _hash_path(path)
+                if done.get(key) == file_hash:
+                    skipped_done += 1
+                    continue
+                pending.append((key, path, file_hash))
+        pending.sort()
+        if options['limit']:
+            pending = pending[:options['limit']]
+
+        self.stdout.write(f"📂 {len(pending)} resume(s) to import from {directory}"
+                          f"{f', {skipped_done} already imported' if skipped_done else ''}")
+        if not pending:
+            return
+
+        uids = set(UserProfile.objects.values_list('uid', flat=True))
+        users_by_email = {email.lower(): uid for uid, email in UserProfile.objects.values_list('uid', 'email')}
+
+        timings = {'text': [], 'llm': [], 'db': []}
+        counts = {'created': 0, 'updated': 0, 'no_text': 0, 'no_user': 0, 'errors': 0, 'fallback': 0}
+        batch = {}  # uid -> field values
+        batch_keys = {}  # checkpoint entries written with the batch
+        unmatched = []
+
+        def flush():
+            if not batch:
+                return
+            started = time.perf_counter()
+            created, updated = write_batch(batch)
+            timings['db'].append((time.perf_counter() - started) * 1000)
+            counts['created'] += created
+            counts['updated'] += updated
+            done.update(batch_keys)
+            save_checkpoint(checkpoint_path, done)
+            batch.clear()
+            batch_keys.clear()
+            self.stdout.write(f"   💾 {counts['created'] + counts['updated']}/{len(pending)} saved")
+
+        # Forked workers must not share the parent's database connection
+        connections.close_all()
+        workers = options['workers'] or os.cpu_count() or 1
+        concurrency = max(1, options['concurrency'])
+        started = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'),
+                                 initializer=_init_text_worker) as text_pool, \
+                ThreadPoolExecutor(max_workers=concurrency) as llm_pool:
+            text_futures = {text_pool.submit(_extract_text, path): (key, path, file_hash)
+                            for key, path, file_hash in pending}
+            llm_futures = {}
+            try:
+                while text_futures or llm_futures:
+                    finished, _ = wait(list(text_futures) + list(llm_futures), return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        if future in text_futures:
+                            key, path, file_hash = text_futures.pop(future)
+                            try:
+                                raw_text, elapsed_ms = future.result()
+                            except Exception as e:
+                                counts['errors'] += 1
+                                self.stderr.write(f"❌ {key}: {e}")
+                                continue
+                            timings['text'].append(elapsed_ms)
+                            if not raw_text:
+                                counts['no_text'] += 1
+                                self.stderr.write(f"⚠️ {key}: no text could be extracted")
+                                continue
+                            if options['match'] == 'filename':
+                                uid = os.path.splitext(os.path.basename(path))[0]
+                                uid = uid if uid in uids else None
+                            else:
+                                email = fallback_extractor.extract_email(raw_text)
+                                uid = users_by_email.get(email.lower()) if email else None
+                            if uid is None:
+                                counts['no_user'] += 1
+                                unmatched.append(key)
+                                continue
+                            # Gemini runs in the thread pool, at most --concurrency at once
+                            llm_futures[llm_pool.submit(_parse_text, raw_text, os.path.basename(path))] = (key, file_hash, uid)
+                        else:
+                            key, file_hash, uid = llm_futures.pop(future)
+                            try:
+                                parsed_data, elapsed_ms = future.result()
+                            except Exception as e:
+                                counts['errors'] += 1
+                                self.stderr.write(f"❌ {key}: {e}")
+                                continue
+                            timings['llm'].append(elapsed_ms)
+                            extracted_with_ai = parsed_data.pop('extracted_with_ai', False)
+                            ai_partial = parsed_data.pop('ai_partial', False)
+                            if not extracted_with_ai:
+                                counts['fallback'] += 1
+                            parsed_data['file_hash'] = file_hash if extracted_with_ai and not ai_partial else None
+                            batch[uid] = parsed_data
+                            batch_keys[key] = file_hash
+                            if len(batch) >= options['batch_size']:
+                                flush()
+                flush()
+            except KeyboardInterrupt:
+                for future in list(text_futures) + list(llm_futures):
+                    future.cancel()
+                flush()
+                self.stdout.write(f"Interrupted; progress saved to {checkpoint_path}")
+                raise
+
+        elapsed = time.perf_counter() - started
+        for stage, samples in timings.items():
+            for ms in samples:
+                metrics.observe(f'resume.ingest.{stage}_ms', ms)
+        self._report(elapsed, len(pending), counts, timings, workers, concurrency)
+        if unmatched:
+            self.stdout.write(f"⚠️ No user matched {len(unmatched)} file(s): {', '.join(unmatched[:10])}"
+                              f"{' ...' if len(unmatched) > 10 else ''}")
+
+    def _report(self, elapsed, total, counts, timings, workers, concurrency):
+        saved = counts['created'] + counts['updated']
+        self.stdout.write(
+            f"\n✅ Imported {saved}/{total} resume(s) in {elapsed:.1f}s "
+            f"({saved / elapsed if elapsed else 0:.2f} resumes/s; {workers} text workers, {concurrency} concurrent Gemini calls)"
+        )
+        self.stdout.write(
+            f"   created {counts['created']}, updated {counts['updated']}, regex fallback {counts['fallback']}, "
+            f"no text {counts['no_text']}, no user {counts['no_user']}, errors {counts['errors']}"
+        )
+        header = f"   {'stage':<8} {'count':>6} {'total s':>9} {'p50 ms':>9} {'max ms':>9}"
+        self.stdout.write(header)
+        for stage, label in (('text', 'text'), ('llm', 'gemini'), ('db', 'db write')):
+            samples = timings[stage]
+            if not samples:
+                continue
+            self.stdout.write(
+                f"   {label:<8} {len(samples):>6} {sum(samples) / 1000:>9.2f} "
+                f"{statistics.median(samples):>9.1f} {max(samples):>9.1f}"
+            )
@@ -0,0 +1,400 @@
+"""
+Load test every /api/ endpoint of a running backend.
+
+Simulated users create a profile, upload a resume and then hit a weighted mix
+of the API endpoints from --concurrency threads until --duration seconds (or
+--requests requests) have passed. The report lists requests, errors,
+throughput and p50/p95/p99/max latency per endpoint; the streaming question
+endpoint also reports time to first event.
+
+Run it against a server using the fake Gemini backend so no quota is spent:
+
+    GEMINI_BACKEND=fake FAKE_GEMINI_LATENCY=lognormal:800:0.5 \\
+        gunicorn backend.wsgi -w 4 --threads 8
+    python manage.py loadtest --base-url http://127.0.0.1:8000/api --concurrency 32 --duration 60
+
+Profiles created by a run use uids starting with "loadtest-".
+"""
+import io
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from profiles.metrics import percentile
+
+GOALS = ['full', 'focused', 'quick']
+LEVELS = ['internship', 'entry', 'mid']
+DOMAINS = ['dsa', 'web', 'ml', 'core']
+ROUNDS = ['Technical', 'Behavioral', 'System Design']
+
+SAMPLE_ANSWERS = [
+    "I would start with a hash map to count occurrences and then use a heap to keep the top k items.",
+    "In my last internship I profiled the slow endpoint, found an N+1 query and fixed it with select_related.",
+    "A process has its own memory space while threads share it, so threads are cheaper but need locking.",
+]
+
+
+def build_resume_docx(name, email):
+    """Small but realistic DOCX resume for upload tests"""
+    from docx import Document
+
+    document = Document()
+    document.add_heading(name, level=0)
+    document.add_paragraph(f"{email} | +1 555 010 0000 | github.com/{name.split()[0].lower()}")
+    document.add_heading('Summary', level=1)
+    document.add_paragraph('Backend engineer with two years of experience building Django and React applications.')
+    document.add_heading('Skills', level=1)
+    document.add_paragraph('Python, Django, JavaScript, React, SQL, PostgreSQL, Docker, Git, REST APIs')
+    document.add_heading('Experience', level=1)
+    document.add_paragraph('Software Engineer, Example Corp (Jul 2023 - Present)')
+    document.add_paragraph('Built REST APIs serving 1M requests/day and cut p95 latency by 40%.')
+    document.add_heading('Education', level=1)
+    document.add_paragraph('Bachelor of Technology in Computer Science, Example Institute of Technology, 2023')
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+class ApiClient:
+    """Minimal urllib client; returns (status, body, seconds to first byte)"""
+
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip('/') + '/'
+        self.timeout = timeout
+
+    def request(self, method, path, params=None, json_body=None, files=None, fields=None):
+        url = urllib.parse.urljoin(self.base_url, path)
+        if params:
+            url += '?' + urllib.parse.urlencode(params)
+        headers = {}
+        data = None
+        if json_body is not None:
+            data = json.dumps(json_body).encode()
+            headers['Content-Type'] = 'application/json'
+        elif files is not None:
+            data, content_type = self._multipart(fields or {}, files)
+            headers['Content-Type'] = content_type
+
+        request = urllib.request.Request(url, data=data, headers=headers, method=method)
+        started = time.perf_counter()
+        try:
+            response = urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            response = e
+        with response:
+            first = response.read(1)
+            ttfb = time.perf_counter() - started
+            body = first + response.read()
+        return response.status, body, ttfb
+
+    def _multipart(self, fields, files):
+        boundary = uuid.uuid4().hex
+        lines = []
+        for name, value in fields.items():
+            lines.append(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+            )
+        for name, (filename, content, content_type) in files.items():
+            lines.append(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                f'Content-Type: {content_type}\r\n\r\n'.encode() + content + b'\r\n'
+            )
+        lines.append(f'--{boundary}--\r\n'.encode())
+        return b''.join(lines), f'multipart/form-data; boundary={boundary}'
+
+
+class VirtualUser:
+    def __init__(self, uid, name, email):
+        self.uid = uid
+        self.name = name
+        self.email = email
+        self.history = []
+        self.analysis_ids = []
+
+    def session(self):
+        """The same profile with its own interview state, for one worker thread"""
+        return VirtualUser(self.uid, self.name, self.email)
+
+
+# Each scenario returns the result of client.request(), or None to skip
+def profile(client, user):
+    return client.request('GET', 'profile/', params={'uid': user.uid})
+
+
+def resume(client, user):
+    return client.request('GET', 'resume/', params={'uid': user.uid})
+
+
+def resume_upload(client, user):
+    return client.request(
+        'POST', 'resume/upload/', fields={'uid': user.uid},
+        files={'file': (
+            'resume.docx', build_resume_docx(user.name, user.email),
+            'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        )},
+    )
+
+
+def recommendations(client, user):
+    return client.request('GET', 'recommendations/', params={'uid': user.uid})
+
+
+def questions_generate(client, user):
+    return client.request('POST', 'questions/generate/', json_body={
+        'uid': user.uid,
+        'goal': random.choice(GOALS),
+        'level': random.choice(LEVELS),
+        'domain': random.choice(DOMAINS),
+    })
+
+
+def _question_body(user):
+    return {
+        'conversation_history': user.history[-20:],
+        'user_profile': {'skills': 'Python, Django, React', 'experience': '2 years', 'domain': 'Web Development'},
+        'current_round': random.choice(ROUNDS),
+        'previous_answer': user.history[-1]['message'] if user.history else None,
+    }
+
+
+def _add_turn(user):
+    user.history.append({'type': 'ai', 'message': 'Tell me about a recent project.'})
+    user.history.append({'type': 'user', 'message': random.choice(SAMPLE_ANSWERS)})
+    if len(user.history) > 40:
+        del user.history[:2]
+
+
+def ai_question(client, user):
+    _add_turn(user)
+    return client.request('POST', 'interview/ai/question/', json_body=_question_body(user))
+
+
+def ai_question_stream(client, user):
+    _add_turn(user)
+    return client.request('POST', 'interview/ai/question/stream/', json_body=_question_body(user))
+
+
+def ai_analyze(client, user):
+    return client.request('POST', 'interview/ai/analyze/', json_body={
+        'question': 'How would you find the k most frequent elements in a stream?',
+        'answer': random.choice(SAMPLE_ANSWERS),
+        'context': 'Technical round',
+    })
+
+
+def ai_transition(client, user):
+    return client.request('POST', 'interview/ai/transition/', json_body={
+        'current_round': 'Technical',
+        'next_round': 'Behavioral',
+        'performance_summary': 'Solid fundamentals, some gaps in complexity analysis',
+    })
+
+
+def ai_conclude(client, user):
+    user.history = []
+    return client.request('POST', 'interview/ai/conclude/', json_body={
+        'overall_performance': 'Good problem solving and communication',
+    })
+
+
+def recording_analyze(client, user):
+    result = client.request(
+        'POST', 'interview/ai/recording/analyze/', fields={'uid': user.uid, 'participant_count': 1},
+        files={'recording': ('interview.webm', os.urandom(64 * 1024), 'video/webm')},
+    )
+    if result[0] == 201:
+        user.analysis_ids.append(json.loads(result[1])['analysis_id'])
+    return result
+
+
+def analysis(client, user):
+    if not user.analysis_ids:
+        return None
+    return client.request('GET', f'interview/ai/analysis/{random.choice(user.analysis_ids)}/')
+
+
+def analyses(client, user):
+    return client.request('GET', 'interview/ai/analyses/', params={'uid': user.uid})
+
+
+def api_metrics(client, user):
+    return client.request('GET', 'metrics/')
+
+
+# (report name, scenario, default weight)
+SCENARIOS = [
+    ('GET profile/', profile, 10),
+    ('GET resume/', resume, 10),
+    ('POST resume/upload/', resume_upload, 3),
+    ('GET recommendations/', recommendations, 10),
+    ('POST questions/generate/', questions_generate, 8),
+    ('POST interview/ai/question/', ai_question, 15),
+    ('POST interview/ai/question/stream/', ai_question_stream, 10),
+    ('POST interview/ai/analyze/', ai_analyze, 15),
+    ('POST interview/ai/transition/', ai_transition, 4),
+    ('POST interview/ai/conclude/', ai_conclude, 2),
+    ('POST interview/ai/recording/analyze/', recording_analyze, 1),
+    ('GET interview/ai/analysis/<id>/', analysis, 3),
+    ('GET interview/ai/analyses/', analyses, 3),
+    ('GET metrics/', api_metrics, 1),
+]
+
+STREAM_SCENARIO = 'POST interview/ai/question/stream/'
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, name, seconds, status):
+        with self.lock:
+            self.latencies[name].append(seconds * 1000)
+            self.statuses[name][status] += 1
+            if not isinstance(status, int) or status >= 400:
+                self.errors[name] += 1
+
+    def report(self, elapsed):
+        rows = {}
+        for name in sorted(self.latencies):
+            values = sorted(self.latencies[name])
+            rows[name] = {
+                'requests': len(values),
+                'errors': self.errors[name],
+                'rps': round(len(values) / elapsed, 2) if elapsed else None,
+                'p50_ms': round(percentile(values, 50), 1),
+                'p95_ms': round(percentile(values, 95), 1),
+                'p99_ms': round(percentile(values, 99), 1),
+                'max_ms': round(values[-1], 1),
+                'statuses': dict(self.statuses[name]),
+            }
+        return rows
+
+
+class Command(BaseCommand):
+    help = 'Load test every /api/ endpoint and report throughput and p50/p95/p99 latency per endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000/api/', help='API root of the server under test')
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent simulated users')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to run (after setup)')
+        parser.add_argument('--requests', type=int, default=0, help='Stop after this many requests (0 = use --duration)')
+        parser.add_argument('--users', type=int, default=0, help='Distinct profiles to create (default: --concurrency)')
+        parser.add_argument('--endpoints', default='', help='Comma-separated substrings selecting scenarios (default: all)')
+        parser.add_argument('--timeout', type=float, default=120, help='Per-request timeout in seconds')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for the request mix')
+        parser.add_argument('--json', dest='json_path', default='', help='Also write the report to this JSON file')
+
+    def handle(self, *args, **options):
+        if options['seed'] is not None:
+            random.seed(options['seed'])
+        client = ApiClient(options['base_url'], options['timeout'])
+        recorder = Recorder()
+
+        scenarios = SCENARIOS
+        if options['endpoints']:
+            wanted = [part.strip() for part in options['endpoints'].split(',') if part.strip()]
+            scenarios = [s for s in SCENARIOS if any(part in s[0] for part in wanted)]
+            if not scenarios:
+                raise CommandError(f"No scenarios match --endpoints={options['endpoints']}")
+
+        users = self.setup_users(client, recorder, options['users'] or options['concurrency'])
+
+        self.stdout.write(
+            f"🚀 Running {len(scenarios)} scenarios with {options['concurrency']} workers against {options['base_url']}"
+        )
+        names = [s[0] for s in scenarios]
+        weights = [s[2] for s in scenarios]
+        by_name = {s[0]: s[1] for s in scenarios}
+        deadline = time.monotonic() + options['duration']
+        budget = {'left': options['requests']}
+        budget_lock = threading.Lock()
+
+        def take():
+            if options['requests']:
+                with budget_lock:
+                    if budget['left'] <= 0:
+                        return False
+                    budget['left'] -= 1
+                    return True
+            return time.monotonic() < deadline
+
+        def worker(index):
+            # With --users below --concurrency workers share a profile, but
+            # never the history and analysis ids they mutate
+            user = users[index % len(users)].session()
+            while take():
+                name = random.choices(names, weights)[0]
+                self.run_scenario(client, recorder, name, by_name[name], user)
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            list(pool.map(worker, range(options['concurrency'])))
+        elapsed = time.monotonic() - started
+
+        rows = recorder.report(elapsed)
+        self.print_report(rows, elapsed)
+        if options['json_path']:
+            with open(options['json_path'], 'w') as handle:
+                json.dump({
+                    'base_url': options['base_url'],
+                    'concurrency': options['concurrency'],
+                    'elapsed_seconds': round(elapsed, 2),
+                    'endpoints': rows,
+                }, handle, indent=2)
+            self.stdout.write(f"📝 Report written to {options['json_path']}")
+
+    def setup_users(self, client, recorder, count):
+        run_id = uuid.uuid4().hex[:8]
+        self.stdout.write(f"👥 Creating {count} load-test profiles (run {run_id})...")
+        users = []
+        for i in range(count):
+            user = VirtualUser(f'loadtest-{run_id}-{i}', f'Load Tester {i}', f'loadtest-{run_id}-{i}@example.com')
+            started = time.perf_counter()
+            result = client.request('POST', 'profile/create/', json_body={
+                'uid': user.uid, 'name': user.name, 'email': user.email,
+            })
+            recorder.record('POST profile/create/', time.perf_counter() - started, result[0])
+            if result[0] >= 400:
+                raise CommandError(f"Could not create profile {user.uid}: {result[0]} {result[1][:200]!r}")
+            self.run_scenario(client, recorder, 'POST resume/upload/', resume_upload, user)
+            users.append(user)
+        return users
+
+    def run_scenario(self, client, recorder, name, scenario, user):
+        started = time.perf_counter()
+        try:
+            result = scenario(client, user)
+        except Exception as e:
+            recorder.record(name, time.perf_counter() - started, type(e).__name__)
+            return
+        if result is None:
+            return
+        recorder.record(name, time.perf_counter() - started, result[0])
+        if name == STREAM_SCENARIO:
+            recorder.record(f'{name} (first event)', result[2], result[0])
+
+    def print_report(self, rows, elapsed):
+        total = sum(row['requests'] for name, row in rows.items() if not name.endswith('(first event)'))
+        self.stdout.write(f"\n📊 {total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)\n")
+        header = f"{'endpoint':<48}{'reqs':>7}{'errs':>6}{'rps':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, row in rows.items():
+            self.stdout.write(
+                f"{name:<48}{row['requests']:>7}{row['errors']:>6}{row['rps']:>8}"
+                f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}{row['max_ms']:>9}"
+            )
+        self.stdout.write('(latencies in ms)')
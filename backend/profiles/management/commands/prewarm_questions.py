@@ -0,0 +1,123 @@
+"""
+Keep ready-made question sets for the interview configurations users pick.
+
+For every goal x level x domain combination accepted by
+/api/questions/generate/ (QUESTION_PREWARM_LEVELS and _DOMAINS), this tops
+the pool up to QUESTION_POOL_SIZE sets. A set is assembled from the question
+bank when the bank can fill it. Otherwise Gemini generates it, which also
+adds its questions to the bank, so Gemini is only needed until a
+combination's bank is big enough.
+
+Run it from cron, or leave it running:
+
+    python manage.py prewarm_questions                  # one pass
+    python manage.py prewarm_questions --loop --interval 60 --concurrency 2
+
+Combinations are refilled in parallel, at most --concurrency at a time (and
+so at most that many Gemini calls). The sets of one combination are built
+one after another, so each Gemini prompt lists the questions the previous
+set added and asks for new ones. After each pass the question index
+(profiles/question_index.py) picks up the questions added to the bank.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from profiles import gemini_client, question_bank, question_index
+from profiles.question_generator import build_question_set
+
+
+def _csv(value):
+    return [item.strip().lower() for item in str(value).split(',') if item.strip()]
+
+
+def _refill(goal, level, domain, count):
+    """Build `count` sets for one combination. Returns {source: sets stored}"""
+    built = {}
+    try:
+        for _ in range(count):
+            questions, source = build_question_set(goal, level, domain)
+            # Gemini failed or cut the reply short: leave the slot for the next pass
+            if not questions or len(questions) < question_bank.question_count(goal):
+                break
+            question_bank.add_set(goal, level, domain, questions)
+            built[source] = built.get(source, 0) + 1
+    finally:
+        connections.close_all()
+    return built
+
+
+class Command(BaseCommand):
+    help = 'Pre-build interview question sets for common goal/level/domain combinations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep running, one pass every --interval seconds')
+        parser.add_argument('--interval', type=float, default=getattr(settings, 'QUESTION_PREWARM_INTERVAL', 300))
+        parser.add_argument('--concurrency', type=int, default=getattr(settings, 'QUESTION_PREWARM_CONCURRENCY', 2),
+                            help='Combinations refilled at once (concurrent Gemini calls)')
+        parser.add_argument('--goals', default=','.join(question_bank.QUESTION_COUNTS))
+        parser.add_argument('--levels', default=','.join(getattr(settings, 'QUESTION_PREWARM_LEVELS', ['internship', 'entry', 'mid'])))
+        parser.add_argument('--domains', default=','.join(getattr(settings, 'QUESTION_PREWARM_DOMAINS', ['dsa', 'web', 'ml', 'core'])))
+
+    def handle(self, *args, **options):
+        if not gemini_client.has_api_key():
+            raise CommandError('Gemini is not configured; question sets can only be built with the model')
+        combinations = [
+            (goal, level, domain)
+            for goal in _csv(options['goals'])
+            for level in _csv(options['levels'])
+            for domain in _csv(options['domains'])
+        ]
+        try:
+            while True:
+                self._pass(combinations, max(1, options['concurrency']))
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Interrupted')
+
+    def _pass(self, combinations, concurrency):
+        self._build(combinations, concurrency)
+        # Index the questions this pass and the web process added to the bank
+        if question_index.is_enabled():
+            try:
+                question_index.update()
+            except Exception as e:
+                self.stderr.write(f"⚠️ Question index not updated: {e}")
+
+    def _build(self, combinations, concurrency):
+        started = time.perf_counter()
+        pending = []
+        for goal, level, domain in combinations:
+            shortfall = question_bank.pool_shortfall(goal, level, domain)
+            if shortfall:
+                pending.append((goal, level, domain, shortfall))
+        if not pending:
+            self.stdout.write(f"✅ All {len(combinations)} combinations have {question_bank.pool_size()} ready sets")
+            return
+
+        self.stdout.write(f"🔥 Building {sum(item[3] for item in pending)} question set(s) "
+                          f"for {len(pending)} combination(s), {concurrency} at a time")
+        totals = {'bank': 0, 'gemini': 0}
+        failed = 0
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = {pool.submit(_refill, *item): item for item in pending}
+            for future in as_completed(futures):
+                goal, level, domain, wanted = futures[future]
+                try:
+                    built = future.result()
+                except Exception as e:
+                    built = {}
+                    self.stderr.write(f"❌ {goal}/{level}/{domain}: {e}")
+                for source, count in built.items():
+                    totals[source] += count
+                failed += wanted - sum(built.values())
+                self.stdout.write(f"   {goal}/{level}/{domain}: {sum(built.values())}/{wanted}")
+
+        self.stdout.write(f"✅ Built {totals['bank'] + totals['gemini']} set(s) in {time.perf_counter() - started:.1f}s: "
+                          f"{totals['bank']} from the bank, {totals['gemini']} from Gemini"
+                          f"{f', {failed} not built' if failed else ''}")
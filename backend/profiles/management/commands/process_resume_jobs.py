@@ -0,0 +1,69 @@
+"""
+Worker for background resume parsing.
+
+Takes ResumeParseJob rows queued by `POST /api/resume/upload/?async=1` and
+parses them with the same code path as a synchronous upload. Run one or more
+workers next to the web process:
+
+    python manage.py process_resume_jobs
+    python manage.py process_resume_jobs --once     # drain the queue and exit
+
+Workers claim jobs with a conditional UPDATE, so any number can run against
+the same database. Jobs left 'processing' by a worker that died are
+requeued after RESUME_JOB_STALE_SECONDS.
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from profiles import resume_service
+
+
+class Command(BaseCommand):
+    help = 'Process queued resume parse jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+        parser.add_argument('--max-jobs', type=int, default=0, help='Exit after this many jobs (0 = no limit)')
+        parser.add_argument(
+            '--poll-interval', type=float, default=getattr(settings, 'RESUME_JOB_POLL_INTERVAL', 2),
+            help='Seconds to sleep when the queue is empty'
+        )
+
+    def handle(self, *args, **options):
+        worker = resume_service.worker_id()
+        processed = failed = 0
+        last_sweep = 0
+        self.stdout.write(f"🛠️ Resume parse worker {worker} started")
+
+        try:
+            while True:
+                close_old_connections()
+                if time.monotonic() - last_sweep > 60:
+                    requeued, expired = resume_service.requeue_stale_jobs()
+                    if requeued or expired:
+                        self.stdout.write(f"♻️ Requeued {requeued} stale job(s), failed {expired}")
+                    last_sweep = time.monotonic()
+
+                job = resume_service.claim_next_job(worker)
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                started = time.perf_counter()
+                if resume_service.process_job(job):
+                    processed += 1
+                else:
+                    failed += 1
+                self.stdout.write(f"   {job.id} {job.file_name}: {(time.perf_counter() - started):.1f}s")
+
+                if options['max_jobs'] and processed + failed >= options['max_jobs']:
+                    break
+        except KeyboardInterrupt:
+            self.stdout.write('Interrupted')
+
+        self.stdout.write(f"✅ Worker {worker} done: {processed} parsed, {failed} failed")
@@ -0,0 +1,78 @@
+"""
+Lightweight in-process metrics for the AI layer.
+
+Counters, gauges and timing samples are kept per worker process and exposed
+through the /api/metrics/ endpoint. Nothing here talks to an external service.
+"""
+import threading
+from collections import defaultdict, deque
+
+# Keep a bounded window of samples per timing so percentiles stay cheap
+MAX_TIMING_SAMPLES = 1000
+
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_gauges = {}
+_timings = defaultdict(lambda: deque(maxlen=MAX_TIMING_SAMPLES))
+
+
+def incr(name, value=1):
+    """Increment a counter"""
+    with _lock:
+        _counters[name] += value
+
+
+def set_gauge(name, value):
+    """Set a gauge to its current value"""
+    with _lock:
+        _gauges[name] = value
+
+
+def observe(name, value_ms):
+    """Record a timing sample in milliseconds"""
+    with _lock:
+        _timings[name].append(value_ms)
+
+
+def get_counter(name):
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def snapshot():
+    """Return a JSON-serialisable view of every metric in this process"""
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        timings = {name: sorted(samples) for name, samples in _timings.items()}
+
+    timing_summary = {}
+    for name, values in timings.items():
+        timing_summary[name] = {
+            'count': len(values),
+            'p50': percentile(values, 50),
+            'p95': percentile(values, 95),
+            'p99': percentile(values, 99),
+            'max': values[-1] if values else None,
+        }
+
+    return {
+        'counters': counters,
+        'gauges': gauges,
+        'timings_ms': timing_summary,
+    }
+
+
+def reset():
+    """Clear all metrics (used by load tests between runs)"""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _timings.clear()
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.4 on 2026-10-17 03:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_interviewanalysis'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMCacheEntry',
+            fields=[
+                ('key', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('namespace', models.CharField(db_index=True, max_length=100)),
+                ('model_name', models.CharField(blank=True, max_length=100)),
+                ('response', models.JSONField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('last_accessed_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name_plural': 'LLM Cache Entries',
+                'db_table': 'llm_cache_entries',
+            },
+        ),
+    ]
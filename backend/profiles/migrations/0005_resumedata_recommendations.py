@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-17 03:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0004_llmcacheentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumedata',
+            name='recommendations',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
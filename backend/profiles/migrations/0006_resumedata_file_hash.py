@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-17 03:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0005_resumedata_recommendations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumedata',
+            name='file_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.4 on 2026-10-17 04:00
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0006_resumedata_file_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeParseJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('file_name', models.CharField(max_length=255)),
+                ('file_hash', models.CharField(blank=True, max_length=64, null=True)),
+                ('file_data', models.BinaryField(blank=True, default=b'')),
+                ('attempts', models.IntegerField(default=0)),
+                ('locked_by', models.CharField(blank=True, max_length=100, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('resume', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='parse_jobs', to='profiles.resumedata')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resume_jobs', to='profiles.userprofile')),
+            ],
+            options={
+                'db_table': 'resume_parse_jobs',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='resume_pars_status_25fdcb_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.4 on 2026-10-17 04:04
+
+import zlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def copy_raw_text(apps, schema_editor):
+    ResumeData = apps.get_model('profiles', 'ResumeData')
+    ResumeRawText = apps.get_model('profiles', 'ResumeRawText')
+    rows = []
+    for resume_id, text in ResumeData.objects.exclude(raw_text__isnull=True).values_list('id', 'raw_text').iterator():
+        rows.append(ResumeRawText(resume_id=resume_id, compressed=zlib.compress(text.encode('utf-8')), length=len(text)))
+        if len(rows) >= BATCH_SIZE:
+            ResumeRawText.objects.bulk_create(rows)
+            rows = []
+    ResumeRawText.objects.bulk_create(rows)
+
+
+def restore_raw_text(apps, schema_editor):
+    ResumeData = apps.get_model('profiles', 'ResumeData')
+    ResumeRawText = apps.get_model('profiles', 'ResumeRawText')
+    for record in ResumeRawText.objects.iterator():
+        text = zlib.decompress(bytes(record.compressed)).decode('utf-8') if record.compressed else ''
+        ResumeData.objects.filter(id=record.resume_id).update(raw_text=text)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0007_resumeparsejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeRawText',
+            fields=[
+                ('resume', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='raw_text_record', serialize=False, to='profiles.resumedata')),
+                ('compressed', models.BinaryField(default=b'')),
+                ('length', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'resume_raw_text',
+            },
+        ),
+        migrations.RunPython(copy_raw_text, restore_raw_text),
+        migrations.RemoveField(
+            model_name='resumedata',
+            name='raw_text',
+        ),
+    ]
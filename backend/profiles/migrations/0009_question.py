@@ -0,0 +1,36 @@
+# Generated by Django 5.1.4 on 2026-10-17 04:09
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0008_resumerawtext'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Question',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(max_length=50)),
+                ('level', models.CharField(max_length=50)),
+                ('type', models.CharField(default='conceptual', max_length=20)),
+                ('difficulty', models.CharField(default='medium', max_length=10)),
+                ('text', models.TextField()),
+                ('text_hash', models.CharField(max_length=64)),
+                ('topics', models.JSONField(blank=True, default=list)),
+                ('expected_answer_points', models.JSONField(blank=True, default=list)),
+                ('times_served', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_served_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'interview_questions',
+                'indexes': [models.Index(fields=['domain', 'level', 'times_served'], name='question_bank_lookup')],
+                'constraints': [models.UniqueConstraint(fields=('domain', 'level', 'text_hash'), name='unique_question_per_bank')],
+            },
+        ),
+    ]
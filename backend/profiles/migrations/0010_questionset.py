@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-17 04:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0009_question'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('goal', models.CharField(max_length=20)),
+                ('level', models.CharField(max_length=50)),
+                ('domain', models.CharField(max_length=50)),
+                ('questions', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'question_sets',
+                'indexes': [models.Index(fields=['goal', 'level', 'domain', 'created_at'], name='question_set_pool')],
+            },
+        ),
+    ]
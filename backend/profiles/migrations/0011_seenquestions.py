@@ -0,0 +1,28 @@
+# Generated by Django 5.1.4 on 2026-10-17 04:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0010_questionset'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeenQuestions',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='seen_questions', serialize=False, to='profiles.userprofile')),
+                ('current', models.BinaryField(default=b'')),
+                ('previous', models.BinaryField(default=b'')),
+                ('current_count', models.IntegerField(default=0)),
+                ('total_served', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'seen_questions',
+            },
+        ),
+    ]
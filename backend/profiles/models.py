@@ -1,3 +1,6 @@
+import uuid
+import zlib
+
 from django.db import models
 from django.utils import timezone
 
@@ -62,12 +65,15 @@ class ResumeData(models.Model):
     years_of_experience = models.IntegerField(default=0, blank=True, null=True)
     key_strengths = models.JSONField(default=list, blank=True)
     
-    # Raw text from resume
-    raw_text = models.TextField(blank=True, null=True)
+    # Interview recommendations (goal, target_level, domain, reasoning),
+    # generated with the extraction and replaced whenever a resume is uploaded
+    recommendations = models.JSONField(blank=True, null=True)
     
     # File info
     file_name = models.CharField(max_length=255, blank=True, null=True)
     file_url = models.URLField(blank=True, null=True)
+    # SHA-256 of the uploaded file; a re-upload of the same file is served from this row
+    file_hash = models.CharField(max_length=64, blank=True, null=True, db_index=True)
     uploaded_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -78,6 +84,161 @@ class ResumeData(models.Model):
     def __str__(self):
         return f"Resume of {self.user.name}"
 
+    def get_raw_text(self):
+        """The resume's extracted text, loaded from its ResumeRawText row"""
+        try:
+            return self.raw_text_record.text
+        except ResumeRawText.DoesNotExist:
+            return ''
+
+    def set_raw_text(self, text):
+        ResumeRawText.objects.update_or_create(resume=self, defaults=ResumeRawText.pack(text))
+
+
+class ResumeRawText(models.Model):
+    """
+    Extracted resume text, zlib-compressed and kept out of the resume_data row
+    so profile and resume queries don't read it. Only fetched on request
+    (`?include=raw_text`) and in the admin.
+    """
+    resume = models.OneToOneField(ResumeData, on_delete=models.CASCADE, primary_key=True, related_name='raw_text_record')
+    compressed = models.BinaryField(default=b'')
+    length = models.IntegerField(default=0)  # characters before compression
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'resume_raw_text'
+
+    def __str__(self):
+        return f"Raw text of resume {self.resume_id} ({self.length} chars)"
+
+    @staticmethod
+    def pack(text):
+        """Field values for storing `text`"""
+        text = text or ''
+        return {'compressed': zlib.compress(text.encode('utf-8')), 'length': len(text)}
+
+    @property
+    def text(self):
+        return zlib.decompress(bytes(self.compressed)).decode('utf-8') if self.compressed else ''
+
+
+class ResumeParseJob(models.Model):
+    """
+    Queued resume upload waiting to be parsed by `manage.py process_resume_jobs`.
+    The file bytes are kept only until the job finishes.
+    """
+    QUEUED = 'queued'
+    PROCESSING = 'processing'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (PROCESSING, 'Processing'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='resume_jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    
+    # Uploaded file, cleared once parsed
+    file_name = models.CharField(max_length=255)
+    file_hash = models.CharField(max_length=64, blank=True, null=True)
+    file_data = models.BinaryField(blank=True, default=b'')
+    
+    # Processing state
+    attempts = models.IntegerField(default=0)
+    locked_by = models.CharField(max_length=100, blank=True, null=True)
+    error = models.TextField(blank=True, null=True)
+    resume = models.ForeignKey(ResumeData, on_delete=models.SET_NULL, null=True, blank=True, related_name='parse_jobs')
+    
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'resume_parse_jobs'
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+    def __str__(self):
+        return f"Parse job {self.id} ({self.status}) for {self.file_name}"
+
+
+class Question(models.Model):
+    """
+    Interview question in the question bank. Every question Gemini generates
+    is stored here, so later requests for the same domain and level are
+    assembled from the bank instead of calling the model.
+    """
+    domain = models.CharField(max_length=50)
+    level = models.CharField(max_length=50)
+    type = models.CharField(max_length=20, default='conceptual')
+    difficulty = models.CharField(max_length=10, default='medium')
+    text = models.TextField()
+    # SHA-256 of the normalized text; the same question is stored once per domain and level
+    text_hash = models.CharField(max_length=64)
+    topics = models.JSONField(default=list, blank=True)
+    expected_answer_points = models.JSONField(default=list, blank=True)
+    times_served = models.IntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    last_served_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'interview_questions'
+        constraints = [
+            models.UniqueConstraint(fields=['domain', 'level', 'text_hash'], name='unique_question_per_bank'),
+        ]
+        indexes = [
+            models.Index(fields=['domain', 'level', 'times_served'], name='question_bank_lookup'),
+        ]
+
+    def __str__(self):
+        return f"[{self.domain}/{self.level}/{self.difficulty}] {self.text[:60]}"
+
+
+class QuestionSet(models.Model):
+    """
+    Ready-made question set for a goal/level/domain combination, built by
+    `manage.py prewarm_questions`. A request takes one by deleting it.
+    """
+    goal = models.CharField(max_length=20)
+    level = models.CharField(max_length=50)
+    domain = models.CharField(max_length=50)
+    questions = models.JSONField(default=list)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'question_sets'
+        indexes = [
+            models.Index(fields=['goal', 'level', 'domain', 'created_at'], name='question_set_pool'),
+        ]
+
+    def __str__(self):
+        return f"{self.goal}/{self.level}/{self.domain} set ({len(self.questions)} questions)"
+
+
+class SeenQuestions(models.Model):
+    """
+    Bloom filters of the question fingerprints a user has been served (see
+    profiles/seen_questions.py). `current` takes new fingerprints and
+    replaces `previous` once full, so the row keeps a fixed size.
+    """
+    user = models.OneToOneField(UserProfile, on_delete=models.CASCADE, primary_key=True, related_name='seen_questions')
+    current = models.BinaryField(default=b'')
+    previous = models.BinaryField(default=b'')
+    current_count = models.IntegerField(default=0)  # fingerprints added to `current`
+    total_served = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'seen_questions'
+
+    def __str__(self):
+        return f"Questions seen by {self.user_id} ({self.total_served} served)"
+
 
 class InterviewAnalysis(models.Model):
     """
@@ -121,3 +282,24 @@ class InterviewAnalysis(models.Model):
     def __str__(self):
         return f"Interview Analysis for {self.user.name} on {self.analyzed_at.strftime('%Y-%m-%d')}"
 
+
+
+class LLMCacheEntry(models.Model):
+    """
+    Shared Gemini response cache entry (used when LLM_CACHE_BACKEND=db).
+    Keyed on a SHA-256 of model name + prompt.
+    """
+    key = models.CharField(max_length=64, primary_key=True)
+    namespace = models.CharField(max_length=100, db_index=True)
+    model_name = models.CharField(max_length=100, blank=True)
+    response = models.JSONField()
+    created_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(db_index=True)
+    last_accessed_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        db_table = 'llm_cache_entries'
+        verbose_name_plural = 'LLM Cache Entries'
+
+    def __str__(self):
+        return f"{self.namespace} ({self.key[:12]})"
@@ -0,0 +1,154 @@
+"""
+PDF text extraction for resume uploads.
+
+* Page texts are collected in a list and joined once, so building the text
+  takes linear time.
+* Files over RESUME_PDF_MAX_BYTES are rejected before they are parsed. Only
+  the first RESUME_PDF_MAX_PAGES pages are read.
+* Documents with at least RESUME_PDF_PARALLEL_MIN_PAGES pages are split into
+  page ranges, and the ranges are extracted in a process pool. PyPDF2 is
+  pure Python, so threads would not help. Each worker has to re-open the
+  PDF, so short resumes are read in-process instead.
+* The extraction time of every page is returned and recorded in the
+  resume.pdf.page_ms metric.
+"""
+import io
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import PyPDF2
+from django.conf import settings
+
+from . import metrics
+
+
+class PDFTooLargeError(ValueError):
+    """The file is over RESUME_PDF_MAX_BYTES"""
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _read_pages(reader, start, stop):
+    """[(text, ms)] for pages [start, stop) of an open PdfReader"""
+    results = []
+    for index in range(start, stop):
+        started = time.perf_counter()
+        try:
+            text = reader.pages[index].extract_text() or ''
+        except Exception as e:
+            print(f"Error extracting PDF page {index + 1}: {e}")
+            text = ''
+        results.append((text, (time.perf_counter() - started) * 1000))
+    return results
+
+
+def _extract_range(data, start, stop):
+    """Pool worker: open the PDF from its bytes and read one page range"""
+    return _read_pages(PyPDF2.PdfReader(io.BytesIO(data)), start, stop)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _workers():
+    return _setting('RESUME_PDF_WORKERS', 0) or min(4, os.cpu_count() or 1)
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: forking a multi-threaded server process is unsafe
+            _pool = ProcessPoolExecutor(max_workers=_workers(), mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def page_ranges(page_count, parts, min_pages=1):
+    """Split pages [0, page_count) into at most `parts` ranges of at least `min_pages`"""
+    size = max(min_pages, math.ceil(page_count / max(parts, 1)))
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def _read_parallel(data, page_count):
+    """Per-page results from the process pool, or None if the pool broke"""
+    ranges = page_ranges(page_count, _workers(), _setting('RESUME_PDF_PAGES_PER_TASK', 4))
+    try:
+        pool = _get_pool()
+        futures = [pool.submit(_extract_range, data, start, stop) for start, stop in ranges]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+    except BrokenProcessPool as e:
+        print(f"PDF worker pool failed, extracting in-process: {e}")
+        _reset_pool()
+        return None
+
+
+def _read_bytes(file, max_bytes):
+    if isinstance(file, (bytes, bytearray)):
+        data = bytes(file)
+    else:
+        if getattr(file, 'size', None) and file.size > max_bytes:
+            raise PDFTooLargeError(f"PDF is {file.size} bytes, limit is {max_bytes}")
+        if hasattr(file, 'seek'):
+            file.seek(0)
+        data = b''.join(file.chunks()) if hasattr(file, 'chunks') else file.read()
+    if len(data) > max_bytes:
+        raise PDFTooLargeError(f"PDF is {len(data)} bytes, limit is {max_bytes}")
+    return data
+
+
+def extract(file):
+    """
+    Extract the text of a PDF given as bytes or a file object. Returns a dict
+    with text, page_count, pages_read, truncated, parallel, page_timings_ms
+    and elapsed_ms.
+    """
+    started = time.perf_counter()
+    data = _read_bytes(file, _setting('RESUME_PDF_MAX_BYTES', 10 * 1024 * 1024))
+
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    page_count = len(reader.pages)
+    pages_read = min(page_count, _setting('RESUME_PDF_MAX_PAGES', 30))
+
+    results = None
+    if pages_read >= _setting('RESUME_PDF_PARALLEL_MIN_PAGES', 8) and _workers() > 1:
+        results = _read_parallel(data, pages_read)
+    parallel = results is not None
+    if results is None:
+        results = _read_pages(reader, 0, pages_read)
+
+    timings = [round(ms, 2) for _, ms in results]
+    for ms in timings:
+        metrics.observe('resume.pdf.page_ms', ms)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    metrics.observe('resume.pdf.extract_ms', elapsed_ms)
+    if pages_read < page_count:
+        metrics.incr('resume.pdf.truncated')
+
+    return {
+        'text': '\n'.join(text for text, _ in results),
+        'page_count': page_count,
+        'pages_read': pages_read,
+        'truncated': pages_read < page_count,
+        'parallel': parallel,
+        'page_timings_ms': timings,
+        'elapsed_ms': round(elapsed_ms, 2),
+    }
@@ -0,0 +1,202 @@
+"""
+Token budgeting for the live-interview question prompt.
+
+The client sends the whole chat on every turn, and candidates paste long
+code answers, so inlining history verbatim makes the prompt (and Gemini
+latency and cost) grow for the whole interview. build_history() keeps the
+conversation section under a token budget instead:
+
+* the most recent messages are kept verbatim (each capped at
+  INTERVIEW_MESSAGE_MAX_TOKENS, long ones cut in the middle), as many as fit;
+* older messages are folded into a running extractive summary - one short
+  line per message - which itself is capped at INTERVIEW_SUMMARY_MAX_TOKENS
+  by dropping its oldest lines.
+
+The summary is cached per interview session in the Django cache, so each
+turn only folds the messages that just fell out of the verbatim window.
+Sessions are keyed by the client's session_id or, failing that, by the first
+message of the chat (it carries the interview's start timestamp).
+
+Tokens are estimated from character counts (about 4 characters per token
+for Gemini); no tokenizer round-trip is made.
+"""
+import hashlib
+import json
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import metrics
+
+CHARS_PER_TOKEN = 4
+
+SUMMARY_HEADER = "Earlier in the interview (summary):"
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def estimate_tokens(text):
+    """Rough Gemini token count for `text`"""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut `text` to about `max_tokens`, keeping its beginning and end"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    keep = max_tokens * CHARS_PER_TOKEN
+    head = text[:keep * 2 // 3].rstrip()
+    tail = text[-(keep // 3):].lstrip() if keep >= 3 else ''
+    omitted = estimate_tokens(text) - max_tokens
+    return f"{head} [... ~{omitted} tokens omitted ...] {tail}"
+
+
+def speaker(message):
+    return 'AI' if message.get('type') == 'ai' else 'Candidate'
+
+
+def format_message(message):
+    text = truncate_to_tokens(str(message.get('message', '')), _setting('INTERVIEW_MESSAGE_MAX_TOKENS', 250))
+    return f"{speaker(message)}: {text}"
+
+
+def _looks_like_code(text):
+    return '```' in text or (text.count('\n') >= 3 and any(ch in text for ch in '{};='))
+
+
+def summarize_message(message):
+    """One short summary line for a message: its first sentence, clipped"""
+    text = ' '.join(str(message.get('message', '')).split())
+    first = text.split('. ')[0]
+    line = f"{'Q' if message.get('type') == 'ai' else 'A'}: {truncate_to_tokens(first, 30)}"
+    if _looks_like_code(str(message.get('message', ''))):
+        line += ' [code answer]'
+    return line
+
+
+def session_key(conversation_history, session_id=None):
+    if session_id:
+        ident = str(session_id)
+    elif conversation_history:
+        first = conversation_history[0]
+        ident = json.dumps([first.get('timestamp'), first.get('message')], default=str)
+    else:
+        return None
+    return 'interview-summary:' + hashlib.sha256(ident.encode()).hexdigest()[:32]
+
+
+def _digest(messages):
+    hasher = hashlib.sha256()
+    for message in messages:
+        hasher.update(json.dumps([message.get('type'), message.get('message')], default=str).encode())
+    return hasher.hexdigest()
+
+
+def _split(messages, budget):
+    """Index where the verbatim tail starts, and the formatted tail lines"""
+    max_recent = _setting('INTERVIEW_RECENT_MESSAGES', 10)
+    lines = []
+    used = 0
+    start = len(messages)
+    for message in reversed(messages[-max_recent:]):
+        line = format_message(message)
+        cost = estimate_tokens(line) + 1
+        if lines and used + cost > budget:
+            break
+        lines.append(line)
+        used += cost
+        start -= 1
+    lines.reverse()
+    return start, lines
+
+
+def _fold(messages, folded_count, cached):
+    """
+    Extend the cached summary so it covers messages[:folded_count]. Returns
+    the new cache entry.
+    """
+    if cached and cached['count'] <= folded_count and cached['digest'] == _digest(messages[:cached['count']]):
+        metrics.incr('prompt_budget.summary_cache_hits')
+        entry = {'count': cached['count'], 'lines': list(cached['lines']), 'dropped': cached['dropped']}
+    else:
+        if cached:
+            metrics.incr('prompt_budget.summary_rebuilds')
+        entry = {'count': 0, 'lines': [], 'dropped': 0}
+
+    for message in messages[entry['count']:folded_count]:
+        entry['lines'].append(summarize_message(message))
+    entry['count'] = folded_count
+    entry['digest'] = _digest(messages[:folded_count])
+
+    # Keep the summary itself bounded: forget the oldest lines first
+    limit = _setting('INTERVIEW_SUMMARY_MAX_TOKENS', 400)
+    while entry['lines'] and estimate_tokens('\n'.join(entry['lines'])) > limit:
+        entry['lines'].pop(0)
+        entry['dropped'] += 1
+    return entry
+
+
+def _render_summary(entry):
+    lines = [SUMMARY_HEADER]
+    if entry['dropped']:
+        lines.append(f"({entry['dropped']} earlier messages not shown)")
+    lines.extend(entry['lines'])
+    return '\n'.join(lines)
+
+
+def _plan(messages, budget, cached):
+    """
+    Work out the history text for `budget` tokens. Returns (text, entry to
+    cache or None).
+    """
+    summary_reserve = _setting('INTERVIEW_SUMMARY_MAX_TOKENS', 400) + estimate_tokens(SUMMARY_HEADER) + 20
+    start, recent = _split(messages, budget)
+    if start == 0:
+        return '\n'.join(recent), None
+
+    # Older turns exist: make room for the summary and fold everything before the tail
+    start, recent = _split(messages, max(0, budget - summary_reserve))
+    entry = _fold(messages, start, cached)
+    return _render_summary(entry) + '\n\n' + '\n'.join(recent), entry
+
+
+def build_history(conversation_history, budget, session_id=None):
+    """Conversation section of the prompt, at most about `budget` tokens"""
+    messages = list(conversation_history or [])
+    key = session_key(messages, session_id)
+    cached = None
+    if key:
+        try:
+            cached = cache.get(key)
+        except Exception as e:
+            print(f"Interview summary cache unavailable: {e}")
+    text, entry = _plan(messages, budget, cached)
+    if key and entry is not None and entry != cached:
+        try:
+            cache.set(key, entry, _setting('INTERVIEW_SUMMARY_TTL', 3 * 60 * 60))
+        except Exception as e:
+            print(f"Interview summary cache unavailable: {e}")
+    return text
+
+
+async def build_history_async(conversation_history, budget, session_id=None):
+    messages = list(conversation_history or [])
+    key = session_key(messages, session_id)
+    cached = None
+    if key:
+        try:
+            cached = await cache.aget(key)
+        except Exception as e:
+            print(f"Interview summary cache unavailable: {e}")
+    text, entry = _plan(messages, budget, cached)
+    if key and entry is not None and entry != cached:
+        try:
+            await cache.aset(key, entry, _setting('INTERVIEW_SUMMARY_TTL', 3 * 60 * 60))
+        except Exception as e:
+            print(f"Interview summary cache unavailable: {e}")
+    return text
@@ -0,0 +1,291 @@
+"""
+Question bank: interview question sets assembled from stored questions.
+
+Most requests to /api/questions/generate/ ask for a (domain, level) pair
+that many users have asked for before. generate_interview_questions()
+therefore asks assemble() for a set first. It only calls Gemini for the
+slots the bank can't fill, plus QUESTION_BANK_FRESH_QUESTIONS new questions
+per request if configured. Every question Gemini returns is stored with
+store_questions(), so the bank grows until most sets come from one indexed
+query.
+
+Selection, per set:
+
+* slot difficulties follow an easy -> hard plan (difficulty_plan);
+* within a difficulty, the questions most relevant to the candidate's
+  skills and projects come first (question_index, no model call), then
+  question types not yet in the set, then the least served questions, so
+  that users see different questions;
+* the QUESTION_BANK_CANDIDATES least served questions of the pair are
+  loaded (index on domain, level, times_served), plus the
+  QUESTION_INDEX_CANDIDATES most relevant ones;
+* questions the user has already been served (`exclude`, see
+  seen_questions.py) are skipped, loading further pages of candidates if
+  needed.
+
+`manage.py prewarm_questions` keeps QUESTION_POOL_SIZE ready-made
+QuestionSets per goal/level/domain combination (pool_shortfall, add_set).
+It assembles them from the bank, and only asks Gemini while the bank is too
+small, which also grows the bank. Requests without a resume take a set
+as-is. Requests with one take a set only when the bank can't fill a
+personalised set. pop_set() claims a set by deleting its row: only one
+request can delete it, so no locking is needed.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from . import metrics, question_index
+from .models import Question, QuestionSet
+
+DIFFICULTIES = ['easy', 'medium', 'hard']
+QUESTION_COUNTS = {'full': 8, 'focused': 5, 'quick': 3}
+# Seconds between checks of how far the index is behind the bank, per pair and worker
+INDEX_LAG_CHECK_INTERVAL = 300
+
+_index_checked = {}  # (domain, level) -> monotonic time of the last index lag check
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def is_enabled():
+    return _setting('QUESTION_BANK_ENABLED', True)
+
+
+def question_count(goal):
+    return QUESTION_COUNTS.get(goal, 5)
+
+
+def _key(value):
+    return str(value or '').strip().lower()
+
+
+def question_hash(text):
+    return hashlib.sha256(' '.join(str(text).lower().split()).encode('utf-8')).hexdigest()
+
+
+def looks_complete(text):
+    """False for question text that was clearly cut off mid-sentence"""
+    text = str(text or '').rstrip()
+    return len(text) >= 12 and text[-1] in '?.!)]"\'`'
+
+
+def difficulty_plan(count):
+    """Slot difficulties for a set of `count` questions, easy first"""
+    return [DIFFICULTIES[min(len(DIFFICULTIES) - 1, i * len(DIFFICULTIES) // count)] for i in range(count)]
+
+
+def difficulty_rank(question):
+    difficulty = question.get('difficulty')
+    return DIFFICULTIES.index(difficulty) if difficulty in DIFFICULTIES else 1
+
+
+def to_dict(question):
+    return {
+        'question': question.text,
+        'type': question.type,
+        'difficulty': question.difficulty,
+        'topics': question.topics,
+        'expected_answer_points': question.expected_answer_points,
+    }
+
+
+def _skill_words(resume_data):
+    words = set()
+    for skill in (resume_data or {}).get('skills') or []:
+        words.update(str(skill).lower().replace('.', ' ').split())
+    return words
+
+
+def _check_index_lag(domain, level):
+    """
+    Warn when the question index is QUESTION_INDEX_LAG_WARNING or more
+    questions behind the bank for a pair, i.e. nothing runs the index update
+    """
+    key = (_key(domain), _key(level))
+    now = time.monotonic()
+    if key in _index_checked and now - _index_checked[key] < INDEX_LAG_CHECK_INTERVAL:
+        return
+    _index_checked[key] = now
+    partition = question_index.load_partition(domain, level)
+    lag = max(0, bank_size(domain, level) - (partition.count if partition else 0))
+    metrics.set_gauge(f'questions.index.lag.{question_index.partition_name(domain, level)}', lag)
+    if lag >= _setting('QUESTION_INDEX_LAG_WARNING', 50):
+        print(f"⚠️ Question index is {lag} questions behind the bank for {domain}/{level}; "
+              f"run `manage.py build_question_index` from cron or keep `manage.py prewarm_questions --loop` running")
+
+
+def _relevance(domain, level, resume_data):
+    """{question id: relevance score} from the question index, or None when it has no match"""
+    if not resume_data or not question_index.is_enabled():
+        return None
+    try:
+        _check_index_lag(domain, level)
+        return dict(question_index.rank(domain, level, resume_data, limit=_setting('QUESTION_INDEX_CANDIDATES', 50))) or None
+    except Exception as e:
+        print(f"⚠️ Question index unavailable, matching topic words instead: {e}")
+        return None
+
+
+def _overlap(question, skill_words):
+    if not skill_words:
+        return 0
+    topic_words = set()
+    for topic in question.topics or []:
+        topic_words.update(str(topic).lower().replace('.', ' ').split())
+    return len(topic_words & skill_words)
+
+
+def _candidates(domain, level, exclude):
+    """The least served questions of a pair that aren't in `exclude`"""
+    size = _setting('QUESTION_BANK_CANDIDATES', 200)
+    queryset = Question.objects.filter(domain=_key(domain), level=_key(level)).order_by('times_served', 'id')
+    if not exclude:
+        return list(queryset[:size])
+    candidates = []
+    for page in range(_setting('QUESTION_SEEN_MAX_PAGES', 5)):
+        rows = list(queryset[page * size:(page + 1) * size])
+        candidates += [q for q in rows if q.text_hash not in exclude]
+        if len(rows) < size or len(candidates) >= size:
+            break
+    return candidates
+
+
+def assemble(domain, level, count, resume_data=None, exclude=None):
+    """
+    Up to `count` questions from the bank for (domain, level), as dicts in
+    easy -> hard order, leaving out fingerprints in `exclude`. Returns
+    (questions, hashes of the chosen questions).
+    """
+    candidates = _candidates(domain, level, exclude)
+    relevance = _relevance(domain, level, resume_data)
+    if relevance:
+        loaded = {q.id for q in candidates}
+        candidates += [
+            q for q in Question.objects.filter(
+                id__in=[question_id for question_id in relevance if question_id not in loaded],
+                domain=_key(domain), level=_key(level),
+            )
+            if not exclude or q.text_hash not in exclude
+        ]
+    if not candidates:
+        return [], set()
+
+    skill_words = _skill_words(resume_data)
+
+    def match(question):
+        if relevance:
+            return relevance.get(question.id, 0)
+        return _overlap(question, skill_words)
+
+    chosen = []
+    used_types = set()
+    for difficulty in difficulty_plan(count):
+        if not candidates:
+            break
+        target = DIFFICULTIES.index(difficulty)
+        best = min(
+            candidates,
+            key=lambda q: (
+                abs(DIFFICULTIES.index(q.difficulty) - target) if q.difficulty in DIFFICULTIES else 1,
+                -match(q),
+                q.type in used_types,
+                q.times_served,
+            ),
+        )
+        candidates.remove(best)
+        chosen.append(best)
+        used_types.add(best.type)
+
+    Question.objects.filter(id__in=[q.id for q in chosen]).update(
+        times_served=F('times_served') + 1,
+        last_served_at=timezone.now(),
+    )
+    questions = sorted((to_dict(q) for q in chosen), key=difficulty_rank)
+    return questions, {q.text_hash for q in chosen}
+
+
+def store_questions(questions, domain, level):
+    """Add generated questions to the bank. Returns how many were new; duplicates are ignored"""
+    rows = []
+    seen = set()
+    for question in questions or []:
+        text = str(question.get('question') or '').strip()
+        if not text:
+            continue
+        text_hash = question_hash(text)
+        if text_hash in seen:
+            continue
+        seen.add(text_hash)
+        rows.append(Question(
+            domain=_key(domain),
+            level=_key(level),
+            type=question.get('type') or 'conceptual',
+            difficulty=question.get('difficulty') or 'medium',
+            text=text,
+            text_hash=text_hash,
+            topics=question.get('topics') or [],
+            expected_answer_points=question.get('expected_answer_points') or [],
+        ))
+    if rows:
+        existing = set(Question.objects.filter(
+            domain=_key(domain), level=_key(level), text_hash__in=[row.text_hash for row in rows],
+        ).values_list('text_hash', flat=True))
+        rows = [row for row in rows if row.text_hash not in existing]
+    if rows:
+        # A concurrent request may still insert the same question first; the constraint skips it
+        Question.objects.bulk_create(rows, ignore_conflicts=True)
+        metrics.incr('questions.bank.stored', len(rows))
+    return len(rows)
+
+
+# -- pre-built sets ------------------------------------------------------------
+
+def bank_size(domain, level):
+    return Question.objects.filter(domain=_key(domain), level=_key(level)).count()
+
+
+def bank_texts(domain, level, limit=20):
+    """Texts of the most served questions of a pair"""
+    return list(
+        Question.objects.filter(domain=_key(domain), level=_key(level))
+        .order_by('-times_served', 'id')
+        .values_list('text', flat=True)[:limit]
+    )
+
+
+def pool_size():
+    return _setting('QUESTION_POOL_SIZE', 3)
+
+
+def pool_shortfall(goal, level, domain):
+    """Sets missing from a combination's pool"""
+    ready = QuestionSet.objects.filter(goal=_key(goal), level=_key(level), domain=_key(domain)).count()
+    return max(0, pool_size() - ready)
+
+
+def add_set(goal, level, domain, questions):
+    return QuestionSet.objects.create(goal=_key(goal), level=_key(level), domain=_key(domain), questions=questions)
+
+
+def pop_set(goal, level, domain, exclude=None):
+    """Take the oldest ready set for the combination with no question in `exclude`, or None"""
+    candidates = (
+        QuestionSet.objects
+        .filter(goal=_key(goal), level=_key(level), domain=_key(domain))
+        .order_by('created_at')
+        .values_list('id', 'questions')[:5]
+    )
+    for set_id, questions in candidates:
+        if exclude and any(question_hash(q.get('question', '')) in exclude for q in questions):
+            continue
+        deleted, _ = QuestionSet.objects.filter(id=set_id).delete()
+        if deleted:
+            metrics.incr('questions.pool.hits')
+            return questions
+    return None
@@ -0,0 +1,120 @@
+"""
+Fallback interview questions, served when Gemini is unavailable.
+
+The catalog lives in data/fallback_questions.json:
+
+    {"version": 1, "questions": [{"domain": "dsa", "difficulty": "easy",
+      "type": "coding", "question": "...", "topics": [...],
+      "expected_answer_points": [...]}, ...]}
+
+It is loaded once per process and indexed by domain, then by difficulty
+and by type. Unknown domains use the "dsa" questions.
+
+sample() builds a set in O(k) for k questions. Slot difficulties follow
+question_bank.difficulty_plan() (easy -> hard). Each slot scans at most
+MAX_PROBES questions of its difficulty, starting at a random offset, so
+repeated sets differ. Within a slot it prefers questions the caller wants
+to avoid less (e.g. the user has seen them), then question types not yet
+in the set. A set never contains the same question twice. When a
+difficulty runs out, the slot takes the nearest difficulty instead, and a
+domain with fewer questions than requested gives a shorter set.
+"""
+import json
+import os
+import random
+import threading
+
+from .question_bank import DIFFICULTIES, difficulty_plan, question_hash
+
+CATALOG_PATH = os.path.join(os.path.dirname(__file__), 'data', 'fallback_questions.json')
+CATALOG_VERSION = 1
+DEFAULT_DOMAIN = 'dsa'
+MAX_PROBES = 8
+
+_catalog = None
+_catalog_lock = threading.Lock()
+_random = random.Random()
+
+
+class Catalog:
+    def __init__(self, questions):
+        self.by_difficulty = {}  # domain -> difficulty -> [(fingerprint, question)]
+        self.by_type = {}  # domain -> type -> [(fingerprint, question)]
+        for question in questions:
+            domain = str(question.get('domain') or '').lower()
+            difficulty = question.get('difficulty')
+            if not domain or difficulty not in DIFFICULTIES or not question.get('question'):
+                continue
+            entry = (question_hash(question['question']), {
+                'question': question['question'],
+                'type': question.get('type') or 'conceptual',
+                'difficulty': difficulty,
+                'topics': question.get('topics') or [],
+                'expected_answer_points': question.get('expected_answer_points') or [],
+            })
+            self.by_difficulty.setdefault(domain, {}).setdefault(difficulty, []).append(entry)
+            self.by_type.setdefault(domain, {}).setdefault(entry[1]['type'], []).append(entry)
+
+    def domain(self, domain):
+        """Difficulty buckets of a domain, falling back to DEFAULT_DOMAIN"""
+        return self.by_difficulty.get(str(domain or '').lower()) or self.by_difficulty.get(DEFAULT_DOMAIN, {})
+
+
+def load_catalog(path=CATALOG_PATH):
+    with open(path, encoding='utf-8') as handle:
+        data = json.load(handle)
+    if data.get('version') != CATALOG_VERSION:
+        raise ValueError(f"{path} has catalog version {data.get('version')}, expected {CATALOG_VERSION}")
+    return Catalog(data['questions'])
+
+
+def get_catalog():
+    """The shared catalog, loaded on first use"""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = load_catalog()
+    return _catalog
+
+
+def _pick(buckets, target, used, types, exclude, avoid, rng):
+    """The best question for a slot of difficulty `target`, or None"""
+    best = best_rank = None
+    for distance, difficulty in sorted((abs(DIFFICULTIES.index(d) - target), d) for d in DIFFICULTIES):
+        bucket = buckets.get(difficulty) or []
+        if not bucket:
+            continue
+        start = rng.randrange(len(bucket))
+        for offset in range(min(len(bucket), MAX_PROBES)):
+            fingerprint, question = bucket[(start + offset) % len(bucket)]
+            if fingerprint in used or (exclude and fingerprint in exclude):
+                continue
+            rank = (bool(avoid) and fingerprint in avoid, distance, question['type'] in types)
+            if best_rank is None or rank < best_rank:
+                best, best_rank = (fingerprint, question), rank
+        # A question of the slot's own difficulty that isn't avoided is good enough
+        if best_rank is not None and not best_rank[0]:
+            break
+    return best
+
+
+def sample(domain, count, exclude=None, avoid=None, rng=None):
+    """
+    Up to `count` catalog questions for `domain`, easy -> hard. Fingerprints
+    in `exclude` are never picked; those in `avoid` only when nothing else
+    is left.
+    """
+    buckets = get_catalog().domain(domain)
+    rng = rng or _random
+    used, types, chosen = set(), set(), []
+    for difficulty in difficulty_plan(count) if count > 0 else []:
+        picked = _pick(buckets, DIFFICULTIES.index(difficulty), used, types, exclude, avoid, rng)
+        if picked is None:
+            break
+        fingerprint, question = picked
+        used.add(fingerprint)
+        types.add(question['type'])
+        chosen.append(question)
+    chosen.sort(key=lambda q: DIFFICULTIES.index(q['difficulty']))
+    return [dict(q, topics=list(q['topics']), expected_answer_points=list(q['expected_answer_points'])) for q in chosen]
@@ -1,37 +1,140 @@
-import os
-import json
-import google.generativeai as genai
-from dotenv import load_dotenv
+from django.conf import settings
 
-load_dotenv()
+from . import llm_cache, metrics, question_bank, question_catalog
+from . import gemini_client, llm_schemas
 
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
 
-
-def generate_interview_questions(goal, target_level, domain, resume_data=None):
+def generate_interview_questions(goal, target_level, domain, resume_data=None, seen=None):
     """
     Generate interview questions based on user's selections and resume data.
+    Questions come from the question bank first; Gemini only fills the gaps
+    (see question_bank.py). `seen` holds the fingerprints of questions the
+    user was already served (seen_questions.SeenSet); those are skipped.
+    """
+    # 8 for a full interview (45-60 min), 5 focused (20-30 min), 3 quick (15 min)
+    num_questions = question_bank.question_count(goal)
+    if not question_bank.is_enabled():
+        return _generate_questions(goal, target_level, domain, resume_data, num_questions)
+    
+    # Without a resume there is nothing to personalise: take a pre-built set
+    if not resume_data:
+        prebuilt = _pop_prebuilt(goal, target_level, domain, seen)
+        if prebuilt:
+            return prebuilt
+    
+    # Leave room for freshly generated, personalised questions if configured
+    fresh = min(getattr(settings, 'QUESTION_BANK_FRESH_QUESTIONS', 0), num_questions) if resume_data else 0
+    try:
+        banked, banked_hashes = question_bank.assemble(domain, target_level, num_questions - fresh, resume_data, exclude=seen)
+    except Exception as e:
+        print(f"❌ Question bank unavailable: {e}")
+        banked, banked_hashes = [], set()
+    
+    needed = num_questions - len(banked)
+    if needed == 0:
+        metrics.incr('questions.bank.full_sets')
+        print(f"📚 Served {len(banked)} {domain}/{target_level} questions from the bank")
+        return banked
+    # The bank can't fill the set yet: a generic pre-built set beats waiting for Gemini.
+    # A bank short only by the fresh slots goes on to personalise them instead
+    if resume_data and len(banked) < num_questions - fresh:
+        prebuilt = _pop_prebuilt(goal, target_level, domain, seen)
+        if prebuilt:
+            return prebuilt
+    
+    if not banked and not seen:
+        metrics.incr('questions.bank.misses')
+        return _generate_questions(goal, target_level, domain, resume_data, num_questions)
+    
+    metrics.incr('questions.bank.topups')
+    print(f"📚 {len(banked)} questions from the bank, generating {needed} more")
+    avoid = list(banked)
+    if seen:
+        # The user has been through these bank questions: ask for different ones
+        avoid += [
+            {'question': text} for text in question_bank.bank_texts(domain, target_level, limit=50)
+            if question_bank.question_hash(text) in seen
+        ][:20]
+    generated = _generate_questions(goal, target_level, domain, resume_data, needed, avoid=avoid)
+    seen = seen or ()
+    extra = []
+    for question in generated:
+        text_hash = question_bank.question_hash(question.get('question', ''))
+        if text_hash not in banked_hashes and text_hash not in seen and len(extra) < needed:
+            banked_hashes.add(text_hash)
+            extra.append(question)
+    # Defaults fill what is left, unseen ones first; a repeat beats a short set
+    if len(extra) < needed:
+        extra += get_default_questions(goal, domain, count=needed - len(extra), exclude=banked_hashes, avoid=seen)
+    return sorted(banked + extra, key=question_bank.difficulty_rank)
+
+
+def _pop_prebuilt(goal, target_level, domain, seen=None):
+    try:
+        prebuilt = question_bank.pop_set(goal, target_level, domain, exclude=seen)
+    except Exception as e:
+        print(f"❌ Question set pool unavailable: {e}")
+        return None
+    if prebuilt:
+        print(f"📦 Served a pre-built {goal}/{target_level}/{domain} question set")
+    return prebuilt
+
+
+def build_question_set(goal, target_level, domain):
+    """
+    A generic question set for the pre-built pool. Returns (questions, source):
+    assembled from the bank when it can fill the set ('bank'), otherwise
+    generated by Gemini ('gemini'), which also adds the questions to the bank.
+    questions is None when Gemini failed or gave an incomplete reply; the
+    fallback catalog is never put in the pool.
+    """
+    num_questions = question_bank.question_count(goal)
+    if question_bank.bank_size(domain, target_level) >= num_questions:
+        questions, _ = question_bank.assemble(domain, target_level, num_questions)
+        if len(questions) == num_questions:
+            return questions, 'bank'
+    avoid = [{'question': text} for text in question_bank.bank_texts(domain, target_level, limit=20)]
+    try:
+        questions, complete = _ask_gemini(goal, target_level, domain, None, num_questions, avoid=avoid)
+    except Exception as e:
+        print(f"❌ Could not generate a {goal}/{target_level}/{domain} question set: {e}")
+        return None, 'gemini'
+    return (questions[:num_questions] if complete else None), 'gemini'
+
+
+def _generate_questions(goal, target_level, domain, resume_data, num_questions, avoid=None):
+    """
+    Ask Gemini for `num_questions` questions (see _ask_gemini), padded from
+    the fallback catalog when the reply is short or the call fails.
     """
-    if not GEMINI_API_KEY or GEMINI_API_KEY == 'your_gemini_api_key_here':
+    if not gemini_client.has_api_key():
         print("Gemini API key not configured, returning default questions")
-        return get_default_questions(goal, domain)
+        return get_default_questions(goal, domain, count=num_questions)
     
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        # Determine number of questions based on goal
-        num_questions = {
-            'full': 8,      # 45-60 min interview
-            'focused': 5,   # 20-30 min interview
-            'quick': 3      # 15 min interview
-        }.get(goal, 5)
-        
-        # Build resume context
-        resume_context = ""
-        if resume_data:
-            resume_context = f"""
+        questions, _ = _ask_gemini(goal, target_level, domain, resume_data, num_questions, avoid)
+    except Exception as e:
+        print(f"❌ Error generating questions with AI: {e}")
+        import traceback
+        traceback.print_exc()
+        return get_default_questions(goal, domain, count=num_questions)
+    
+    if len(questions) < num_questions:
+        hashes = {question_bank.question_hash(question['question']) for question in questions}
+        questions += get_default_questions(goal, domain, count=num_questions - len(questions), exclude=hashes)
+    return questions
+
+
+def _ask_gemini(goal, target_level, domain, resume_data, num_questions, avoid=None):
+    """
+    Ask Gemini for `num_questions` questions. Returns (questions, complete);
+    only a complete reply is added to the bank. `avoid` lists questions
+    already in the set, which must not be repeated. Raises when the call fails.
+    """
+    # Build resume context
+    resume_context = ""
+    if resume_data:
+        resume_context = f"""
 Candidate Profile:
 - Name: {resume_data.get('full_name', 'N/A')}
 - Experience: {resume_data.get('years_of_experience', 0)} years
@@ -39,8 +142,14 @@ Candidate Profile:
 - Key Strengths: {', '.join(resume_data.get('key_strengths', []))}
 - Recent Projects: {', '.join([p.get('name', '') for p in resume_data.get('projects', [])[:2]])}
 """
-        
-        prompt = f"""
+    
+    avoid_context = ""
+    if avoid:
+        avoid_context = "The candidate already has these questions; do NOT repeat or rephrase them:\n" + "\n".join(
+            f"- {question['question']}" for question in avoid
+        ) + "\n"
+    
+    prompt = f"""
 You are an expert technical interviewer. Generate {num_questions} interview questions for this candidate.
 
 Interview Configuration:
@@ -49,7 +158,7 @@ Interview Configuration:
 - Domain: {domain}
 
 {resume_context}
-
+{avoid_context}
 Generate EXACTLY {num_questions} questions that:
 1. Match the target level difficulty ({target_level})
 2. Focus on {domain} domain
@@ -71,108 +180,37 @@ Return as JSON array:
 IMPORTANT: Return ONLY the JSON array, no markdown, no explanation.
 """
 
-        response = model.generate_content(prompt)
-        result_text = response.text.strip()
-        
-        # Clean up response
-        if '```json' in result_text:
-            result_text = result_text.split('```json')[1].split('```')[0].strip()
-        elif '```' in result_text:
-            result_text = result_text.split('```')[1].split('```')[0].strip()
-        
-        # Extract JSON array
-        start_idx = result_text.find('[')
-        end_idx = result_text.rfind(']') + 1
-        if start_idx != -1 and end_idx > start_idx:
-            result_text = result_text[start_idx:end_idx]
-        
-        questions = json.loads(result_text)
-        
-        print(f"✅ Generated {len(questions)} questions for {domain} at {target_level} level")
-        
-        return questions
-        
-    except Exception as e:
-        print(f"❌ Error generating questions with AI: {e}")
-        import traceback
-        traceback.print_exc()
-        return get_default_questions(goal, domain)
-
-
-def get_default_questions(goal, domain):
-    """Fallback questions if AI generation fails"""
-    questions_map = {
-        'dsa': [
-            {
-                "question": "Explain the difference between an array and a linked list. When would you use each?",
-                "type": "conceptual",
-                "difficulty": "easy",
-                "topics": ["data structures", "arrays", "linked lists"],
-                "expected_answer_points": ["Memory allocation", "Access time", "Use cases"]
-            },
-            {
-                "question": "Implement a function to reverse a linked list.",
-                "type": "coding",
-                "difficulty": "medium",
-                "topics": ["linked lists", "algorithms"],
-                "expected_answer_points": ["Iterative approach", "Pointer manipulation", "Time complexity O(n)"]
-            },
-            {
-                "question": "What is the time complexity of common sorting algorithms?",
-                "type": "conceptual",
-                "difficulty": "medium",
-                "topics": ["algorithms", "complexity"],
-                "expected_answer_points": ["QuickSort O(n log n)", "MergeSort O(n log n)", "BubbleSort O(n²)"]
-            }
-        ],
-        'web': [
-            {
-                "question": "Explain the difference between GET and POST HTTP methods.",
-                "type": "conceptual",
-                "difficulty": "easy",
-                "topics": ["HTTP", "web fundamentals"],
-                "expected_answer_points": ["Data transmission", "Security", "Use cases"]
-            },
-            {
-                "question": "How would you implement authentication in a web application?",
-                "type": "scenario",
-                "difficulty": "medium",
-                "topics": ["authentication", "security"],
-                "expected_answer_points": ["JWT tokens", "Session management", "Security best practices"]
-            }
-        ],
-        'ml': [
-            {
-                "question": "Explain the difference between supervised and unsupervised learning.",
-                "type": "conceptual",
-                "difficulty": "easy",
-                "topics": ["machine learning", "fundamentals"],
-                "expected_answer_points": ["Labeled data", "Use cases", "Examples of algorithms"]
-            },
-            {
-                "question": "How do you handle overfitting in a machine learning model?",
-                "type": "scenario",
-                "difficulty": "medium",
-                "topics": ["model training", "overfitting"],
-                "expected_answer_points": ["Regularization", "Cross-validation", "More training data"]
-            }
-        ],
-        'core': [
-            {
-                "question": "Explain how operating system manages memory.",
-                "type": "conceptual",
-                "difficulty": "medium",
-                "topics": ["operating systems", "memory management"],
-                "expected_answer_points": ["Virtual memory", "Paging", "Memory allocation"]
-            }
-        ]
-    }
+    def _generate():
+        return gemini_client.generate_json(prompt, 'questions')
     
-    domain_questions = questions_map.get(domain, questions_map['dsa'])
-    num_questions = {'full': 8, 'focused': 5, 'quick': 3}.get(goal, 5)
+    questions = llm_cache.get_or_generate('questions', gemini_client.DEFAULT_MODEL, prompt, _generate)
+    complete = not llm_schemas.is_partial(questions)
+    kept = [question for question in questions if question_bank.looks_complete(question.get('question'))]
+    if len(kept) < len(questions):
+        print(f"⚠️ Dropped {len(questions) - len(kept)} cut-off question(s)")
+        complete = False
     
-    # Repeat questions if needed to reach required count
-    while len(domain_questions) < num_questions:
-        domain_questions.extend(domain_questions[:num_questions - len(domain_questions)])
+    print(f"✅ Generated {len(kept)} questions for {domain} at {target_level} level")
     
-    return domain_questions[:num_questions]
+    # Only a complete reply goes into the bank, which serves it for good
+    complete = complete and len(kept) >= num_questions
+    if question_bank.is_enabled() and complete:
+        try:
+            question_bank.store_questions(kept, domain, target_level)
+        except Exception as e:
+            print(f"❌ Could not store questions in the bank: {e}")
+    elif question_bank.is_enabled():
+        metrics.incr('questions.bank.incomplete_replies')
+        print(f"⚠️ Not adding an incomplete reply ({len(kept)}/{num_questions} questions) to the bank")
+    
+    return kept, complete
+
+
+def get_default_questions(goal, domain, count=None, exclude=None, avoid=None):
+    """
+    Fallback questions if AI generation fails, sampled from the catalog in
+    data/fallback_questions.json (see question_catalog.py)
+    """
+    if count is None:
+        count = question_bank.question_count(goal)
+    return question_catalog.sample(domain, count, exclude=exclude, avoid=avoid)
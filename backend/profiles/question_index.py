@@ -0,0 +1,348 @@
+"""
+Local TF-IDF index of the question bank, for resume-to-question matching.
+
+question_bank.assemble() used to rank questions for a candidate by counting
+topic words shared with the resume's skills. This module ranks them by the
+cosine similarity between hashed TF-IDF vectors instead. Ranking needs no
+model call and takes under a millisecond for a few thousand questions
+per pair.
+
+* Terms are words of the question and its topics, whole topic phrases
+  ("t:system design") and canonical skills found by skill_taxonomy
+  ("s:react", so "ReactJS" on a resume matches "React" in a question).
+  Each term is hashed with crc32 into one of QUESTION_INDEX_DIM signed
+  buckets (the hashing trick), so no vocabulary is kept.
+* Question vectors hold sublinear term frequencies, L2-normalised when the
+  question is added. They never change afterwards. IDF comes from the
+  per-bucket document frequencies and is applied to the query only, so
+  adding questions never rewrites existing rows.
+* The index is partitioned by (domain, level), the unit assemble() ranks.
+  Each partition is a directory under QUESTION_INDEX_DIR:
+
+      vectors.f32   count x dim float32 rows, appended in place
+      ids.i64       question id of each row
+      df.f32        document frequency of each bucket
+      meta.json     {"version", "dim", "count"}, written last
+
+  Workers open vectors.f32 with numpy.memmap, so every process shares the
+  OS page cache instead of holding its own copy. A worker reopens a
+  partition when its meta.json changes.
+
+update() appends the questions stored since the last call, under a file
+lock; when another process is already updating it returns at once. It is
+kept out of the request path: `manage.py prewarm_questions` runs it after
+every pass, and `manage.py build_question_index` (from cron, or with
+--rebuild) runs it on demand and times queries. One of the two must run:
+questions stored in between are still served, just not ranked by relevance
+until the next update. question_bank warns when a pair's partition falls
+QUESTION_INDEX_LAG_WARNING questions behind the bank.
+"""
+import json
+import math
+import os
+import re
+import shutil
+import threading
+import time
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+
+import numpy as np
+from django.conf import settings
+
+from . import metrics, skill_taxonomy
+from .models import Question
+
+INDEX_VERSION = 1
+STATE_FILE = 'index.json'
+LOCK_FILE = '.lock'
+
+_WORD = re.compile(r'[a-z][a-z0-9+#]*')
+STOPWORDS = frozenset(
+    'a an and are as at be between can could do does for from give how if in into is it its of on or '
+    'should that the their them then there these this to use used using was what when where which '
+    'while who why will with would you your'.split()
+)
+
+# Term weights before the sublinear scaling
+SKILL_WEIGHT = 3
+PHRASE_WEIGHT = 2
+WORD_WEIGHT = 1
+
+_partitions = {}  # partition name -> (meta mtime, loaded partition)
+_partitions_lock = threading.Lock()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def is_enabled():
+    return _setting('QUESTION_INDEX_ENABLED', True)
+
+
+def index_dir():
+    return str(_setting('QUESTION_INDEX_DIR', os.path.join(settings.BASE_DIR, 'question_index')))
+
+
+def dimension():
+    return int(_setting('QUESTION_INDEX_DIM', 512))
+
+
+def partition_name(domain, level):
+    return re.sub(r'[^a-z0-9]+', '_', f'{domain}__{level}'.lower())
+
+
+# -- terms and vectors ---------------------------------------------------------
+
+def _add_words(terms, text, weight=WORD_WEIGHT):
+    for word in _WORD.findall(str(text or '').lower()):
+        if len(word) > 1 and word not in STOPWORDS:
+            terms[word] += weight
+
+
+def _add_skills(terms, text, weight=SKILL_WEIGHT):
+    for name in skill_taxonomy.find_skills(str(text or '')):
+        terms['s:' + name.lower()] += weight
+
+
+def _add_phrase(terms, text, weight=PHRASE_WEIGHT):
+    phrase = skill_taxonomy.normalize(str(text or ''))
+    if phrase:
+        terms['t:' + phrase] += weight
+
+
+def question_terms(text, topics):
+    terms = Counter()
+    _add_words(terms, text)
+    for topic in topics or []:
+        _add_phrase(terms, topic)
+        _add_words(terms, topic)
+    _add_skills(terms, ' . '.join([str(text or '')] + [str(topic) for topic in topics or []]))
+    return terms
+
+
+def resume_terms(resume_data):
+    """Terms of a candidate's skills and projects"""
+    terms = Counter()
+    resume_data = resume_data or {}
+    for skill in resume_data.get('skills') or []:
+        _add_phrase(terms, skill)
+        _add_words(terms, skill)
+        _add_skills(terms, skill)
+    for project in resume_data.get('projects') or []:
+        if not isinstance(project, dict):
+            _add_words(terms, project)
+            continue
+        for technology in project.get('technologies') or []:
+            _add_phrase(terms, technology, WORD_WEIGHT)
+            _add_skills(terms, technology, PHRASE_WEIGHT)
+        _add_words(terms, project.get('name'))
+        _add_words(terms, project.get('description'))
+        _add_skills(terms, project.get('description'), WORD_WEIGHT)
+    return terms
+
+
+def vectorize(terms, dim):
+    """Hashed sublinear term frequencies (not normalised)"""
+    vector = np.zeros(dim, dtype=np.float32)
+    for term, weight in terms.items():
+        if weight <= 0:
+            continue
+        bucket = zlib.crc32(term.encode('utf-8'))
+        sign = -1.0 if bucket & 0x80000000 else 1.0
+        vector[bucket % dim] += sign * (1.0 + math.log(weight))
+    return vector
+
+
+def _normalized(vector):
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+# -- reading -------------------------------------------------------------------
+
+class Partition:
+    """A memory-mapped partition; rows past `count` are ignored"""
+
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as handle:
+            meta = json.load(handle)
+        if meta.get('version') != INDEX_VERSION:
+            raise ValueError(f'{path} has index version {meta.get("version")}, expected {INDEX_VERSION}')
+        self.dim = meta['dim']
+        self.count = meta['count']
+        df = np.fromfile(os.path.join(path, 'df.f32'), dtype=np.float32, count=self.dim)
+        self.idf = (np.log((1.0 + self.count) / (1.0 + df)) + 1.0).astype(np.float32)
+        if self.count:
+            self.vectors = np.memmap(os.path.join(path, 'vectors.f32'), dtype=np.float32, mode='r',
+                                     shape=(self.count, self.dim))
+            self.ids = np.memmap(os.path.join(path, 'ids.i64'), dtype=np.int64, mode='r', shape=(self.count,))
+        else:
+            self.vectors = np.zeros((0, self.dim), dtype=np.float32)
+            self.ids = np.zeros(0, dtype=np.int64)
+
+    def rank(self, query, limit):
+        """[(question id, score)] of the best `limit` rows with a positive score"""
+        if not self.count:
+            return []
+        scores = self.vectors @ _normalized(query * self.idf)
+        if limit < self.count:
+            top = np.argpartition(-scores, limit)[:limit]
+            top = top[np.argsort(-scores[top])]
+        else:
+            top = np.argsort(-scores)
+        return [(int(self.ids[row]), float(scores[row])) for row in top if scores[row] > 0]
+
+
+def load_partition(domain, level):
+    """The partition of a pair, reopened when it has changed; None if it doesn't exist"""
+    name = partition_name(domain, level)
+    path = os.path.join(index_dir(), name)
+    try:
+        mtime = os.stat(os.path.join(path, 'meta.json')).st_mtime_ns
+    except OSError:
+        return None
+    cached = _partitions.get(name)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with _partitions_lock:
+        partition = Partition(path)
+        _partitions[name] = (mtime, partition)
+    return partition
+
+
+def rank(domain, level, resume_data, limit=50):
+    """
+    Questions of (domain, level) most relevant to the candidate's skills and
+    projects, as [(question id, score)], best first. Empty when the index or
+    the resume has nothing to match.
+    """
+    terms = resume_terms(resume_data)
+    if not terms:
+        return []
+    partition = load_partition(domain, level)
+    if partition is None:
+        return []
+    started = time.perf_counter()
+    ranked = partition.rank(vectorize(terms, partition.dim), max(1, limit))
+    metrics.observe('questions.index.rank_ms', (time.perf_counter() - started) * 1000)
+    return ranked
+
+
+# -- writing -------------------------------------------------------------------
+
+@contextmanager
+def _write_lock(root, wait):
+    """Yields True once the lock is held, or False if `wait` is off and another process has it"""
+    import fcntl
+
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, LOCK_FILE), 'a') as handle:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _write_json(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as handle:
+        json.dump(data, handle)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding='utf-8') as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def _append(path, questions, dim):
+    """Append questions to a partition, skipping ids it already has. Returns rows added"""
+    os.makedirs(path, exist_ok=True)
+    meta = _read_json(os.path.join(path, 'meta.json'))
+    count = meta.get('count', 0) if meta.get('dim') == dim else 0
+    vectors_path = os.path.join(path, 'vectors.f32')
+    ids_path = os.path.join(path, 'ids.i64')
+
+    if count:
+        known = set(np.fromfile(ids_path, dtype=np.int64, count=count).tolist())
+        df = np.fromfile(os.path.join(path, 'df.f32'), dtype=np.float32, count=dim)
+    else:
+        known = set()
+        df = np.zeros(dim, dtype=np.float32)
+    questions = [q for q in questions if q.id not in known]
+    if not questions:
+        return 0
+
+    rows = np.stack([vectorize(question_terms(q.text, q.topics), dim) for q in questions])
+    df += (rows != 0).sum(axis=0)
+    norms = np.linalg.norm(rows, axis=1, keepdims=True)
+    rows = rows / np.where(norms == 0, 1, norms)
+
+    # Bytes past the committed count are left over from an interrupted update
+    for file_path, data, itemsize in (
+        (vectors_path, rows.astype(np.float32), 4 * dim),
+        (ids_path, np.array([q.id for q in questions], dtype=np.int64), 8),
+    ):
+        with open(file_path, 'ab') as handle:
+            handle.truncate(count * itemsize)
+            handle.write(data.tobytes())
+    df.astype(np.float32).tofile(os.path.join(path, 'df.f32.tmp'))
+    os.replace(os.path.join(path, 'df.f32.tmp'), os.path.join(path, 'df.f32'))
+    _write_json(os.path.join(path, 'meta.json'), {'version': INDEX_VERSION, 'dim': dim, 'count': count + len(questions)})
+    return len(questions)
+
+
+def update(rebuild=False, wait=False):
+    """
+    Add questions stored since the last update (every question if `rebuild`).
+    Returns the number of questions added; 0 without waiting when another
+    process is updating, unless `wait`.
+    """
+    root = index_dir()
+    dim = dimension()
+    started = time.perf_counter()
+    with _write_lock(root, wait or rebuild) as locked:
+        if not locked:
+            print("🧭 Question index is being updated by another process; skipping")
+            return 0
+        state = _read_json(os.path.join(root, STATE_FILE))
+        if rebuild or state.get('version') != INDEX_VERSION or state.get('dim') != dim:
+            for entry in os.listdir(root):
+                if os.path.isdir(os.path.join(root, entry)):
+                    shutil.rmtree(os.path.join(root, entry))
+            state = {}
+        last_id = state.get('last_id', 0)
+
+        queryset = Question.objects.only('id', 'domain', 'level', 'text', 'topics').order_by('id')
+        new = list(queryset.filter(id__gt=last_id))
+        # Rows from transactions that committed out of id order land behind last_id
+        if Question.objects.filter(id__lte=last_id).count() > state.get('indexed', 0):
+            new = list(queryset.filter(id__lte=last_id)) + new
+
+        by_partition = {}
+        for question in new:
+            by_partition.setdefault(partition_name(question.domain, question.level), []).append(question)
+        added = sum(_append(os.path.join(root, name), questions, dim) for name, questions in by_partition.items())
+
+        if new or not state:
+            _write_json(os.path.join(root, STATE_FILE), {
+                'version': INDEX_VERSION,
+                'dim': dim,
+                'last_id': max([last_id] + [q.id for q in new]),
+                'indexed': state.get('indexed', 0) + added,
+            })
+    if added:
+        metrics.incr('questions.index.added', added)
+        print(f"🧭 Indexed {added} question(s) in {(time.perf_counter() - started) * 1000:.1f}ms")
+    return added
@@ -0,0 +1,312 @@
+"""
+Deadlines, retries and circuit breaking for Gemini calls.
+
+Every call made through gemini_client runs under resilience.call():
+
+* Deadline - the whole call, retries included, must finish within the task's
+  deadline (LLM_TASK_DEADLINES, else GEMINI_TIMEOUT). Each attempt gets the
+  time that is left as its request timeout.
+* Retries - transient errors (429, 500, 503, 504, timeouts) are retried with
+  full-jitter exponential backoff. A 429 that says when to come back
+  (Retry-After header, RetryInfo detail or "retry in Ns" in the message) is
+  honoured. No retry is made if the wait would overrun the deadline.
+* Circuit breaker - one per (model, task) per worker. When the error rate
+  over the last LLM_BREAKER_WINDOW seconds reaches LLM_BREAKER_ERROR_RATE
+  (with at least LLM_BREAKER_MIN_CALLS calls), the breaker opens and calls
+  fail straight away with CircuitOpenError. Callers already catch exceptions
+  and serve their fallbacks, so users get those immediately. After
+  LLM_BREAKER_COOLDOWN seconds a single probe call is let through. Success
+  closes the breaker; failure opens it again.
+
+Breaker state is published as the gauges breaker.<model>.<task>.state
+(0 closed, 1 half-open, 2 open) and breaker.<model>.<task>.error_rate.
+"""
+import asyncio
+import random
+import re
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from google.api_core import exceptions as google_exceptions
+
+from . import metrics
+
+CLOSED = 'closed'
+HALF_OPEN = 'half_open'
+OPEN = 'open'
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Worth another attempt: rate limits, overload, server errors and timeouts
+TRANSIENT_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.InternalServerError,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.GatewayTimeout,
+    google_exceptions.DeadlineExceeded,
+    TimeoutError,
+    ConnectionError,
+)
+
+# Count against the breaker: anything Google or the network threw at us.
+# Local rejections (e.g. no free concurrency slot) do not.
+FAILURE_ERRORS = (google_exceptions.GoogleAPICallError,) + TRANSIENT_ERRORS
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Gemini while a breaker is open"""
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class Deadline:
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+
+class CircuitBreaker:
+    def __init__(self, name):
+        self.name = name
+        self.state = CLOSED
+        self.opened_at = None
+        self.probe_in_flight = False
+        self._outcomes = deque()  # (monotonic time, succeeded)
+        self._lock = threading.Lock()
+        self._publish()
+
+    def _trim(self, now):
+        window = _setting('LLM_BREAKER_WINDOW', 30)
+        while self._outcomes and now - self._outcomes[0][0] > window:
+            self._outcomes.popleft()
+
+    def error_rate(self):
+        if not self._outcomes:
+            return 0.0
+        failures = sum(1 for _, succeeded in self._outcomes if not succeeded)
+        return failures / len(self._outcomes)
+
+    def _publish(self):
+        metrics.set_gauge(f'breaker.{self.name}.state', STATE_VALUES[self.state])
+        metrics.set_gauge(f'breaker.{self.name}.error_rate', round(self.error_rate(), 3))
+
+    def _open(self, now):
+        self.state = OPEN
+        self.opened_at = now
+        self.probe_in_flight = False
+        metrics.incr(f'breaker.{self.name}.opened')
+        print(f"⚡ Circuit breaker {self.name} opened (error rate {self.error_rate():.0%})")
+
+    def _cooling_down(self, now):
+        return self.state == OPEN and now - self.opened_at < _setting('LLM_BREAKER_COOLDOWN', 30)
+
+    def is_rejecting(self):
+        """True if a call made now would be short-circuited"""
+        with self._lock:
+            now = time.monotonic()
+            return self._cooling_down(now) or (self.state == HALF_OPEN and self.probe_in_flight)
+
+    def allow(self):
+        """Let a call through or raise CircuitOpenError"""
+        with self._lock:
+            now = time.monotonic()
+            if self._cooling_down(now):
+                metrics.incr(f'breaker.{self.name}.rejected')
+                raise CircuitOpenError(f"Circuit breaker {self.name} is open")
+            if self.state == OPEN:
+                self.state = HALF_OPEN
+                self._publish()
+            if self.state == HALF_OPEN:
+                if self.probe_in_flight:
+                    metrics.incr(f'breaker.{self.name}.rejected')
+                    raise CircuitOpenError(f"Circuit breaker {self.name} is half-open, probe in flight")
+                self.probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            now = time.monotonic()
+            if self.state == HALF_OPEN:
+                print(f"✅ Circuit breaker {self.name} closed")
+                self.state = CLOSED
+                self.probe_in_flight = False
+                self._outcomes.clear()
+            self._outcomes.append((now, True))
+            self._trim(now)
+            self._publish()
+
+    def record_failure(self):
+        with self._lock:
+            now = time.monotonic()
+            self._outcomes.append((now, False))
+            self._trim(now)
+            if self.state == HALF_OPEN:
+                self._open(now)
+            elif self.state == CLOSED and len(self._outcomes) >= _setting('LLM_BREAKER_MIN_CALLS', 10):
+                if self.error_rate() >= _setting('LLM_BREAKER_ERROR_RATE', 0.5):
+                    self._open(now)
+            self._publish()
+
+    def release(self):
+        """The call ended without a verdict (e.g. cancelled); free the probe slot"""
+        with self._lock:
+            self.probe_in_flight = False
+
+    def describe(self):
+        with self._lock:
+            self._trim(time.monotonic())
+            return {
+                'state': self.state,
+                'error_rate': round(self.error_rate(), 3),
+                'calls_in_window': len(self._outcomes),
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(model_name, task):
+    name = f'{model_name}.{task}'
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = _breakers[name] = CircuitBreaker(name)
+    return breaker
+
+
+def get_states():
+    """Breaker state for every (model, task) seen by this worker"""
+    return {name: breaker.describe() for name, breaker in sorted(_breakers.items())}
+
+
+def check(model_name, task):
+    """
+    Raise CircuitOpenError if calls for (model, task) are being
+    short-circuited. For callers that do expensive work (e.g. a file upload)
+    before their first Gemini call.
+    """
+    breaker = get_breaker(model_name, task)
+    if breaker.is_rejecting():
+        metrics.incr(f'breaker.{breaker.name}.rejected')
+        raise CircuitOpenError(f"Circuit breaker {breaker.name} is open")
+
+
+def deadline_for(task, default):
+    return _setting('LLM_TASK_DEADLINES', {}).get(task, default)
+
+
+def retry_after(exc):
+    """Seconds the server asked us to wait before retrying, if it said"""
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    value = headers.get('Retry-After') if hasattr(headers, 'get') else None
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    for detail in getattr(exc, 'details', None) or []:
+        delay = getattr(detail, 'retry_delay', None)
+        if delay is not None:
+            return delay.seconds + delay.nanos / 1e9
+    match = re.search(r'retry in ([\d.]+)\s*s', str(exc), re.IGNORECASE)
+    if match:
+        return float(match.group(1))
+    return None
+
+
+def backoff(attempt):
+    """Full-jitter exponential backoff for the given retry number"""
+    base = _setting('LLM_RETRY_BASE_DELAY', 0.5)
+    cap = _setting('LLM_RETRY_MAX_DELAY', 8)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def _after_error(breaker, task, exc, attempt, deadline):
+    """
+    Book-keep a failed attempt. Returns how long to wait before retrying, or
+    None if the error should be raised.
+    """
+    if isinstance(exc, FAILURE_ERRORS):
+        breaker.record_failure()
+        metrics.incr(f'llm.{task}.failures')
+    else:
+        breaker.release()
+
+    if not isinstance(exc, TRANSIENT_ERRORS):
+        return None
+    if attempt + 1 >= _setting('LLM_RETRY_ATTEMPTS', 3) or breaker.is_rejecting():
+        metrics.incr(f'llm.{task}.gave_up')
+        return None
+
+    delay = backoff(attempt)
+    server_delay = retry_after(exc)
+    if server_delay is not None:
+        delay = server_delay + delay / 4
+    if delay >= deadline.remaining():
+        metrics.incr(f'llm.{task}.gave_up')
+        return None
+    metrics.incr(f'llm.{task}.retries')
+    print(f"🔁 Retrying {task} in {delay:.1f}s after: {exc}")
+    return delay
+
+
+def call(model_name, task, attempt_fn, deadline_seconds, record_success=True):
+    """
+    Run `attempt_fn(timeout)` under the (model, task) breaker, retrying
+    transient errors until it succeeds, the retry budget is spent or the
+    deadline passes. `timeout` is the time left before the deadline.
+
+    With record_success=False the caller reports success to the breaker
+    itself (used by streams, which only succeed once fully consumed).
+    """
+    breaker = get_breaker(model_name, task)
+    deadline = Deadline(deadline_seconds)
+    attempt = 0
+    while True:
+        breaker.allow()
+        try:
+            result = attempt_fn(deadline.remaining())
+        except Exception as e:
+            delay = _after_error(breaker, task, e, attempt, deadline)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            attempt += 1
+            continue
+        if record_success:
+            breaker.record_success()
+        return result
+
+
+async def call_async(model_name, task, attempt_fn, deadline_seconds, record_success=True):
+    """Async counterpart of call(); `attempt_fn(timeout)` returns an awaitable"""
+    breaker = get_breaker(model_name, task)
+    deadline = Deadline(deadline_seconds)
+    attempt = 0
+    while True:
+        breaker.allow()
+        try:
+            timeout = deadline.remaining()
+            result = await asyncio.wait_for(attempt_fn(timeout), timeout)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as e:
+            delay = _after_error(breaker, task, e, attempt, deadline)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        if record_success:
+            breaker.record_success()
+        return result
@@ -0,0 +1,169 @@
+"""
+Split resume text into sections so the Gemini prompt carries only what the
+extraction needs.
+
+Sending the whole raw_text made prompts for long academic CVs run to tens of
+thousands of tokens, most of them publications, references and boilerplate
+the extraction schema has no field for. segment() finds section headings
+("Experience", "EDUCATION:", "Technical Skills", ...) and assigns each line
+to a section. Text before the first heading is the contact block.
+
+build_prompt_text() then:
+
+* keeps the sections the schema needs, in a fixed order, each cut to its
+  own token budget (SECTION_TOKEN_BUDGETS);
+* drops sections with no schema field (publications, references, hobbies,
+  declarations, ...) and boilerplate lines ("Page 2 of 5", "References
+  available upon request");
+* sends the text unchanged when that would not make it shorter;
+* falls back to the whole text, capped at the sum of the budgets, when it
+  recognises fewer than MIN_SECTIONS headings, so an unusual layout never
+  loses content to a wrong guess.
+
+Token counts are estimated the same way as prompt_budget (about 4
+characters per token).
+"""
+import re
+
+from .prompt_budget import estimate_tokens, truncate_to_tokens
+
+# Section -> heading texts that open it (lowercase, without punctuation)
+SECTION_HEADINGS = {
+    'summary': [
+        'summary', 'professional summary', 'career summary', 'profile', 'professional profile',
+        'objective', 'career objective', 'about', 'about me', 'overview',
+    ],
+    'experience': [
+        'experience', 'work experience', 'professional experience', 'employment', 'employment history',
+        'work history', 'internships', 'internship', 'internship experience', 'industry experience',
+        'research experience', 'teaching experience', 'positions of responsibility', 'leadership',
+        'leadership experience', 'volunteer experience', 'volunteering', 'extracurricular activities',
+    ],
+    'education': [
+        'education', 'academic background', 'academics', 'academic qualifications', 'qualifications',
+        'educational qualifications', 'education and training',
+    ],
+    'projects': [
+        'projects', 'academic projects', 'personal projects', 'key projects', 'selected projects',
+        'project experience', 'research projects',
+    ],
+    'skills': [
+        'skills', 'technical skills', 'key skills', 'core competencies', 'competencies', 'technologies',
+        'tools', 'tools and technologies', 'tech stack', 'skills and interests', 'programming languages',
+    ],
+    'certifications': [
+        'certifications', 'certificates', 'certification', 'courses', 'online courses', 'licenses',
+        'licenses and certifications', 'training', 'achievements', 'awards', 'honors', 'honors and awards',
+        'awards and achievements',
+    ],
+    'languages': ['languages', 'spoken languages', 'language proficiency'],
+    # No extraction field: recognised only so their text can be dropped
+    'other': [
+        'publications', 'selected publications', 'journal articles', 'conference papers', 'presentations',
+        'talks', 'invited talks', 'conferences', 'patents', 'grants', 'funding', 'references', 'referees',
+        'hobbies', 'interests', 'hobbies and interests', 'personal details', 'personal information',
+        'declaration', 'service', 'professional service', 'memberships', 'professional memberships',
+        'affiliations', 'teaching', 'supervision', 'reviewer', 'additional information',
+    ],
+}
+
+# Order in the prompt and the token budget of each section
+SECTION_TOKEN_BUDGETS = {
+    'contact': 200,
+    'summary': 250,
+    'experience': 1500,
+    'education': 400,
+    'projects': 800,
+    'skills': 300,
+    'certifications': 250,
+    'languages': 60,
+}
+
+MIN_SECTIONS = 2
+MAX_HEADING_CHARS = 50
+
+_HEADING_LOOKUP = {
+    heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings
+}
+_HEADING_CLEAN = re.compile(r'[^a-z ]+')
+_SPACES = re.compile(r'\s+')
+
+# Page numbers are "Page 2", "Page 2 of 5", "2 of 5" or "- 2 -" only: a line
+# holding just a year or a date ("2019", "06/2021") belongs to an entry
+_BOILERPLATE = re.compile(
+    r'(?i)^(?:page \d{1,3}(?: ?(?:of|/) ?\d{1,3})?|\d{1,3} of \d{1,3}|- ?\d{1,3} ?-|resume|curriculum vitae|cv'
+    r'|references? (?:are )?available (?:up)?on request\.?|i hereby declare\b.*)$'
+)
+
+
+def heading_section(line):
+    """The section a heading line opens, or None if it is not a heading"""
+    if len(line) > MAX_HEADING_CHARS:
+        return None
+    key = _SPACES.sub(' ', _HEADING_CLEAN.sub(' ', line.lower().replace('&', ' and '))).strip()
+    return _HEADING_LOOKUP.get(key)
+
+
+def segment(raw_text):
+    """
+    Section name -> text. Repeated headings are merged; 'other' collects the
+    sections the extraction does not use.
+    """
+    sections = {}
+    current = 'contact'
+    for raw_line in (raw_text or '').split('\n'):
+        line = raw_line.strip()
+        if not line:
+            continue
+        section = heading_section(line)
+        if section:
+            current = section
+            sections.setdefault(current, [])
+            continue
+        if _BOILERPLATE.match(line):
+            continue
+        sections.setdefault(current, []).append(line)
+    return {name: '\n'.join(lines) for name, lines in sections.items()}
+
+
+def build_prompt_text(raw_text):
+    """
+    Resume text for the extraction prompt. Returns (text, stats) where stats
+    has original_tokens, prompt_tokens, segmented, kept and dropped.
+    """
+    original_tokens = estimate_tokens(raw_text)
+    sections = segment(raw_text)
+    recognised = [name for name in sections if name != 'contact']
+
+    if len(recognised) < MIN_SECTIONS:
+        text = truncate_to_tokens(raw_text or '', sum(SECTION_TOKEN_BUDGETS.values()))
+        return text, {
+            'original_tokens': original_tokens,
+            'prompt_tokens': estimate_tokens(text),
+            'segmented': False,
+            'kept': [],
+            'dropped': [],
+        }
+
+    parts = []
+    for name, budget in SECTION_TOKEN_BUDGETS.items():
+        body = sections.get(name)
+        if body:
+            parts.append(f"[{name.upper()}]\n{truncate_to_tokens(body, budget)}")
+    text = '\n\n'.join(parts)
+    if estimate_tokens(text) >= original_tokens:
+        # Nothing to trim; the section labels would only add tokens
+        text = raw_text
+    return text, {
+        'original_tokens': original_tokens,
+        'prompt_tokens': estimate_tokens(text),
+        'segmented': True,
+        'kept': [name for name in SECTION_TOKEN_BUDGETS if sections.get(name)],
+        'dropped': ['other'] if sections.get('other') else [],
+    }
+
+
+def name_context(raw_text):
+    """The part of a resume that holds the candidate's name: its contact block"""
+    contact = segment(raw_text).get('contact', '')
+    return truncate_to_tokens(contact, SECTION_TOKEN_BUDGETS['contact']) if contact else (raw_text or '')[:3000]
@@ -0,0 +1,192 @@
+"""
+Saving uploaded resumes.
+
+Users often upload the same file again (a retry after a timeout, or another
+upload from the profile page). Each upload is hashed (SHA-256 of the file
+bytes), and the hash is stored on ResumeData. If a new upload matches the
+user's stored hash, the saved record is returned without extracting text or
+calling Gemini.
+
+A hash is only stored when Gemini did the whole extraction. A resume parsed
+by the regex fallback (because Gemini was down or not configured), or whose
+Gemini reply was incomplete, is parsed again the next time it is uploaded.
+
+Uploads can also be parsed in the background. enqueue_resume() stores the
+file as a ResumeParseJob. `manage.py process_resume_jobs` claims queued jobs
+and runs process_job() on them. A job is claimed with a conditional UPDATE
+(status still 'queued'), so several workers can share the table without a
+broker or row locks.
+"""
+import hashlib
+import io
+import os
+import socket
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from . import metrics
+from .models import ResumeData, ResumeParseJob
+from .resume_parser import parse_resume
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def hash_file(uploaded_file):
+    """SHA-256 hex digest of an uploaded file; leaves it rewound for parsing"""
+    hasher = hashlib.sha256()
+    uploaded_file.seek(0)
+    for chunk in uploaded_file.chunks():
+        hasher.update(chunk)
+    uploaded_file.seek(0)
+    return hasher.hexdigest()
+
+
+def find_duplicate(user, file_hash):
+    return ResumeData.objects.filter(user=user, file_hash=file_hash).first()
+
+
+def _store(user, file, file_name, file_hash):
+    """Parse `file` and save it as the user's resume. Returns (resume_data, created)"""
+    metrics.incr('resume.upload.parsed')
+    parsed_data = parse_resume(file, file_name)
+    extracted_with_ai = parsed_data.pop('extracted_with_ai', False)
+    ai_partial = parsed_data.pop('ai_partial', False)
+    parsed_data['file_hash'] = file_hash if extracted_with_ai and not ai_partial else None
+    raw_text = parsed_data.pop('raw_text', '')
+
+    resume_data, created = ResumeData.objects.update_or_create(
+        user=user,
+        defaults=parsed_data
+    )
+    resume_data.set_raw_text(raw_text)
+    return resume_data, created
+
+
+def save_resume(user, uploaded_file):
+    """
+    Parse and store `uploaded_file` as the user's resume, unless it is the
+    file already stored. Returns (resume_data, created, from_cache).
+    """
+    file_hash = hash_file(uploaded_file)
+
+    existing = find_duplicate(user, file_hash)
+    if existing is not None:
+        metrics.incr('resume.upload.dedup_hits')
+        print(f"♻️ Resume {uploaded_file.name} unchanged ({file_hash[:12]}), returning saved data")
+        return existing, False, True
+
+    resume_data, created = _store(user, uploaded_file, uploaded_file.name, file_hash)
+    return resume_data, created, False
+
+
+# -- background parsing ------------------------------------------------------
+
+def enqueue_resume(user, uploaded_file):
+    """
+    Queue `uploaded_file` for background parsing. Returns (job, existing):
+    when the file is the user's stored resume no job is created and
+    `existing` is that ResumeData.
+    """
+    file_hash = hash_file(uploaded_file)
+    existing = find_duplicate(user, file_hash)
+    if existing is not None:
+        metrics.incr('resume.upload.dedup_hits')
+        return None, existing
+
+    job = ResumeParseJob.objects.create(
+        user=user,
+        file_name=uploaded_file.name,
+        file_hash=file_hash,
+        file_data=b''.join(uploaded_file.chunks()),
+    )
+    metrics.incr('resume.jobs.queued')
+    print(f"📥 Queued resume parse job {job.id} ({uploaded_file.name})")
+    return job, None
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_next_job(worker):
+    """
+    Atomically take the oldest queued job. Returns the job or None. Losing
+    a race for a job just moves on to the next candidate.
+    """
+    candidates = (
+        ResumeParseJob.objects
+        .filter(status=ResumeParseJob.QUEUED)
+        .order_by('created_at')
+        .values_list('id', flat=True)[:10]
+    )
+    for job_id in candidates:
+        claimed = ResumeParseJob.objects.filter(id=job_id, status=ResumeParseJob.QUEUED).update(
+            status=ResumeParseJob.PROCESSING,
+            locked_by=worker,
+            started_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return ResumeParseJob.objects.select_related('user').get(id=job_id)
+    return None
+
+
+def requeue_stale_jobs():
+    """
+    Put jobs back in the queue whose worker died mid-parse (processing for
+    longer than RESUME_JOB_STALE_SECONDS). Jobs out of attempts are failed.
+    """
+    cutoff = timezone.now() - timedelta(seconds=_setting('RESUME_JOB_STALE_SECONDS', 600))
+    stale = ResumeParseJob.objects.filter(status=ResumeParseJob.PROCESSING, started_at__lt=cutoff)
+    max_attempts = _setting('RESUME_JOB_MAX_ATTEMPTS', 3)
+    failed = stale.filter(attempts__gte=max_attempts).update(
+        status=ResumeParseJob.FAILED,
+        error='Worker stopped while parsing; out of attempts',
+        file_data=b'',
+        finished_at=timezone.now(),
+    )
+    requeued = stale.filter(attempts__lt=max_attempts).update(status=ResumeParseJob.QUEUED, locked_by=None)
+    return requeued, failed
+
+
+def process_job(job):
+    """Parse a claimed job and record the outcome on it"""
+    try:
+        existing = find_duplicate(job.user, job.file_hash) if job.file_hash else None
+        if existing is not None:
+            resume_data = existing
+        else:
+            file = io.BytesIO(bytes(job.file_data))
+            file.name = job.file_name
+            resume_data, _ = _store(job.user, file, job.file_name, job.file_hash)
+    except Exception as e:
+        retry = job.attempts < _setting('RESUME_JOB_MAX_ATTEMPTS', 3)
+        print(f"❌ Resume parse job {job.id} failed (attempt {job.attempts}): {e}")
+        metrics.incr('resume.jobs.errors')
+        if retry:
+            ResumeParseJob.objects.filter(id=job.id).update(status=ResumeParseJob.QUEUED, error=str(e), locked_by=None)
+        else:
+            ResumeParseJob.objects.filter(id=job.id).update(
+                status=ResumeParseJob.FAILED,
+                error=str(e),
+                file_data=b'',
+                finished_at=timezone.now(),
+            )
+        return False
+
+    ResumeParseJob.objects.filter(id=job.id).update(
+        status=ResumeParseJob.DONE,
+        resume=resume_data,
+        error=None,
+        file_data=b'',
+        finished_at=timezone.now(),
+    )
+    metrics.incr('resume.jobs.done')
+    metrics.observe('resume.jobs.queue_wait_ms', (job.started_at - job.created_at).total_seconds() * 1000)
+    print(f"✅ Resume parse job {job.id} done ({job.file_name})")
+    return True
@@ -0,0 +1,121 @@
+"""
+Per-user record of served interview questions, so repeat sessions don't
+repeat questions.
+
+A question is identified by its fingerprint, question_bank.question_hash()
+of its text. Bank questions, pre-built sets, Gemini questions and the
+defaults therefore all share one scheme. Each user's fingerprints go into
+a Bloom filter in the SeenQuestions side table:
+
+* a filter is sized for QUESTION_SEEN_CAPACITY fingerprints at a false
+  positive rate of QUESTION_SEEN_ERROR_RATE (2.4 KB for 2000 at 1%). The
+  first byte stores the number of hash functions, so a filter stays
+  readable when the settings change;
+* a lookup checks that many bits, derived from the sha256 fingerprint by
+  double hashing: O(1) per candidate question, whatever the history;
+* when `current` is full it becomes `previous` and a new filter starts.
+  The row never grows, and questions served two generations ago
+  (thousands of questions) become eligible again, which matters once a
+  user has worked through the bank for their pair.
+
+A false positive only means that an unseen question is skipped.
+"""
+import math
+
+from django.conf import settings
+from django.db import transaction
+
+from . import metrics
+from .models import SeenQuestions
+from .question_bank import question_hash
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def is_enabled():
+    return _setting('QUESTION_SEEN_ENABLED', True)
+
+
+def new_filter(capacity=None, error_rate=None):
+    """An empty filter: one byte with the hash count, then the bit array"""
+    capacity = max(1, capacity or _setting('QUESTION_SEEN_CAPACITY', 2000))
+    error_rate = min(0.5, max(1e-6, error_rate or _setting('QUESTION_SEEN_ERROR_RATE', 0.01)))
+    num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+    hashes = max(1, min(255, round(num_bits / capacity * math.log(2))))
+    return bytearray([hashes]) + bytearray((num_bits + 7) // 8)
+
+
+def _positions(data, fingerprint):
+    hashes = data[0]
+    num_bits = (len(data) - 1) * 8
+    h1 = int(fingerprint[:16], 16)
+    h2 = int(fingerprint[16:32], 16) | 1
+    return [(h1 + i * h2) % num_bits for i in range(hashes)]
+
+
+def might_contain(data, fingerprint):
+    if len(data) < 2:
+        return False
+    return all(data[1 + bit // 8] & (1 << (bit % 8)) for bit in _positions(data, fingerprint))
+
+
+def add(data, fingerprint):
+    """Set the fingerprint's bits in a bytearray filter. Returns True if it was new"""
+    new = False
+    for bit in _positions(data, fingerprint):
+        mask = 1 << (bit % 8)
+        if not data[1 + bit // 8] & mask:
+            data[1 + bit // 8] |= mask
+            new = True
+    return new
+
+
+def fingerprint(question):
+    return question_hash(question.get('question', '') if isinstance(question, dict) else question)
+
+
+class SeenSet:
+    """Read-only view of a user's filters: `fingerprint in seen`"""
+
+    def __init__(self, record=None):
+        self.current = bytes(record.current) if record else b''
+        self.previous = bytes(record.previous) if record else b''
+
+    def __contains__(self, fingerprint):
+        return might_contain(self.current, fingerprint) or might_contain(self.previous, fingerprint)
+
+    def __bool__(self):
+        return bool(self.current or self.previous)
+
+
+def load(user):
+    """The questions a user has seen, as a SeenSet (empty if they have none)"""
+    try:
+        return SeenSet(SeenQuestions.objects.filter(user=user).first())
+    except Exception as e:
+        print(f"⚠️ Seen questions unavailable: {e}")
+        return SeenSet()
+
+
+def record(user, questions):
+    """Add served questions to the user's filters, rotating them when full"""
+    fingerprints = [fingerprint(question) for question in questions or []]
+    if not fingerprints:
+        return
+    capacity = _setting('QUESTION_SEEN_CAPACITY', 2000)
+    with transaction.atomic():
+        seen, _ = SeenQuestions.objects.select_for_update().get_or_create(user=user)
+        current = bytearray(seen.current) or new_filter()
+        for value in fingerprints:
+            if seen.current_count >= capacity:
+                seen.previous = bytes(current)
+                current = new_filter()
+                seen.current_count = 0
+                metrics.incr('questions.seen.rotations')
+            if add(current, value):
+                seen.current_count += 1
+        seen.current = bytes(current)
+        seen.total_served += len(fingerprints)
+        seen.save()
@@ -3,10 +3,22 @@ from .models import UserProfile, ResumeData, InterviewAnalysis
 
 
 class ResumeDataSerializer(serializers.ModelSerializer):
+    """Resume fields; the raw text is only added with context={'include_raw_text': True}"""
     class Meta:
         model = ResumeData
         fields = '__all__'
         read_only_fields = ('user', 'uploaded_at', 'updated_at')
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if self.context.get('include_raw_text'):
+            data['raw_text'] = instance.get_raw_text()
+        return data
+
+
+def wants_raw_text(request):
+    """True for ?include=raw_text"""
+    return 'raw_text' in request.GET.get('include', '').split(',')
 
 
 class InterviewAnalysisSerializer(serializers.ModelSerializer):
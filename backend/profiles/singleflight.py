@@ -0,0 +1,213 @@
+"""
+Single-flight coalescing of identical in-flight Gemini requests.
+
+When several requests ask for the same (model, prompt) at the same time -
+double clicks, React re-renders, the resume page and the setup page both
+asking for recommendations - only the first one (the leader) calls Gemini.
+The others wait for it and receive the same result.
+
+Within a worker this is done with an in-memory table of in-flight calls.
+Across gunicorn workers, the leader additionally takes a lock named after the
+full cache key (LLM_SINGLEFLIGHT_LOCK = file | db | none), so unrelated
+prompts never wait for each other's Gemini calls, and re-checks the shared
+LLM cache once it holds it, so a worker that lost the race picks up the
+result the winner just stored instead of calling Gemini again. Cross-worker
+coalescing therefore needs a shared cache backend (db or django).
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from . import metrics
+
+_POLL_INTERVAL = 0.05
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+_calls = {}
+_calls_lock = threading.Lock()
+_async_calls = {}
+
+
+def _wait_timeout():
+    return getattr(settings, 'LLM_SINGLEFLIGHT_TIMEOUT', 120)
+
+
+def do(key, fn, namespace='llm'):
+    """
+    Run `fn()` once for all concurrent callers using the same `key`.
+    Followers get the leader's return value (or its exception re-raised).
+    """
+    with _calls_lock:
+        call = _calls.get(key)
+        leader = call is None
+        if leader:
+            call = _calls[key] = _Call()
+
+    if not leader:
+        metrics.incr(f'singleflight.{namespace}.shared')
+        if call.done.wait(_wait_timeout()):
+            if call.error is not None:
+                raise call.error
+            return call.result
+        # The leader is stuck; don't hold this request hostage to it
+        metrics.incr(f'singleflight.{namespace}.wait_timeouts')
+        return fn()
+
+    metrics.incr(f'singleflight.{namespace}.leader')
+    try:
+        call.result = fn()
+        return call.result
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        with _calls_lock:
+            _calls.pop(key, None)
+        call.done.set()
+
+
+async def do_async(key, coro_fn, namespace='llm'):
+    """Async counterpart of do() for callers on one event loop"""
+    loop = asyncio.get_running_loop()
+    call_key = (id(loop), key)
+    future = _async_calls.get(call_key)
+    if future is not None:
+        metrics.incr(f'singleflight.{namespace}.shared')
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise
+            # The leader's request was cancelled (client went away); run our own call
+            return await coro_fn()
+
+    metrics.incr(f'singleflight.{namespace}.leader')
+    future = _async_calls[call_key] = loop.create_future()
+    try:
+        result = await coro_fn()
+        future.set_result(result)
+        return result
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Mark the exception retrieved so an unshared failure isn't logged as unhandled
+        future.exception()
+        raise
+    finally:
+        _async_calls.pop(call_key, None)
+
+
+def _lock_path(key):
+    """Lock file of one cache key; its holder removes it on release"""
+    lock_dir = getattr(settings, 'LLM_SINGLEFLIGHT_LOCK_DIR', None) or os.path.join(
+        tempfile.gettempdir(), 'llm-singleflight'
+    )
+    os.makedirs(lock_dir, exist_ok=True)
+    return os.path.join(lock_dir, f"{hashlib.sha256(key.encode()).hexdigest()}.lock")
+
+
+def _same_file(handle, path):
+    try:
+        return os.fstat(handle.fileno()).st_ino == os.stat(path).st_ino
+    except FileNotFoundError:
+        return False
+
+
+@contextmanager
+def _file_lock(key, timeout):
+    """
+    flock a per-key file, so only callers of the same key wait for each
+    other. The holder deletes the file before unlocking; a waiter that then
+    locks the deleted file notices the inode changed and tries again.
+    """
+    import fcntl
+
+    path = _lock_path(key)
+    deadline = time.monotonic() + timeout
+    handle = None
+    while handle is None:
+        candidate = open(path, 'a')
+        try:
+            fcntl.flock(candidate, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            if _same_file(candidate, path):
+                handle = candidate
+                break
+        except BlockingIOError:
+            pass
+        candidate.close()
+        if time.monotonic() >= deadline:
+            break
+        time.sleep(_POLL_INTERVAL)
+    try:
+        yield handle is not None
+    finally:
+        if handle is not None:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            fcntl.flock(handle, fcntl.LOCK_UN)
+            handle.close()
+
+
+@contextmanager
+def _db_lock(key, timeout):
+    from django.db import connection
+
+    if connection.vendor != 'postgresql':
+        # Advisory locks are PostgreSQL-only; SQLite deployments are single host
+        with _file_lock(key, timeout) as acquired:
+            yield acquired
+        return
+
+    lock_id = int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], 'big', signed=True)
+    deadline = time.monotonic() + timeout
+    acquired = False
+    with connection.cursor() as cursor:
+        while True:
+            cursor.execute('SELECT pg_try_advisory_lock(%s)', [lock_id])
+            if cursor.fetchone()[0]:
+                acquired = True
+                break
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(_POLL_INTERVAL)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [lock_id])
+
+
+@contextmanager
+def cross_process_lock(key):
+    """
+    Hold the cross-worker lock for `key` (no-op when LLM_SINGLEFLIGHT_LOCK is
+    'none'). Yields whether the lock was acquired; on timeout the caller just
+    proceeds without it.
+    """
+    kind = getattr(settings, 'LLM_SINGLEFLIGHT_LOCK', 'file')
+    timeout = _wait_timeout()
+    if kind == 'db':
+        with _db_lock(key, timeout) as acquired:
+            yield acquired
+    elif kind == 'file':
+        with _file_lock(key, timeout) as acquired:
+            yield acquired
+    else:
+        yield False
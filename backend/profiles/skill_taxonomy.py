@@ -0,0 +1,141 @@
+"""
+Skill matching against the taxonomy in data/skills.json.
+
+Each taxonomy entry has a canonical name, a category and optional aliases:
+
+    {"name": "Go", "category": "language", "aliases": ["Golang"], "exact": ["Go"]}
+
+Names and aliases match case-insensitively. Spaces and hyphens are
+interchangeable ("Full Stack" = "full-stack"). Forms listed in "exact" match
+only with exactly that casing; these are ordinary English words such as
+"Go", "Swift" or "Spring". With "match_name": false only the aliases are
+matched.
+
+All forms are compiled once into a single regex shaped like a trie: forms
+that share a prefix share one branch, and longer forms are tried first. At
+each position of the text the engine tries at most one branch per distinct
+first character. The time to scan a resume therefore hardly grows as the
+taxonomy grows. Matches must sit on a word boundary, so "Java" does not
+match in "JavaScript", "SQL" does not match in "PostgreSQL" and "Git" does
+not match in "GitHub". Boundaries also account for C++, C#, .NET and Node.js.
+"""
+import json
+import os
+import re
+import threading
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(__file__), 'data', 'skills.json')
+
+# Not inside a word, and not the "js" of "Node.js"
+_LEFT = r'(?<![\w.])'
+# Not followed by more word characters, "++"/"#", ".js"-style suffixes or
+# "://" (the scheme of a URL)
+_RIGHT = r'(?![\w+#]|\.\w|:/)'
+_SEPARATOR = r'[\s\-]+'
+_END = ''
+
+
+def normalize(form):
+    """Lookup key for a case-insensitive form or matched text"""
+    return re.sub(r'[\s\-]+', ' ', form.strip().lower())
+
+
+def _tokens(form, exact):
+    """Regex tokens for one form; each token is one trie edge"""
+    tokens = []
+    for ch in form:
+        if ch in ' -':
+            if not tokens or tokens[-1] != _SEPARATOR:
+                tokens.append(_SEPARATOR)
+        elif not exact and ch.lower() != ch.upper():
+            tokens.append(f'[{ch.lower()}{ch.upper()}]')
+        else:
+            tokens.append(re.escape(ch))
+    return tokens
+
+
+def _trie_regex(node):
+    terminal = _END in node
+    # Character classes (case-insensitive forms) before literals, so where
+    # both could continue the insensitive, usually longer, form goes first
+    branches = [
+        token + _trie_regex(child)
+        for token, child in sorted(node.items(), key=lambda item: (not item[0].startswith('['), item[0]))
+        if token != _END
+    ]
+    if not branches:
+        return ''
+    if len(branches) == 1 and not terminal:
+        return branches[0]
+    group = '(?:' + '|'.join(branches) + ')'
+    return group + '?' if terminal else group
+
+
+class SkillMatcher:
+    def __init__(self, skills):
+        self.skills = skills
+        self.categories = {}
+        self._exact = {}  # exact-case form -> canonical name
+        self._folded = {}  # normalized form -> canonical name
+        trie = {}
+        for skill in skills:
+            name = skill['name']
+            self.categories[name] = skill.get('category')
+            exact_forms = set(skill.get('exact', []))
+            forms = list(skill.get('aliases', []))
+            if skill.get('match_name', True):
+                forms.insert(0, name)
+            for form in forms:
+                exact = form in exact_forms
+                if exact:
+                    self._exact[form] = name
+                else:
+                    self._folded[normalize(form)] = name
+                node = trie
+                for token in _tokens(form, exact):
+                    node = node.setdefault(token, {})
+                node[_END] = True
+        self.pattern = re.compile(_LEFT + '(?:' + _trie_regex(trie) + ')' + _RIGHT)
+
+    def canonical(self, text):
+        """Canonical skill name for a matched form, or None"""
+        return self._folded.get(normalize(text)) or self._exact.get(re.sub(r'[\s\-]+', ' ', text))
+
+    def find(self, text):
+        """Canonical names of every skill mentioned in `text`, in order of first mention"""
+        found = {}
+        resolved = {}  # matched text -> canonical name; resumes repeat their skills
+        for match in self.pattern.finditer(text or ''):
+            matched = match.group()
+            # A lone letter followed by a period is an initial ("John C. Smith")
+            if len(matched) == 1 and text[match.end():match.end() + 1] == '.':
+                continue
+            if matched not in resolved:
+                resolved[matched] = self.canonical(matched)
+            name = resolved[matched]
+            if name and name not in found:
+                found[name] = True
+        return list(found)
+
+
+def load_taxonomy(path=TAXONOMY_PATH):
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)['skills']
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_matcher():
+    """The shared matcher, compiled on first use"""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = SkillMatcher(load_taxonomy())
+    return _matcher
+
+
+def find_skills(text):
+    return get_matcher().find(text)
@@ -1,3 +1,419 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from google.api_core import exceptions as google_exceptions
+
+from . import (
+    fake_gemini, interview_ai, interview_views, json_stream, llm_cache, llm_schemas, metrics, question_bank,
+    question_generator, question_index, resilience, resume_parser, resume_service, resume_sections, seen_questions, singleflight,
+)
+from .models import UserProfile
+
+QUESTION = '{"question": "What is a B-tree?", "type": "conceptual", "difficulty": "easy"}'
+
+
+class JSONStreamParserTests(SimpleTestCase):
+    def test_fenced_json_with_prose(self):
+        value, complete = json_stream.parse('Here you go:\n```json\n{"a": 1, "b": [true, null]}\n```')
+        self.assertTrue(complete)
+        self.assertEqual(value, {'a': 1, 'b': [True, None]})
+
+    def test_trailing_commas(self):
+        value, complete = json_stream.parse('{"a": [1, 2,], "b": "x",}')
+        self.assertTrue(complete)
+        self.assertEqual(value, {'a': [1, 2], 'b': 'x'})
+
+    def test_truncated_string_is_dropped(self):
+        value, complete = json_stream.parse('{"email": "jo@example.com", "full_name": "Jo')
+        self.assertFalse(complete)
+        self.assertEqual(value, {'email': 'jo@example.com'})
+
+    def test_truncated_number_is_dropped(self):
+        value, complete = json_stream.parse('{"a": 1, "years": 12')
+        self.assertFalse(complete)
+        self.assertEqual(value, {'a': 1})
+
+    def test_open_array_item_is_dropped(self):
+        value, complete = json_stream.parse('[{"q": "one"}, {"q": "two", "topics": ["a", "b"')
+        self.assertFalse(complete)
+        self.assertEqual(value, [{'q': 'one'}])
+
+    def test_open_nested_object_keeps_complete_fields(self):
+        value, complete = json_stream.parse('{"skills": ["Python"], "recommendations": {"goal": "Quick Mock", "target_level": "En')
+        self.assertFalse(complete)
+        self.assertEqual(value, {'skills': ['Python'], 'recommendations': {'goal': 'Quick Mock'}})
+
+    def test_complete_array_items_survive_truncation(self):
+        value, complete = json_stream.parse('{"skills": ["Python", "Go", "Ja')
+        self.assertFalse(complete)
+        self.assertEqual(value, {'skills': ['Python', 'Go']})
+
+
+class ParseResponseTests(SimpleTestCase):
+    def test_complete_reply_is_not_partial(self):
+        result = llm_schemas.parse_response('questions', f'```json\n[{QUESTION},]\n```')
+        self.assertEqual(len(result), 1)
+        self.assertFalse(llm_schemas.is_partial(result))
+
+    def test_truncated_question_is_dropped_and_marked(self):
+        result = llm_schemas.parse_response('questions', f'[{QUESTION}, {{"question": "How would you des')
+        self.assertEqual([q['question'] for q in result], ['What is a B-tree?'])
+        self.assertTrue(llm_schemas.is_partial(result))
+
+    def test_truncated_name_is_not_saved(self):
+        result = llm_schemas.parse_response('resume_extraction', '{"skills": ["Python"], "full_name": "Jo')
+        self.assertNotEqual(result.get('full_name'), 'Jo')
+        self.assertTrue(llm_schemas.is_partial(result))
+
+    def test_missing_required_field_is_partial(self):
+        result = llm_schemas.parse_response('resume_extraction', '{"skills": ["Python"]}')
+        self.assertTrue(llm_schemas.is_partial(result))
+
+    def test_no_json_raises(self):
+        with self.assertRaises(llm_schemas.SchemaError):
+            llm_schemas.parse_response('questions', 'Sorry, I cannot help with that.')
+
+
+class LLMCachePartialTests(SimpleTestCase):
+    def setUp(self):
+        llm_cache.reset_backend()
+
+    def tearDown(self):
+        llm_cache.reset_backend()
+
+    def test_partial_result_is_returned_but_not_cached(self):
+        calls = []
+
+        def generate():
+            calls.append(1)
+            return llm_schemas.parse_response('questions', f'[{QUESTION}, {{"question": "How would you des')
+
+        with self.settings(LLM_CACHE_BACKEND='memory', LLM_CACHE_FUNCTIONS=['questions']):
+            first = llm_cache.get_or_generate('questions', 'model', 'prompt', generate)
+            llm_cache.get_or_generate('questions', 'model', 'prompt', generate)
+        self.assertEqual(len(first), 1)
+        self.assertEqual(len(calls), 2)
+
+    def test_complete_result_is_cached(self):
+        calls = []
+
+        def generate():
+            calls.append(1)
+            return llm_schemas.parse_response('questions', f'[{QUESTION}]')
+
+        with self.settings(LLM_CACHE_BACKEND='memory', LLM_CACHE_FUNCTIONS=['questions']):
+            llm_cache.get_or_generate('questions', 'model', 'prompt', generate)
+            llm_cache.get_or_generate('questions', 'model', 'prompt', generate)
+        self.assertEqual(len(calls), 1)
+
+
+class ResumeSectionsTests(SimpleTestCase):
+    def test_date_only_lines_are_kept(self):
+        sections = resume_sections.segment('Education\nB.Tech, IIT Delhi\n2019\nExperience\nEngineer, Acme\n06/2021\n2021 - 2023')
+        self.assertEqual(sections['education'], 'B.Tech, IIT Delhi\n2019')
+        self.assertEqual(sections['experience'], 'Engineer, Acme\n06/2021\n2021 - 2023')
+
+    def test_page_numbers_are_dropped(self):
+        sections = resume_sections.segment('Skills\nPython\nPage 2 of 3\n2 of 3\n- 2 -\nPage 4\nDjango')
+        self.assertEqual(sections['skills'], 'Python\nDjango')
+
+
+class StreamQuestionTests(SimpleTestCase):
+    def setUp(self):
+        llm_cache.reset_backend()
+
+    def tearDown(self):
+        llm_cache.reset_backend()
+
+    def _events(self, stream_text):
+        request = RequestFactory().post('/api/interview/ai/question/stream/', '{}', content_type='application/json')
+        with self.settings(LLM_CACHE_BACKEND='memory'), mock.patch.object(interview_ai.gemini_client, 'stream_text', stream_text):
+            body = b''.join(interview_views.generate_question_stream(request).streaming_content).decode()
+        return [(block.split('\n')[0][7:], json.loads(block.split('\n')[1][6:])) for block in body.strip().split('\n\n')]
+
+    def test_mid_stream_failure_replaces_the_question(self):
+        def stream_text(*args, **kwargs):
+            yield 'How would you '
+            raise TimeoutError('upstream timed out')
+
+        events = self._events(stream_text)
+        self.assertEqual([name for name, _ in events], ['token', 'replace', 'done'])
+        self.assertEqual(events[1][1]['text'], interview_ai.FALLBACK_QUESTION)
+        self.assertEqual(events[2][1]['question'], interview_ai.FALLBACK_QUESTION)
+
+    def test_prompt_error_yields_the_fallback(self):
+        with mock.patch.object(interview_ai, 'build_budgeted_question_prompt', side_effect=ValueError('bad profile')):
+            chunks = list(interview_ai.stream_interview_question([], {}, 'Technical'))
+        self.assertEqual(chunks, [interview_ai.FALLBACK_QUESTION])
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def _tripped(self, name):
+        breaker = resilience.CircuitBreaker(name)
+        for _ in range(4):
+            breaker.allow()
+            breaker.record_failure()
+        return breaker
+
+    def test_opens_at_the_error_rate_and_rejects(self):
+        with self.settings(LLM_BREAKER_MIN_CALLS=4, LLM_BREAKER_ERROR_RATE=0.5, LLM_BREAKER_COOLDOWN=60):
+            breaker = self._tripped('test.open')
+            self.assertEqual(breaker.state, resilience.OPEN)
+            with self.assertRaises(resilience.CircuitOpenError):
+                breaker.allow()
+
+    def test_half_open_lets_one_probe_through(self):
+        with self.settings(LLM_BREAKER_MIN_CALLS=4, LLM_BREAKER_COOLDOWN=0):
+            breaker = self._tripped('test.half_open')
+            breaker.allow()
+            self.assertEqual(breaker.state, resilience.HALF_OPEN)
+            with self.assertRaises(resilience.CircuitOpenError):
+                breaker.allow()
+            breaker.record_success()
+            self.assertEqual(breaker.state, resilience.CLOSED)
+            breaker.allow()
+
+    def test_failed_probe_opens_again(self):
+        with self.settings(LLM_BREAKER_MIN_CALLS=4, LLM_BREAKER_COOLDOWN=0):
+            breaker = self._tripped('test.probe_fails')
+            breaker.allow()
+            breaker.record_failure()
+            self.assertEqual(breaker.state, resilience.OPEN)
+
+
+class RetryDeadlineTests(SimpleTestCase):
+    def _call(self, model, deadline, error):
+        timeouts = []
+
+        def attempt(timeout):
+            timeouts.append(timeout)
+            raise error
+
+        with self.assertRaises(type(error)):
+            resilience.call(model, 'test', attempt, deadline)
+        return timeouts
+
+    def test_transient_errors_are_retried(self):
+        with self.settings(LLM_RETRY_ATTEMPTS=3, LLM_RETRY_BASE_DELAY=0, LLM_BREAKER_MIN_CALLS=100):
+            timeouts = self._call('test-retry', 5, google_exceptions.ServiceUnavailable('overloaded'))
+        self.assertEqual(len(timeouts), 3)
+        self.assertTrue(all(0 < timeout <= 5 for timeout in timeouts))
+
+    def test_no_retry_past_the_deadline(self):
+        with self.settings(LLM_RETRY_ATTEMPTS=3, LLM_RETRY_BASE_DELAY=0, LLM_BREAKER_MIN_CALLS=100):
+            timeouts = self._call('test-deadline', 1, google_exceptions.TooManyRequests('retry in 30s'))
+        self.assertEqual(len(timeouts), 1)
+
+    def test_permanent_errors_are_not_retried(self):
+        with self.settings(LLM_RETRY_ATTEMPTS=3, LLM_BREAKER_MIN_CALLS=100):
+            timeouts = self._call('test-permanent', 5, google_exceptions.InvalidArgument('bad request'))
+        self.assertEqual(len(timeouts), 1)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def _concurrent(self, fn, key='key', count=4):
+        results, errors = [], []
+
+        def run():
+            try:
+                results.append(singleflight.do(key, fn, namespace='test'))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        return results, errors
+
+    def test_concurrent_callers_share_one_call(self):
+        calls = []
+
+        def fn():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'answer'
+
+        results, errors = self._concurrent(fn)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['answer'] * 4)
+        self.assertEqual(errors, [])
+
+    def test_followers_get_the_leaders_error(self):
+        def fn():
+            time.sleep(0.2)
+            raise ValueError('upstream failed')
+
+        results, errors = self._concurrent(fn)
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 4)
+
+    def test_file_lock_is_per_key_and_cleaned_up(self):
+        with tempfile.TemporaryDirectory() as lock_dir, self.settings(LLM_SINGLEFLIGHT_LOCK_DIR=lock_dir):
+            with singleflight._file_lock('a' * 64, 1) as held:
+                self.assertTrue(held)
+                with singleflight._file_lock('b' * 64, 0) as other:
+                    self.assertTrue(other)
+                with singleflight._file_lock('a' * 64, 0) as same:
+                    self.assertFalse(same)
+            self.assertEqual(os.listdir(lock_dir), [])
+
+
+def _bank_question(text, difficulty='medium', type='conceptual', topics=None):
+    return {'question': text, 'difficulty': difficulty, 'type': type, 'topics': topics or []}
+
+
+class QuestionBankAssembleTests(TestCase):
+    def setUp(self):
+        question_bank.store_questions([
+            _bank_question('What is a hash map?', 'easy'),
+            _bank_question('How does a heap work?', 'easy', 'coding'),
+            _bank_question('Explain Django middleware.', 'medium', topics=['Django']),
+            _bank_question('Explain React hooks.', 'medium', topics=['React']),
+            _bank_question('Design a rate limiter.', 'hard', 'system_design'),
+        ], 'dsa', 'Entry Level')
+
+    def test_set_runs_easy_to_hard_and_counts_serves(self):
+        with self.settings(QUESTION_INDEX_ENABLED=False):
+            questions, hashes = question_bank.assemble('DSA', 'Entry Level', 3)
+        self.assertEqual([q['difficulty'] for q in questions], ['easy', 'medium', 'hard'])
+        self.assertEqual(hashes, {question_bank.question_hash(q['question']) for q in questions})
+        self.assertEqual(sum(question_bank.Question.objects.values_list('times_served', flat=True)), 3)
+
+    def test_resume_skills_pick_matching_topics(self):
+        with self.settings(QUESTION_INDEX_ENABLED=False):
+            questions, _ = question_bank.assemble('dsa', 'entry level', 3, {'skills': ['React']})
+        self.assertIn('Explain React hooks.', [q['question'] for q in questions])
+
+    def test_excluded_questions_are_skipped(self):
+        exclude = {question_bank.question_hash('What is a hash map?'), question_bank.question_hash('Design a rate limiter.')}
+        with self.settings(QUESTION_INDEX_ENABLED=False):
+            questions, _ = question_bank.assemble('dsa', 'entry level', 5, exclude=exclude)
+        self.assertEqual(len(questions), 3)
+        self.assertFalse(exclude & {question_bank.question_hash(q['question']) for q in questions})
+
+    def test_store_counts_only_new_questions(self):
+        stored = question_bank.store_questions([
+            _bank_question('What is a hash map?', 'easy'),
+            _bank_question('what is a  HASH map?', 'easy'),
+            _bank_question('What is a bloom filter?', 'medium'),
+        ], 'DSA', 'entry level')
+        self.assertEqual(stored, 1)
+        self.assertEqual(question_bank.bank_size('dsa', 'entry level'), 6)
+
+    def test_index_lag_is_reported(self):
+        gauge = 'questions.index.lag.' + question_index.partition_name('dsa', 'entry level')
+        with tempfile.TemporaryDirectory() as index_dir, self.settings(QUESTION_INDEX_DIR=index_dir):
+            question_bank._index_checked.clear()
+            question_bank.assemble('dsa', 'entry level', 3, {'skills': ['React']})
+            self.assertEqual(metrics.snapshot()['gauges'][gauge], 5)
+            question_index.update(wait=True)
+            question_bank._index_checked.clear()
+            question_bank.assemble('dsa', 'entry level', 3, {'skills': ['React']})
+            self.assertEqual(metrics.snapshot()['gauges'][gauge], 0)
+
+
+class QuestionPoolTests(TestCase):
+    SET_A = [_bank_question('What is a stack?', 'easy')]
+    SET_B = [_bank_question('What is a queue?', 'easy')]
+
+    def setUp(self):
+        question_bank.add_set('quick', 'Entry Level', 'dsa', self.SET_A)
+        question_bank.add_set('quick', 'Entry Level', 'dsa', self.SET_B)
+
+    def test_pop_takes_each_set_once(self):
+        self.assertEqual(question_bank.pop_set('Quick', 'entry level', 'DSA'), self.SET_A)
+        self.assertEqual(question_bank.pop_set('quick', 'Entry Level', 'dsa'), self.SET_B)
+        self.assertIsNone(question_bank.pop_set('quick', 'Entry Level', 'dsa'))
+
+    def test_pop_skips_sets_with_seen_questions(self):
+        seen = {question_bank.question_hash('What is a stack?')}
+        self.assertEqual(question_bank.pop_set('quick', 'Entry Level', 'dsa', exclude=seen), self.SET_B)
+        self.assertEqual(question_bank.pool_shortfall('quick', 'Entry Level', 'dsa'), question_bank.pool_size() - 1)
+
+    def test_full_bank_personalises_the_fresh_slots(self):
+        question_bank.store_questions([
+            _bank_question(f'Bank question number {i}?', difficulty) for i, difficulty in enumerate(['easy', 'medium', 'hard'] * 2)
+        ], 'dsa', 'Entry Level')
+        fake_gemini.configure(latency='0', error_rate=0, markdown_rate=0)
+        with self.settings(QUESTION_BANK_FRESH_QUESTIONS=1, QUESTION_INDEX_ENABLED=False):
+            questions = question_generator.generate_interview_questions('quick', 'Entry Level', 'dsa', {'skills': ['Python']})
+        self.assertEqual(len(questions), 3)
+        self.assertNotIn(questions, [self.SET_A, self.SET_B])
+        self.assertEqual(question_bank.pool_shortfall('quick', 'Entry Level', 'dsa'), question_bank.pool_size() - 2)
+
+
+class SeenQuestionsTests(TestCase):
+    def setUp(self):
+        self.user = UserProfile.objects.create(uid='seen-user', email='seen@example.com', name='Seen User')
+
+    def test_served_questions_are_seen(self):
+        seen_questions.record(self.user, [{'question': 'What is a trie?'}])
+        seen = seen_questions.load(self.user)
+        self.assertIn(seen_questions.fingerprint('What is a trie?'), seen)
+        self.assertNotIn(seen_questions.fingerprint('What is a graph?'), seen)
+
+    def test_full_filter_rotates_and_forgets_two_generations_back(self):
+        with self.settings(QUESTION_SEEN_CAPACITY=2):
+            seen_questions.record(self.user, [f'Question {i}?' for i in range(2)])
+            seen_questions.record(self.user, ['Question 2?'])
+            seen = seen_questions.load(self.user)
+            self.assertIn(seen_questions.fingerprint('Question 0?'), seen)
+            self.assertIn(seen_questions.fingerprint('Question 2?'), seen)
+            seen_questions.record(self.user, ['Question 3?', 'Question 4?'])
+            seen = seen_questions.load(self.user)
+        self.assertNotIn(seen_questions.fingerprint('Question 0?'), seen)
+        self.assertIn(seen_questions.fingerprint('Question 4?'), seen)
+        row = seen_questions.SeenQuestions.objects.get(user=self.user)
+        self.assertEqual(row.total_served, 5)
+        self.assertEqual(len(row.current), len(seen_questions.new_filter(2)))
+
+
+class ResumeDedupTests(TestCase):
+    RESUME = b'Jo Smith\njo@example.com\nSkills\nPython, Django\nExperience\nEngineer at Acme'
+
+    def setUp(self):
+        self.user = UserProfile.objects.create(uid='dedup-user', email='jo@example.com', name='Jo Smith')
+        fake_gemini.configure(latency='0', error_rate=0, markdown_rate=0)
+        llm_cache.reset_backend()
+        # Plain text stands in for a PDF; only the Gemini step matters here
+        extract = mock.patch.object(resume_parser, 'extract_text', lambda file, file_name: file.read().decode())
+        extract.start()
+        self.addCleanup(extract.stop)
+
+    def tearDown(self):
+        fake_gemini.clear_responders()
+        llm_cache.reset_backend()
+
+    def _upload(self, content=None):
+        return resume_service.save_resume(self.user, SimpleUploadedFile('resume.txt', content or self.RESUME))
+
+    def test_same_file_is_not_parsed_again(self):
+        first, created, from_cache = self._upload()
+        self.assertTrue(created)
+        self.assertFalse(from_cache)
+        again, _, from_cache = self._upload()
+        self.assertTrue(from_cache)
+        self.assertEqual(again.pk, first.pk)
+
+    def test_changed_file_is_parsed(self):
+        self._upload()
+        _, _, from_cache = self._upload(self.RESUME + b'\nGo')
+        self.assertFalse(from_cache)
+
+    def test_partial_parse_is_parsed_again(self):
+        fake_gemini.register_responder(
+            lambda task, prompt: '{"skills": ["Python"], "full_name": "Jo' if task == 'resume_extraction' else None
+        )
+        resume, _, _ = self._upload()
+        self.assertIsNone(resume.file_hash)
+        fake_gemini.clear_responders()
+        _, _, from_cache = self._upload()
+        self.assertFalse(from_cache)
@@ -1,23 +1,44 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 from . import interview_views
 
+# Under ASGI the live-interview endpoints use the async views so a worker can
+# keep many Gemini calls in flight; under WSGI the DRF views are used.
+if settings.ASGI_MODE:
+    ai_question_view = interview_views.generate_question_async
+    ai_question_stream_view = interview_views.generate_question_stream_async
+    ai_analyze_view = interview_views.analyze_response_async
+    ai_transition_view = interview_views.transition_round_async
+    ai_conclude_view = interview_views.conclude_interview_async
+else:
+    ai_question_view = interview_views.generate_question
+    ai_question_stream_view = interview_views.generate_question_stream
+    ai_analyze_view = interview_views.analyze_response
+    ai_transition_view = interview_views.transition_round
+    ai_conclude_view = interview_views.conclude_interview
+
 urlpatterns = [
     path('profile/create/', views.create_profile, name='create_profile'),
     path('profile/', views.get_profile, name='get_profile'),
     path('resume/upload/', views.upload_resume, name='upload_resume'),
     path('resume/', views.get_resume, name='get_resume'),
+    path('resume/jobs/<uuid:job_id>/', views.get_resume_job, name='get_resume_job'),
     path('recommendations/', views.get_recommendations, name='get_recommendations'),
     path('questions/generate/', views.generate_questions, name='generate_questions'),
     
     # AI Interview endpoints
-    path('interview/ai/question/', interview_views.generate_question, name='ai_generate_question'),
-    path('interview/ai/analyze/', interview_views.analyze_response, name='ai_analyze_response'),
-    path('interview/ai/transition/', interview_views.transition_round, name='ai_transition_round'),
-    path('interview/ai/conclude/', interview_views.conclude_interview, name='ai_conclude_interview'),
+    path('interview/ai/question/', ai_question_view, name='ai_generate_question'),
+    path('interview/ai/question/stream/', ai_question_stream_view, name='ai_generate_question_stream'),
+    path('interview/ai/analyze/', ai_analyze_view, name='ai_analyze_response'),
+    path('interview/ai/transition/', ai_transition_view, name='ai_transition_round'),
+    path('interview/ai/conclude/', ai_conclude_view, name='ai_conclude_interview'),
     
     # Interview Analysis endpoints (POST-interview recording analysis)
     path('interview/ai/recording/analyze/', views.analyze_interview, name='analyze_interview_recording'),
     path('interview/ai/analysis/<int:analysis_id>/', views.get_interview_analysis, name='get_interview_analysis'),
     path('interview/ai/analyses/', views.get_user_interview_analyses, name='get_user_interview_analyses'),
+    
+    # Operational metrics
+    path('metrics/', views.get_metrics, name='get_metrics'),
 ]
@@ -3,12 +3,11 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django.views.decorators.csrf import csrf_exempt
-from .models import UserProfile, ResumeData, InterviewAnalysis
-from .serializers import UserProfileSerializer, ResumeDataSerializer, InterviewAnalysisSerializer
-from .resume_parser import parse_resume
-from .gemini_analyzer import get_interview_recommendations, analyze_interview_recording
+from .models import UserProfile, ResumeData, ResumeParseJob, InterviewAnalysis
+from .serializers import UserProfileSerializer, ResumeDataSerializer, InterviewAnalysisSerializer, wants_raw_text
+from .gemini_analyzer import get_interview_recommendations, is_default_recommendation, analyze_interview_recording
 from .question_generator import generate_interview_questions
-import json
+from . import llm_cache, metrics, resilience, resume_service, seen_questions
 
 
 @api_view(['POST'])
@@ -56,8 +55,8 @@ def get_profile(request):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            profile = UserProfile.objects.get(uid=uid)
-            serializer = UserProfileSerializer(profile)
+            profile = UserProfile.objects.select_related('resume').get(uid=uid)
+            serializer = UserProfileSerializer(profile, context={'include_raw_text': wants_raw_text(request)})
             return Response(serializer.data, status=status.HTTP_200_OK)
         except UserProfile.DoesNotExist:
             return Response({
@@ -98,25 +97,37 @@ def upload_resume(request):
         
         uploaded_file = request.FILES['file']
         
+        # Background mode: queue the file for process_resume_jobs and answer right away
+        if str(request.data.get('async') or request.GET.get('async') or '').lower() in ('1', 'true', 'yes'):
+            job, existing = resume_service.enqueue_resume(user, uploaded_file)
+            if existing is not None:
+                return Response({
+                    'message': 'Resume unchanged, returning saved data',
+                    'cached': True,
+                    'resume': ResumeDataSerializer(existing).data
+                }, status=status.HTTP_200_OK)
+            return Response({
+                'message': 'Resume queued for analysis',
+                'job_id': str(job.id),
+                'status': job.status,
+                'status_url': f'/api/resume/jobs/{job.id}/'
+            }, status=status.HTTP_202_ACCEPTED)
+        
         # Parse resume and extract all important data
         # We don't store the file, just the extracted information!
-        parsed_data = parse_resume(uploaded_file, uploaded_file.name)
+        # Re-uploads of the same file are served from the saved record
+        resume_data, created, from_cache = resume_service.save_resume(user, uploaded_file)
         
         # Debug: Print parsed name
-        print(f"Parsed name: {parsed_data.get('full_name')}")
-        print(f"Parsed email: {parsed_data.get('email')}")
-        print(f"Skills count: {len(parsed_data.get('skills', []))}")
-        
-        # Update or create resume data in SQLite
-        resume_data, created = ResumeData.objects.update_or_create(
-            user=user,
-            defaults=parsed_data
-        )
+        print(f"Parsed name: {resume_data.full_name}")
+        print(f"Parsed email: {resume_data.email}")
+        print(f"Skills count: {len(resume_data.skills or [])}")
         
         serializer = ResumeDataSerializer(resume_data)
         
         return Response({
-            'message': 'Resume analyzed and data saved successfully',
+            'message': 'Resume unchanged, returning saved data' if from_cache else 'Resume analyzed and data saved successfully',
+            'cached': from_cache,
             'resume': serializer.data
         }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
         
@@ -141,7 +152,7 @@ def get_resume(request):
         try:
             user = UserProfile.objects.get(uid=uid)
             resume_data = ResumeData.objects.get(user=user)
-            serializer = ResumeDataSerializer(resume_data)
+            serializer = ResumeDataSerializer(resume_data, context={'include_raw_text': wants_raw_text(request)})
             return Response(serializer.data, status=status.HTTP_200_OK)
         except UserProfile.DoesNotExist:
             return Response({
@@ -157,6 +168,44 @@ def get_resume(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_resume_job(request, job_id):
+    """Status of a background resume parse job, with the parsed resume once done"""
+    try:
+        uid = request.GET.get('uid') or request.headers.get('X-User-UID')
+        
+        if not uid:
+            return Response({
+                'error': 'UID is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            job = ResumeParseJob.objects.select_related('resume').defer('file_data').get(id=job_id, user_id=uid)
+        except ResumeParseJob.DoesNotExist:
+            return Response({
+                'error': 'Job not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        data = {
+            'job_id': str(job.id),
+            'status': job.status,
+            'file_name': job.file_name,
+            'attempts': job.attempts,
+            'error': job.error,
+            'created_at': job.created_at,
+            'started_at': job.started_at,
+            'finished_at': job.finished_at,
+        }
+        if job.status == ResumeParseJob.DONE and job.resume is not None:
+            data['resume'] = ResumeDataSerializer(job.resume).data
+        return Response(data, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_recommendations(request):
@@ -170,24 +219,28 @@ def get_recommendations(request):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            user = UserProfile.objects.get(uid=uid)
-            resume_data = ResumeData.objects.get(user=user)
+            resume_data = ResumeData.objects.select_related('user').get(user__uid=uid)
             
-            # Convert resume data to dict for analysis
-            resume_dict = {
-                'full_name': resume_data.full_name,
-                'email': resume_data.email,
-                'skills': resume_data.skills,
-                'experience': resume_data.experience,
-                'education': resume_data.education,
-                'projects': resume_data.projects,
-                'certifications': resume_data.certifications,
-                'years_of_experience': resume_data.years_of_experience,
-                'key_strengths': resume_data.key_strengths,
-            }
-            
-            # Get AI recommendations
-            recommendations = get_interview_recommendations(resume_dict)
+            # Recommendations are generated with the resume extraction and
+            # stored on the row; only resumes parsed without them (older rows,
+            # regex fallback) need a Gemini call here
+            recommendations = resume_data.recommendations
+            if not recommendations:
+                resume_dict = {
+                    'full_name': resume_data.full_name,
+                    'email': resume_data.email,
+                    'skills': resume_data.skills,
+                    'experience': resume_data.experience,
+                    'education': resume_data.education,
+                    'projects': resume_data.projects,
+                    'certifications': resume_data.certifications,
+                    'years_of_experience': resume_data.years_of_experience,
+                    'key_strengths': resume_data.key_strengths,
+                }
+                recommendations = get_interview_recommendations(resume_dict)
+                # Don't pin the placeholder; retry Gemini on the next request
+                if not is_default_recommendation(recommendations):
+                    ResumeData.objects.filter(pk=resume_data.pk).update(recommendations=recommendations)
             
             return Response({
                 'recommendations': recommendations,
@@ -200,11 +253,11 @@ def get_recommendations(request):
                 }
             }, status=status.HTTP_200_OK)
             
-        except UserProfile.DoesNotExist:
-            return Response({
-                'error': 'User profile not found'
-            }, status=status.HTTP_404_NOT_FOUND)
         except ResumeData.DoesNotExist:
+            if not UserProfile.objects.filter(uid=uid).exists():
+                return Response({
+                    'error': 'User profile not found'
+                }, status=status.HTTP_404_NOT_FOUND)
             return Response({
                 'error': 'Resume not found. Please upload your resume first.'
             }, status=status.HTTP_404_NOT_FOUND)
@@ -233,9 +286,9 @@ def generate_questions(request):
         
         # Get user's resume data for personalization
         resume_dict = None
+        user = UserProfile.objects.filter(uid=uid).first()
         try:
-            user = UserProfile.objects.get(uid=uid)
-            resume_data = ResumeData.objects.get(user=user)
+            resume_data = ResumeData.objects.get(user__uid=uid)
             
             resume_dict = {
                 'full_name': resume_data.full_name,
@@ -244,11 +297,22 @@ def generate_questions(request):
                 'key_strengths': resume_data.key_strengths,
                 'projects': resume_data.projects,
             }
-        except (UserProfile.DoesNotExist, ResumeData.DoesNotExist):
+        except ResumeData.DoesNotExist:
             print("No resume data found, generating generic questions")
         
+        # Skip questions this user has already been served
+        seen = None
+        if user and seen_questions.is_enabled():
+            seen = seen_questions.load(user)
+        
         # Generate questions using AI
-        questions = generate_interview_questions(goal, target_level, domain, resume_dict)
+        questions = generate_interview_questions(goal, target_level, domain, resume_dict, seen=seen)
+        
+        if seen is not None:
+            try:
+                seen_questions.record(user, questions)
+            except Exception as e:
+                print(f"⚠️ Could not record served questions: {e}")
         
         return Response({
             'questions': questions,
@@ -473,4 +537,19 @@ def get_user_interview_analyses(request):
     except Exception as e:
         return Response({
             'error': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_metrics(request):
+    """
+    GET /api/metrics/
+    
+    Per-process AI layer metrics: LLM cache hit/miss counters, circuit
+    breaker states and timings.
+    """
+    return Response({
+        'llm_cache': llm_cache.get_stats(),
+        'breakers': resilience.get_states(),
+        'metrics': metrics.snapshot()
+    }, status=status.HTTP_200_OK)